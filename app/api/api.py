@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.endpoints import auth, users, documents, clients, cases, deadlines, ai
+from app.api.endpoints import auth, users, documents, clients, cases, deadlines, ai, search, admin
 
 api_router = APIRouter()
 
@@ -11,4 +11,6 @@ api_router.include_router(documents.router, prefix="/documents", tags=["document
 api_router.include_router(clients.router, prefix="/clients", tags=["clientes"])
 api_router.include_router(cases.router, prefix="/cases", tags=["processos"])
 api_router.include_router(deadlines.router, prefix="/deadlines", tags=["prazos"])
-api_router.include_router(ai.router, prefix="/ai", tags=["inteligência artificial"])
\ No newline at end of file
+api_router.include_router(ai.router, prefix="/ai", tags=["inteligência artificial"])
+api_router.include_router(search.router, prefix="/search", tags=["pesquisa"])
+api_router.include_router(admin.router, prefix="/admin", tags=["administração"], include_in_schema=False)
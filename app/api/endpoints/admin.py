@@ -0,0 +1,106 @@
+import os
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.utils.profiling import ProfilerError, profiler, render_collapsed, sample_interval
+from app.utils.security import get_admin_user
+
+def require_profiling():
+    # Sem PROFILING_ENABLED as rotas nem aparecem como existentes
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+router = APIRouter(dependencies=[Depends(require_profiling), Depends(get_admin_user)])
+
+def _collapsed_response(content: str) -> PlainTextResponse:
+    # Cada worker tem seu próprio perfil; o PID identifica qual respondeu
+    return PlainTextResponse(content, headers={"X-Profiler-PID": str(os.getpid())})
+
+@router.post("/profiling/cpu", response_class=PlainTextResponse)
+async def profile_cpu(
+    seconds: float = Query(10, gt=0),
+    interval_ms: Optional[float] = Query(None, gt=0)
+):
+    """
+    Amostra as pilhas de todas as threads do worker por alguns segundos.
+    Resposta no formato collapsed (flamegraph.pl, speedscope)
+    """
+    if seconds > settings.PROFILING_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Duração máxima: {settings.PROFILING_MAX_SECONDS:g} segundos"
+        )
+    try:
+        samples = await profiler.sample(seconds, sample_interval(interval_ms))
+    except ProfilerError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return _collapsed_response(render_collapsed(samples))
+
+@router.post("/profiling/routes")
+async def capture_route(data: Dict[str, Any] = Body(...)):
+    """
+    Marca uma rota (ex: /api/cases/{case_id}) para ter as próximas `count` requisições amostradas
+    """
+    route = data.get("route")
+    count = data.get("count", 10)
+    if not route or not route.startswith("/") or not isinstance(count, int) or count < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe a rota e a quantidade de requisições"
+        )
+    capture = profiler.capture_route(route, count, sample_interval(data.get("interval_ms")))
+    return {"route": capture.route, "remaining": capture.remaining}
+
+@router.get("/profiling/routes")
+async def list_route_captures():
+    """
+    Capturas por rota deste worker e quantas requisições faltam
+    """
+    return [
+        {"route": capture.route, "captured": capture.captured, "remaining": max(capture.remaining, 0)}
+        for capture in profiler.route_captures.values()
+    ]
+
+@router.get("/profiling/routes/profile", response_class=PlainTextResponse)
+async def get_route_profile(route: str, keep: bool = False):
+    """
+    Pilhas amostradas nas requisições capturadas da rota, no formato collapsed.
+    A captura é descartada após a leitura, a menos que `keep` seja verdadeiro
+    """
+    capture = profiler.route_captures.get(route) if keep else profiler.pop_route_capture(route)
+    if capture is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Nenhuma captura para esta rota")
+    return _collapsed_response(render_collapsed(capture.samples))
+
+@router.post("/profiling/memory/start")
+async def start_memory_profiling(frames: int = Query(25, ge=1, le=100)):
+    """
+    Inicia o tracemalloc e guarda o snapshot de referência
+    """
+    profiler.start_memory(frames)
+    return {"tracing": True, "frames": frames}
+
+@router.get("/profiling/memory/diff", response_class=PlainTextResponse)
+async def memory_diff(
+    top: int = Query(20, ge=1, le=500),
+    format: str = Query("text", pattern="^(text|collapsed)$")
+):
+    """
+    Maiores variações de memória desde o snapshot anterior (por linha, ou por
+    pilha no formato collapsed); o snapshot atual passa a ser a referência
+    """
+    try:
+        return _collapsed_response(profiler.memory_diff(top, collapsed=format == "collapsed"))
+    except ProfilerError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+@router.post("/profiling/memory/stop")
+async def stop_memory_profiling():
+    """
+    Encerra o tracemalloc (que tem custo enquanto ativo)
+    """
+    profiler.stop_memory()
+    return {"tracing": False}
@@ -1,25 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Query
 from sqlalchemy.orm import Session
 from typing import Dict, Any, Optional
 from datetime import datetime
 import uuid
 
 from app.db.session import get_db
-from app.models.user import User
-from app.utils.security import get_current_user
+from app.models.document import Document
+from app.utils.security import CurrentUser, get_current_user
 from app.services.ai_service import analyze_document, legal_search, generate_document, test_connection
+from app.services.analysis_service import analyze_document_incremental, get_cached_sections, save_cached_sections
+from app.services.usage_service import track_ai_usage, get_usage_report
 from app.utils.logger import logger
 
 router = APIRouter()
 
-@router.post("/analyze-document")
+@router.post("/analyze-document", dependencies=[Depends(track_ai_usage)])
 async def api_analyze_document(
     data: Dict[str, Any] = Body(...),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
-    Analisa um documento jurídico usando IA
+    Analisa um documento jurídico usando IA.
+    Com `document_id`, a análise é feita por seções e apenas as seções alteradas
+    desde a última análise são reenviadas à IA; o resultado é salvo no documento.
     """
+    document_id = data.get("document_id")
+    if document_id:
+        return await analyze_saved_document(db, current_user, document_id, data)
+    
     document_text = data.get("document_text")
     document_type = data.get("document_type", "documento jurídico")
     
@@ -32,10 +41,51 @@ async def api_analyze_document(
     result = await analyze_document(document_text, document_type)
     return result
 
-@router.post("/legal-search")
+async def analyze_saved_document(db: Session, current_user: CurrentUser, document_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Análise incremental de um documento salvo"""
+    document = db.query(Document).filter(Document.id == document_id).first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Documento não encontrado"
+        )
+    
+    if document.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Sem permissão para acessar este documento"
+        )
+    
+    document_text = data.get("document_text") or document.content
+    document_type = data.get("document_type") or document.document_type or "documento jurídico"
+    
+    if not document_text:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Texto do documento é obrigatório"
+        )
+    
+    result = await analyze_document_incremental(document_text, document_type, get_cached_sections(db, document.id))
+    
+    try:
+        document.analysis = result["analysis"]
+        save_cached_sections(db, document.id, result.pop("analysis_sections"))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("Erro ao salvar análise do documento: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao salvar a análise do documento"
+        )
+    
+    return result
+
+@router.post("/legal-search", dependencies=[Depends(track_ai_usage)])
 async def api_legal_search(
     data: Dict[str, Any] = Body(...),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Realiza uma pesquisa jurídica usando IA
@@ -52,10 +102,10 @@ async def api_legal_search(
     result = await legal_search(query, context)
     return result
 
-@router.post("/generate-document")
+@router.post("/generate-document", dependencies=[Depends(track_ai_usage)])
 async def api_generate_document(
     data: Dict[str, Any] = Body(...),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Gera um documento jurídico usando IA
@@ -74,7 +124,7 @@ async def api_generate_document(
 
 @router.get("/test-connection")
 async def api_test_connection(
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Testa a conexão com os serviços de IA
@@ -82,10 +132,21 @@ async def api_test_connection(
     result = await test_connection()
     return result
 
-@router.post("/answer-legal-questions")
+@router.get("/usage")
+async def api_usage_report(
+    days: int = Query(30, ge=1, le=366),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Relatório de consumo de tokens da IA do usuário atual e da cota do plano
+    """
+    return await get_usage_report(db, current_user.id, days)
+
+@router.post("/answer-legal-questions", dependencies=[Depends(track_ai_usage)])
 async def answer_legal_questions(
     data: Dict[str, Any] = Body(...),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Responde a perguntas jurídicas específicas usando respostas predefinidas
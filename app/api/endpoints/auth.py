@@ -1,25 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from datetime import timedelta
+from datetime import datetime
 import uuid
 
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, User as UserSchema
-from app.utils.security import create_access_token, get_current_user
+from app.schemas.token import Token, RefreshRequest, LogoutRequest
+from app.services.token_service import (
+    issue_tokens, rotate_refresh_token, get_refresh_token, revoke_family,
+    revoke_access_token, revoke_user_tokens, purge_expired_tokens
+)
+from app.utils.security import CurrentUser, get_current_user, decode_token, oauth2_scheme
 from app.core.config import settings
 from app.utils.logger import logger
 
 router = APIRouter()
 
-@router.post("/token")
+@router.post("/token", response_model=Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
     """
-    Obtém um token de acesso para o usuário
+    Obtém um access token de curta duração e um refresh token para o usuário
     """
     # Em um sistema real, aqui você verificaria credenciais com hash
     # Para este sistema, utilizamos apenas o login baseado em email 
@@ -32,15 +37,65 @@ async def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        subject=user.id, expires_delta=access_token_expires
-    )
+    # Aproveitar o login para descartar tokens expirados
+    purge_expired_tokens(db)
+    tokens = issue_tokens(db, user.id)
+    db.commit()
     
-    return {
-        "access_token": access_token,
-        "token_type": "bearer"
-    }
+    return tokens
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(
+    refresh_request: RefreshRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Troca um refresh token por um novo par de tokens (o refresh token usado deixa de valer)
+    """
+    tokens = rotate_refresh_token(db, refresh_request.refresh_token)
+    db.commit()
+    
+    return tokens
+
+@router.post("/logout")
+async def logout(
+    logout_request: LogoutRequest,
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Encerra a sessão atual, revogando o access token e a cadeia do refresh token
+    """
+    payload = decode_token(token)
+    
+    if logout_request.refresh_token:
+        refresh_token = get_refresh_token(db, logout_request.refresh_token)
+        if refresh_token and refresh_token.user_id == payload["sub"]:
+            revoke_family(db, refresh_token.family_id)
+    
+    if payload.get("jti"):
+        revoke_access_token(db, payload["jti"], payload["sub"], datetime.utcfromtimestamp(payload["exp"]))
+    db.commit()
+    
+    return {"message": "Sessão encerrada com sucesso"}
+
+@router.post("/logout-all")
+async def logout_all(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Encerra todas as sessões do usuário atual
+    """
+    revoke_user_tokens(db, current_user.id)
+    
+    payload = decode_token(token)
+    if payload.get("jti"):
+        revoke_access_token(db, payload["jti"], current_user.id, datetime.utcfromtimestamp(payload["exp"]))
+    db.commit()
+    
+    return {"message": "Todas as sessões foram encerradas"}
 
 @router.post("/register", response_model=UserSchema)
 async def register_user(
@@ -76,7 +131,7 @@ async def register_user(
         return new_user
     except Exception as e:
         db.rollback()
-        logger.error(f"Erro ao registrar usuário: {str(e)}")
+        logger.error("Erro ao registrar usuário: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao registrar usuário"
@@ -84,7 +139,7 @@ async def register_user(
 
 @router.get("/user", response_model=UserSchema)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Obtém as informações do usuário atual
@@ -3,11 +3,11 @@ from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 
 from app.db.session import get_db
-from app.models.user import User
 from app.models.case import Case
 from app.models.client import Client
 from app.schemas.case import CaseCreate, CaseUpdate, Case as CaseSchema, CaseList
-from app.utils.security import get_current_user
+from app.utils.security import CurrentUser, get_current_user, get_current_user_id
+from app.utils.fast_json import list_response, schema_columns
 from app.utils.logger import logger
 from app.api.endpoints.cases_service import CaseService
 
@@ -16,7 +16,7 @@ router = APIRouter()
 @router.get("", response_model=CaseList)
 async def get_cases(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user_id: str = Depends(get_current_user_id),
     skip: int = 0,
     limit: int = 50,
     client_id: Optional[int] = None
@@ -24,19 +24,40 @@ async def get_cases(
     """
     Obtém a lista de casos do usuário atual, com filtro opcional por cliente
     """
-    query = db.query(Case).filter(Case.user_id == current_user.id)
+    # Apenas as colunas do esquema de resposta, sem montar objetos ORM
+    query = db.query(*schema_columns(Case, CaseSchema)).filter(Case.user_id == current_user_id)
     
     if client_id:
         query = query.filter(Case.client_id == client_id)
         
     cases = query.offset(skip).limit(limit).all()
-    return {"cases": cases}
+    return list_response("cases", cases)
+
+@router.get("/options", response_model=List[Dict[str, Any]])
+async def get_case_options(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Obtém opções de processos para uso em seletores e dropdowns
+    """
+    try:
+        options = CaseService.get_case_options(db, current_user.id)
+        return options
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error("Erro ao buscar opções de processos: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erro ao carregar os processos"
+        )
 
 @router.get("/{case_id}", response_model=CaseSchema)
 async def get_case(
     case_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Obtém um caso específico por ID
@@ -62,7 +83,7 @@ async def get_case(
 async def create_case(
     case_create: CaseCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Cria um novo caso
@@ -94,7 +115,7 @@ async def create_case(
         return case
     except Exception as e:
         db.rollback()
-        logger.error(f"Erro ao criar caso: {str(e)}")
+        logger.error("Erro ao criar caso: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao salvar o caso"
@@ -105,7 +126,7 @@ async def update_case(
     case_id: int,
     case_update: CaseUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Atualiza um caso existente
@@ -145,7 +166,7 @@ async def update_case(
         return case
     except Exception as e:
         db.rollback()
-        logger.error(f"Erro ao atualizar caso: {str(e)}")
+        logger.error("Erro ao atualizar caso: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao atualizar o caso"
@@ -155,7 +176,7 @@ async def update_case(
 async def delete_case(
     case_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Exclui um caso
@@ -181,28 +202,8 @@ async def delete_case(
         db.commit()
     except Exception as e:
         db.rollback()
-        logger.error(f"Erro ao excluir caso: {str(e)}")
+        logger.error("Erro ao excluir caso: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao excluir o caso"
         )
-
-@router.get("/options", response_model=List[Dict[str, Any]])
-async def get_case_options(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """
-    Obtém opções de processos para uso em seletores e dropdowns
-    """
-    try:
-        options = CaseService.get_case_options(db, current_user.id)
-        return options
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        logger.error(f"Erro ao buscar opções de processos: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Erro ao carregar os processos"
-        )
\ No newline at end of file
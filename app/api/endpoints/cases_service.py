@@ -17,31 +17,27 @@ class CaseService:
         Obtém opções de processos para uso em seletores e dropdowns
         """
         try:
-            # Buscar todos os casos do usuário
-            cases = db.query(Case).filter(Case.user_id == user_id).all()
+            # Buscar os casos do usuário com o nome do cliente em uma única consulta
+            rows = db.query(
+                Case.id, Case.title, Case.number, Case.status, Client.name
+            ).outerjoin(Client, Client.id == Case.client_id).filter(Case.user_id == user_id).all()
             
             # Formatar os resultados para uso em dropdowns
             options = []
-            for case in cases:
-                # Buscar o cliente associado
-                client = None
-                if case.client_id:
-                    client = db.query(Client).filter(Client.id == case.client_id).first()
-                
-                # Formatar a opção
+            for case_id, title, number, case_status, client_name in rows:
                 option = {
-                    "id": case.id,
-                    "label": f"{case.title} ({case.number or 'Sem número'})",
-                    "value": str(case.id),
-                    "clientName": client.name if client else "Cliente não especificado",
-                    "status": case.status
+                    "id": case_id,
+                    "label": f"{title} ({number or 'Sem número'})",
+                    "value": str(case_id),
+                    "clientName": client_name or "Cliente não especificado",
+                    "status": case_status
                 }
                 
                 options.append(option)
                 
             return options
         except Exception as e:
-            logger.error(f"Erro ao buscar opções de processos: {str(e)}")
+            logger.error("Erro ao buscar opções de processos: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Erro ao carregar os processos"
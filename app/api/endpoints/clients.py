@@ -3,10 +3,10 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.db.session import get_db
-from app.models.user import User
 from app.models.client import Client
 from app.schemas.client import ClientCreate, ClientUpdate, Client as ClientSchema, ClientList
-from app.utils.security import get_current_user
+from app.utils.security import CurrentUser, get_current_user, get_current_user_id
+from app.utils.fast_json import list_response, schema_columns
 from app.utils.logger import logger
 
 router = APIRouter()
@@ -14,21 +14,24 @@ router = APIRouter()
 @router.get("", response_model=ClientList)
 async def get_clients(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user_id: str = Depends(get_current_user_id),
     skip: int = 0,
     limit: int = 50
 ):
     """
     Obtém a lista de clientes do usuário atual
     """
-    clients = db.query(Client).filter(Client.user_id == current_user.id).offset(skip).limit(limit).all()
-    return {"clients": clients}
+    # Apenas as colunas do esquema de resposta, sem montar objetos ORM
+    clients = db.query(*schema_columns(Client, ClientSchema)).filter(
+        Client.user_id == current_user_id
+    ).offset(skip).limit(limit).all()
+    return list_response("clients", clients)
 
 @router.get("/{client_id}", response_model=ClientSchema)
 async def get_client(
     client_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Obtém um cliente específico por ID
@@ -54,7 +57,7 @@ async def get_client(
 async def create_client(
     client_create: ClientCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Cria um novo cliente
@@ -72,7 +75,7 @@ async def create_client(
         return client
     except Exception as e:
         db.rollback()
-        logger.error(f"Erro ao criar cliente: {str(e)}")
+        logger.error("Erro ao criar cliente: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao salvar o cliente"
@@ -83,7 +86,7 @@ async def update_client(
     client_id: int,
     client_update: ClientUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Atualiza um cliente existente
@@ -114,7 +117,7 @@ async def update_client(
         return client
     except Exception as e:
         db.rollback()
-        logger.error(f"Erro ao atualizar cliente: {str(e)}")
+        logger.error("Erro ao atualizar cliente: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao atualizar o cliente"
@@ -124,7 +127,7 @@ async def update_client(
 async def delete_client(
     client_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Exclui um cliente
@@ -149,7 +152,7 @@ async def delete_client(
         db.commit()
     except Exception as e:
         db.rollback()
-        logger.error(f"Erro ao excluir cliente: {str(e)}")
+        logger.error("Erro ao excluir cliente: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao excluir o cliente"
@@ -4,11 +4,11 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 
 from app.db.session import get_db
-from app.models.user import User
 from app.models.deadline import Deadline
 from app.models.case import Case
 from app.schemas.deadline import DeadlineCreate, DeadlineUpdate, Deadline as DeadlineSchema, DeadlineList
-from app.utils.security import get_current_user
+from app.utils.security import CurrentUser, get_current_user, get_current_user_id
+from app.utils.fast_json import list_response, schema_columns
 from app.utils.logger import logger
 from app.api.endpoints.deadlines_service import DeadlineService
 
@@ -17,7 +17,7 @@ router = APIRouter()
 @router.get("", response_model=DeadlineList)
 async def get_deadlines(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user_id: str = Depends(get_current_user_id),
     skip: int = 0,
     limit: int = 50,
     case_id: Optional[int] = None,
@@ -27,7 +27,8 @@ async def get_deadlines(
     """
     Obtém a lista de prazos do usuário atual, com filtros opcionais
     """
-    query = db.query(Deadline).filter(Deadline.user_id == current_user.id)
+    # Apenas as colunas do esquema de resposta, sem montar objetos ORM
+    query = db.query(*schema_columns(Deadline, DeadlineSchema)).filter(Deadline.user_id == current_user_id)
     
     if case_id:
         query = query.filter(Deadline.case_id == case_id)
@@ -44,13 +45,13 @@ async def get_deadlines(
     query = query.order_by(Deadline.due_date)
     
     deadlines = query.offset(skip).limit(limit).all()
-    return {"deadlines": deadlines}
+    return list_response("deadlines", deadlines)
 
 @router.get("/{deadline_id}", response_model=DeadlineSchema)
 async def get_deadline(
     deadline_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Obtém um prazo específico por ID
@@ -76,7 +77,7 @@ async def get_deadline(
 async def create_deadline(
     deadline_create: DeadlineCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Cria um novo prazo
@@ -111,15 +112,15 @@ async def create_deadline(
             priority=deadline_create.priority or "medium"
         )
         
-        logger.info(f"Prazo criado com sucesso: {deadline.id}")
+        logger.info("Prazo criado com sucesso: %s", deadline.id)
         return deadline
     except HTTPException as e:
         # Repassar exceções HTTP
-        logger.warning(f"Erro de validação ao criar prazo: {e.detail}")
+        logger.warning("Erro de validação ao criar prazo: %s", e.detail)
         raise e
     except Exception as e:
         # Logar e transformar outras exceções
-        logger.error(f"Erro inesperado ao criar prazo: {str(e)}")
+        logger.error("Erro inesperado ao criar prazo: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao salvar o prazo: {str(e)}"
@@ -130,7 +131,7 @@ async def update_deadline(
     deadline_id: int,
     deadline_update: DeadlineUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Atualiza um prazo existente
@@ -170,7 +171,7 @@ async def update_deadline(
         return deadline
     except Exception as e:
         db.rollback()
-        logger.error(f"Erro ao atualizar prazo: {str(e)}")
+        logger.error("Erro ao atualizar prazo: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao atualizar o prazo"
@@ -180,7 +181,7 @@ async def update_deadline(
 async def complete_deadline(
     deadline_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Marca um prazo como concluído
@@ -208,7 +209,7 @@ async def complete_deadline(
         return deadline
     except Exception as e:
         db.rollback()
-        logger.error(f"Erro ao marcar prazo como concluído: {str(e)}")
+        logger.error("Erro ao marcar prazo como concluído: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao atualizar o prazo"
@@ -218,7 +219,7 @@ async def complete_deadline(
 async def delete_deadline(
     deadline_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Exclui um prazo
@@ -243,7 +244,7 @@ async def delete_deadline(
         db.commit()
     except Exception as e:
         db.rollback()
-        logger.error(f"Erro ao excluir prazo: {str(e)}")
+        logger.error("Erro ao excluir prazo: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao excluir o prazo"
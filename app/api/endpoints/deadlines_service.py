@@ -75,7 +75,7 @@ class DeadlineService:
             return deadline
         except Exception as e:
             db.rollback()
-            logger.error(f"Erro ao criar prazo: {str(e)}")
+            logger.error("Erro ao criar prazo: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Erro ao salvar o prazo"
@@ -94,8 +94,10 @@ class DeadlineService:
         today = datetime.utcnow()
         end_date = today + timedelta(days=days_ahead)
         
-        # Construir a consulta
-        query = db.query(Deadline).filter(
+        # Construir a consulta, já trazendo o caso associado para evitar uma consulta por prazo
+        query = db.query(Deadline, Case.id, Case.title, Case.number).outerjoin(
+            Case, Case.id == Deadline.case_id
+        ).filter(
             Deadline.user_id == user_id,
             Deadline.due_date >= today,
             Deadline.due_date <= end_date
@@ -109,24 +111,22 @@ class DeadlineService:
         query = query.order_by(Deadline.due_date)
         
         # Executar a consulta
-        deadlines = query.all()
+        rows = query.all()
         
         # Adicionar informações adicionais para cada prazo
         result = []
-        for deadline in deadlines:
+        for deadline, case_id, case_title, case_number in rows:
             # Calcular dias restantes
             remaining_days = (deadline.due_date - today).days
             
             # Obter informações do caso associado, se houver
             case_info = None
-            if deadline.case_id:
-                case = db.query(Case).filter(Case.id == deadline.case_id).first()
-                if case:
-                    case_info = {
-                        "id": case.id,
-                        "title": case.title,
-                        "number": case.number
-                    }
+            if case_id is not None:
+                case_info = {
+                    "id": case_id,
+                    "title": case_title,
+                    "number": case_number
+                }
             
             # Construir o resultado
             deadline_info = {
@@ -176,7 +176,7 @@ class DeadlineService:
             return deadline
         except Exception as e:
             db.rollback()
-            logger.error(f"Erro ao marcar prazo como concluído: {str(e)}")
+            logger.error("Erro ao marcar prazo como concluído: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Erro ao atualizar o prazo"
@@ -1,45 +1,99 @@
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, Header, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker, undefer
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional, Dict, Any
+from urllib.parse import quote
+import json
 import uuid
 from datetime import datetime
 
 from app.db.session import get_db
-from app.models.user import User
 from app.models.document import Document
-from app.schemas.document import DocumentCreate, DocumentUpdate, Document as DocumentSchema, DocumentList
-from app.utils.security import get_current_user
+from app.schemas.document import DocumentCreate, DocumentUpdate, Document as DocumentSchema, DocumentSummaryList
+from app.utils.fast_json import list_response
+from app.utils.security import CurrentUser, get_admin_user, get_current_user, get_current_user_id
 from app.utils.logger import logger
+from app.services.storage_service import (
+    file_size, read_range, read_text, delete_file, parse_range_header, UploadTooLargeError
+)
+from app.services.blob_service import (
+    store_upload, release_blob, discard_new_blob, blob_key, get_storage_stats
+)
+from app.services.revision_service import (
+    record_revision, get_revision_content, list_revisions, diff_revisions, delete_revisions
+)
+from app.services.analysis_service import delete_cached_sections
+from app.services.extraction_service import (
+    needs_extraction, extract_document_text, STATUS_PROCESSING
+)
 
 router = APIRouter()
 
-@router.get("", response_model=DocumentList)
+# Colunas carregadas na listagem de documentos
+SUMMARY_FIELDS = ("id", "title", "status", "document_type", "client_name", "created_at")
+# Colunas adicionais que podem ser solicitadas via `fields`
+OPTIONAL_FIELDS = ("content", "analysis", "file_type", "file_info", "user_id")
+
+@router.get("", response_model=DocumentSummaryList, response_model_exclude_unset=True)
 async def get_documents(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    limit: int = 50
+    current_user_id: str = Depends(get_current_user_id),
+    limit: int = 50,
+    fields: Optional[str] = None
 ):
     """
-    Obtém a lista de documentos do usuário atual
+    Obtém a lista resumida de documentos do usuário atual.
+    Campos adicionais (ex: content, analysis) podem ser solicitados via `fields`, separados por vírgula.
     """
-    documents = db.query(Document).filter(Document.user_id == current_user.id).limit(limit).all()
+    extra_fields = []
+    if fields:
+        extra_fields = [f.strip() for f in fields.split(",") if f.strip() and f.strip() not in SUMMARY_FIELDS]
+        invalid = [f for f in extra_fields if f not in OPTIONAL_FIELDS]
+        if invalid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Campos inválidos: {', '.join(invalid)}"
+            )
+    
+    # Carregar apenas as colunas necessárias, sem montar objetos ORM completos
+    columns = [getattr(Document, name) for name in SUMMARY_FIELDS + tuple(dict.fromkeys(extra_fields))]
+    rows = db.query(*columns).filter(Document.user_id == current_user_id).limit(limit).all()
     
     # Calcular o tempo relativo para cada documento (ex: "há 5 minutos")
-    for doc in documents:
-        doc.created_ago = format_relative_time(doc.created_at)
+    documents = []
+    for row in rows:
+        doc = dict(row._mapping)
+        doc["created_ago"] = format_relative_time(doc["created_at"])
+        documents.append(doc)
     
-    return {"documents": documents}
+    return list_response("documents", documents)
+
+@router.get("/storage/stats")
+async def get_document_storage_stats(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_admin_user)
+):
+    """
+    Obtém estatísticas de deduplicação do armazenamento de arquivos.
+    Os arquivos são compartilhados entre usuários, então os números cobrem todo o
+    armazenamento e ficam restritos a administradores (ADMIN_USER_IDS).
+    """
+    return get_storage_stats(db)
 
 @router.get("/{document_id}", response_model=DocumentSchema)
 async def get_document(
     document_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Obtém um documento específico por ID
     """
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = db.query(Document).options(
+        undefer(Document.content), undefer(Document.analysis)
+    ).filter(Document.id == document_id).first()
     
     if not document:
         raise HTTPException(
@@ -60,16 +114,17 @@ async def get_document(
 
 @router.post("", response_model=DocumentSchema)
 async def create_document(
+    background_tasks: BackgroundTasks,
     title: str = Form(...),
     content: Optional[str] = Form(None),
     file_type: str = Form(...),
-    status: str = Form("draft"),
+    document_status: str = Form("draft", alias="status"),
     document_type: Optional[str] = Form(None),
     client_name: Optional[str] = Form(None),
     analysis: Optional[str] = Form(None),
     file: Optional[UploadFile] = File(None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Cria um novo documento
@@ -79,18 +134,45 @@ async def create_document(
     
     # Processar o arquivo, se fornecido
     file_info = None
+    deduplicated = False
+    extraction_status = None
     if file:
-        file_content = await file.read()
-        # Em uma implementação real, salvaria o arquivo em storage e guardaria a referência
+        try:
+            # O upload é gravado em disco em blocos e deduplicado pelo SHA-256
+            blob, stored, deduplicated = await store_upload(db, file)
+        except UploadTooLargeError as e:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
+            )
+        except Exception as e:
+            logger.error("Erro ao armazenar arquivo: %s", e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erro ao armazenar o arquivo"
+            )
+        
+        storage_key = blob_key(stored.sha256)
         file_info = {
             "filename": file.filename,
-            "size": len(file_content),
-            "content_type": file.content_type
+            "size": stored.size,
+            "content_type": file.content_type,
+            "sha256": stored.sha256,
+            "storage_key": storage_key
         }
         
-        # Se não houver conteúdo de texto, poderia usar OCR ou outro método para extrair
-        if not content and file.content_type.startswith("text/"):
-            content = file_content.decode("utf-8")
+        # Se não houver conteúdo de texto, extrair do arquivo
+        if not content and file.content_type and file.content_type.startswith("text/"):
+            # Com o backend S3 a leitura é um GET do objeto inteiro: fora do event loop
+            content = await run_in_threadpool(read_text, storage_key, stored.size)
+        elif not content and needs_extraction(file.content_type, file.filename):
+            if blob.extracted_text is not None:
+                # Arquivo já processado anteriormente: reaproveitar o texto extraído
+                content = blob.extracted_text
+            else:
+                # PDF/DOCX: a extração roda em segundo plano, em um pool de processos
+                extraction_status = document_status
+                document_status = STATUS_PROCESSING
     
     # Criar objeto documento
     document_data = {
@@ -98,8 +180,8 @@ async def create_document(
         "title": title,
         "content": content,
         "file_type": file_type,
-        "file_info": str(file_info) if file_info else None,
-        "status": status,
+        "file_info": json.dumps(file_info) if file_info else None,
+        "status": document_status,
         "document_type": document_type,
         "client_name": client_name,
         "analysis": analysis,
@@ -113,10 +195,18 @@ async def create_document(
         db.commit()
         db.refresh(document)
         document.created_ago = format_relative_time(document.created_at)
+        
+        if extraction_status:
+            session_factory = sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind())
+            background_tasks.add_task(
+                extract_document_text, session_factory, document_id, file_info, extraction_status
+            )
         return document
     except Exception as e:
         db.rollback()
-        logger.error(f"Erro ao criar documento: {str(e)}")
+        if file_info and not deduplicated:
+            await run_in_threadpool(discard_new_blob, db, file_info["sha256"])
+        logger.error("Erro ao criar documento: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao salvar o documento"
@@ -127,12 +217,14 @@ async def update_document(
     document_id: str,
     document_update: DocumentUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Atualiza um documento existente
     """
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = db.query(Document).options(
+        undefer(Document.content), undefer(Document.analysis)
+    ).filter(Document.id == document_id).first()
     
     if not document:
         raise HTTPException(
@@ -149,17 +241,30 @@ async def update_document(
     
     # Atualizar campos que foram fornecidos
     update_data = document_update.dict(exclude_unset=True)
+    old_content = document.content
     for key, value in update_data.items():
         setattr(document, key, value)
     
     try:
+        # Registrar a nova versão do conteúdo no histórico
+        new_content = update_data.get("content")
+        if new_content is not None and new_content != old_content:
+            await record_revision(db, document, old_content, new_content, current_user.id)
+        
         db.commit()
         db.refresh(document)
         document.created_ago = format_relative_time(document.created_at)
         return document
+    except IntegrityError:
+        # Outra edição gravou a mesma versão primeiro
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="O documento foi alterado por outra edição; recarregue e tente novamente"
+        )
     except Exception as e:
         db.rollback()
-        logger.error(f"Erro ao atualizar documento: {str(e)}")
+        logger.error("Erro ao atualizar documento: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao atualizar o documento"
@@ -169,7 +274,7 @@ async def update_document(
 async def delete_document(
     document_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Exclui um documento
@@ -189,16 +294,176 @@ async def delete_document(
             detail="Sem permissão para excluir este documento"
         )
     
+    stored_file = parse_file_info(document.file_info)
+    
     try:
+        # Liberar a referência ao arquivo; blobs sem referências são coletados
+        unreferenced_key = release_blob(db, stored_file.get("sha256"))
+        delete_revisions(db, document.id)
+        delete_cached_sections(db, document.id)
         db.delete(document)
         db.commit()
     except Exception as e:
         db.rollback()
-        logger.error(f"Erro ao excluir documento: {str(e)}")
+        logger.error("Erro ao excluir documento: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao excluir o documento"
         )
+    
+    # Remover o arquivo somente depois que o registro foi excluído
+    if unreferenced_key:
+        await run_in_threadpool(delete_file, unreferenced_key)
+
+@router.get("/{document_id}/file")
+async def download_document_file(
+    document_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Baixa o arquivo original de um documento, com suporte a requisições Range
+    """
+    document = db.query(Document).filter(Document.id == document_id).first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Documento não encontrado"
+        )
+    
+    # Verificar se o documento pertence ao usuário atual
+    if document.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Sem permissão para acessar este documento"
+        )
+    
+    stored_file = parse_file_info(document.file_info)
+    storage_key = stored_file.get("storage_key")
+    if not storage_key:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Documento não possui arquivo armazenado"
+        )
+    
+    try:
+        size = await run_in_threadpool(file_size, storage_key)
+    except (FileNotFoundError, OSError):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Arquivo não encontrado no armazenamento"
+        )
+    
+    try:
+        byte_range = parse_range_header(range_header, size)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Intervalo solicitado inválido",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    
+    filename = stored_file.get("filename") or document_id
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}",
+    }
+    if stored_file.get("sha256"):
+        headers["ETag"] = f'"{stored_file["sha256"]}"'
+    
+    if byte_range:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+    else:
+        start, end = 0, size - 1
+        status_code = status.HTTP_200_OK
+    headers["Content-Length"] = str(end - start + 1)
+    
+    return StreamingResponse(
+        read_range(storage_key, start, end) if size else iter(()),
+        status_code=status_code,
+        media_type=stored_file.get("content_type") or "application/octet-stream",
+        headers=headers
+    )
+
+def get_owned_document(db: Session, document_id: str, user_id: str) -> Document:
+    """
+    Obtém um documento verificando se pertence ao usuário
+    """
+    document = db.query(Document).filter(Document.id == document_id).first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Documento não encontrado"
+        )
+    
+    if document.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Sem permissão para acessar este documento"
+        )
+    
+    return document
+
+@router.get("/{document_id}/versions")
+async def get_document_versions(
+    document_id: str,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Lista as versões do conteúdo de um documento
+    """
+    get_owned_document(db, document_id, current_user.id)
+    return {"versions": list_revisions(db, document_id)}
+
+@router.get("/{document_id}/versions/{version}")
+async def get_document_version(
+    document_id: str,
+    version: int,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Obtém o conteúdo de uma versão específica de um documento
+    """
+    get_owned_document(db, document_id, current_user.id)
+    return {"version": version, "content": get_revision_content(db, document_id, version)}
+
+@router.get("/{document_id}/diff")
+async def get_document_diff(
+    document_id: str,
+    from_version: int,
+    to_version: int,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Compara duas versões de um documento (diff unificado)
+    """
+    get_owned_document(db, document_id, current_user.id)
+    return {
+        "from_version": from_version,
+        "to_version": to_version,
+        "diff": diff_revisions(db, document_id, from_version, to_version)
+    }
+
+def parse_file_info(file_info: Optional[str]) -> Dict[str, Any]:
+    """
+    Lê os metadados do arquivo armazenados em JSON.
+    Registros antigos (gravados com str(dict)) não possuem arquivo armazenado.
+    """
+    if not file_info:
+        return {}
+    try:
+        data = json.loads(file_info)
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
 
 def format_relative_time(date: datetime) -> str:
     """
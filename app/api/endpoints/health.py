@@ -0,0 +1,33 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from app.services.ai_service import ai_circuit, ai_health
+from app.services.health_service import health_service
+
+router = APIRouter()
+
+@router.get("/live")
+async def liveness():
+    """
+    Processo ativo e event loop respondendo. Não depende do banco nem da IA,
+    para que uma falha externa não leve o orquestrador a reiniciar os workers.
+    """
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def readiness():
+    """
+    Worker pronto para receber tráfego (503 durante o encerramento ou sem banco)
+    """
+    ready, body = await health_service.readiness()
+    return JSONResponse(body, status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+@router.get("/ai")
+async def ai_health_status():
+    """
+    Saúde da API de IA pelo último resultado observado, sem chamá-la (503 se falhou).
+    Sem resultado ainda ou com o resultado vencido, responde 200 com `stale`.
+    """
+    body = {**ai_circuit.snapshot(), **ai_health.status()}
+    healthy = body["healthy"] is not False and body["state"] != "open"
+    return JSONResponse(body, status_code=status.HTTP_200_OK if healthy else status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import Optional, Dict, Any
+
+from app.db.session import get_db
+from app.utils.security import CurrentUser, get_current_user
+from app.services.search_service import search, INDEXED_MODELS
+
+router = APIRouter()
+
+SEARCHABLE_TYPES = {entity_type for entity_type, _, _ in INDEXED_MODELS.values()}
+
+@router.get("", response_model=Dict[str, Any])
+async def search_all(
+    q: str = Query(..., min_length=1, max_length=500),
+    types: Optional[str] = None,
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Pesquisa textual nos documentos, processos e clientes do usuário atual.
+    O filtro `types` aceita uma lista separada por vírgulas (document, case, client).
+    """
+    entity_types = None
+    if types:
+        entity_types = [t.strip() for t in types.split(",") if t.strip()]
+        invalid = set(entity_types) - SEARCHABLE_TYPES
+        if invalid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Tipos de pesquisa inválidos: {', '.join(sorted(invalid))}"
+            )
+    
+    return search(db, current_user.id, q, entity_types=entity_types, limit=limit, offset=skip)
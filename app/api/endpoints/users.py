@@ -5,7 +5,7 @@ from typing import List
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.user import UserUpdate, User as UserSchema
-from app.utils.security import get_current_user
+from app.utils.security import CurrentUser, get_current_user, invalidate_user_cache
 from app.utils.logger import logger
 
 router = APIRouter()
@@ -13,7 +13,7 @@ router = APIRouter()
 @router.get("", response_model=List[UserSchema])
 async def get_users(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     skip: int = 0,
     limit: int = 100
 ):
@@ -30,7 +30,7 @@ async def get_users(
 async def get_user(
     user_id: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Obtém um usuário específico por ID
@@ -57,7 +57,7 @@ async def update_user(
     user_id: str,
     user_update: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Atualiza um usuário
@@ -85,10 +85,12 @@ async def update_user(
     try:
         db.commit()
         db.refresh(user)
+        # Os dados do usuário em cache ficaram desatualizados
+        invalidate_user_cache(user_id)
         return user
     except Exception as e:
         db.rollback()
-        logger.error(f"Erro ao atualizar usuário: {str(e)}")
+        logger.error("Erro ao atualizar usuário: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erro ao atualizar o usuário"
@@ -1,28 +1,328 @@
 import os
-from pydantic import BaseModel, Field
-from typing import Optional
+import signal
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Callable, List, Literal, Mapping, Optional
+
+from dotenv import dotenv_values
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator, model_validator
+
+# Arquivo com as variáveis de ambiente locais; valores já definidos no ambiente têm prioridade
+ENV_FILE = os.getenv("ENV_FILE", ".env")
+
+# Variáveis de ambiente com nome diferente do campo
+_ENV_NAMES = {"SECRET_KEY": "SESSION_SECRET"}
 
 class Settings(BaseModel):
+    """
+    Configurações da aplicação, lidas do ambiente e do .env, validadas uma vez na
+    inicialização e imutáveis. Para alterá-las sem reiniciar os workers, edite o
+    .env e envie SIGHUP ao processo (ver `reload_settings`).
+    """
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     PROJECT_NAME: str = "LawAI"
     API_V1_STR: str = "/api"
-    
+
     # Variáveis de banco de dados
-    DATABASE_URL: str = os.getenv("DATABASE_URL", "")
-    
+    DATABASE_URL: str = ""
+    # Cria as tabelas ausentes na inicialização; desative quando o esquema é mantido por migrações
+    DB_CREATE_TABLES: bool = True
+    # Pool de conexões (ignorado no SQLite)
+    DB_POOL_SIZE: int = Field(5, ge=1)  # Conexões mantidas abertas por worker
+    DB_MAX_OVERFLOW: int = Field(10, ge=0)  # Conexões extras em picos
+    DB_POOL_TIMEOUT: float = Field(30, gt=0)  # segundos esperando uma conexão livre
+    DB_POOL_RECYCLE: int = Field(1800, ge=-1)  # segundos até renovar uma conexão (-1 desativa)
+    DB_POOL_PRE_PING: bool = True  # Testa a conexão antes de usar (descarta as derrubadas pelo servidor)
+
     # Variáveis de segurança
-    SECRET_KEY: str = os.getenv("SESSION_SECRET", "")
+    SECRET_KEY: str = ""
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 dias
-    
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(15, gt=0)
+    REFRESH_TOKEN_EXPIRE_DAYS: int = Field(30, gt=0)
+    REVOCATION_SYNC_SECONDS: float = Field(5, ge=0)  # Atraso máximo entre workers
+    REVOCATION_SYNC_OVERLAP_SECONDS: float = Field(60, ge=0)  # Folga para relógios defasados e commits tardios
+    AUTH_CACHE_TTL_SECONDS: float = Field(30, ge=0)  # 0 desativa o cache
+    AUTH_CACHE_MAX_ENTRIES: int = Field(10000, ge=1)
+    ADMIN_USER_IDS: str = ""  # IDs separados por vírgula com acesso administrativo
+
     # Variáveis de API
-    DEEPSEEK_API_KEY: Optional[str] = os.getenv("DEEPSEEK_API_KEY", "")
-    ANTHROPIC_API_KEY: Optional[str] = os.getenv("ANTHROPIC_API_KEY", "")
-    
+    DEEPSEEK_API_KEY: Optional[str] = ""
+    ANTHROPIC_API_KEY: Optional[str] = ""
+    # Tempos limite das chamadas à IA, em segundos
+    AI_REQUEST_TIMEOUT: float = Field(60, gt=0)  # Análises, buscas e geração de documentos
+    AI_CONNECT_TIMEOUT: float = Field(10, gt=0)  # Apenas o estabelecimento da conexão
+    AI_TEST_TIMEOUT: float = Field(10, gt=0)  # Teste de conexão
+    # Disjuntor: falhas seguidas que abrem o circuito e segundos até a próxima tentativa
+    AI_CIRCUIT_FAILURE_THRESHOLD: int = Field(5, ge=1)
+    AI_CIRCUIT_RESET_SECONDS: float = Field(30, gt=0)
+    # Saúde da IA: observada nas chamadas reais; sem tráfego, sonda pela listagem de modelos (sem tokens)
+    AI_HEALTH_PROBE_ENABLED: bool = True
+    AI_HEALTH_PROBE_INTERVAL: float = Field(60, gt=0)  # segundos sem chamadas até sondar
+    AI_HEALTH_TTL_SECONDS: float = Field(120, gt=0)  # Idade máxima do último resultado antes de considerá-lo vencido
+
+    # Análise incremental de documentos por seções
+    AI_MAX_CONCURRENCY: int = Field(4, ge=1)  # Chamadas simultâneas por análise
+    ANALYSIS_SECTION_MAX_CHARS: int = Field(6000, gt=0)
+
+    # Contabilização de tokens da IA e cotas mensais por plano
+    AI_USAGE_FLUSH_INTERVAL: float = Field(5, gt=0)  # segundos entre gravações
+    AI_USAGE_MAX_PENDING: int = Field(500, ge=1)  # grava antes ao acumular tantos registros
+    AI_DEFAULT_PLAN: str = "basic"  # plano de quem não tem assinatura ativa
+    # Tokens por mês para cada plano, no formato "plano=tokens;plano=tokens" (0 = ilimitado)
+    AI_TOKEN_QUOTAS: str = "basic=300000;professional=1500000;enterprise=0"
+
+    # Logs (gravados por uma thread separada, fora do event loop)
+    LOG_LEVEL: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = "INFO"
+    LOG_LEVELS: str = ""  # Por logger, no formato "logger=nível;logger=nível"
+    LOG_FORMAT: Literal["json", "text"] = "json"
+    LOG_MAX_MESSAGE_LENGTH: int = Field(2000, ge=0)  # caracteres (0 = sem limite)
+    LOG_QUEUE_SIZE: int = Field(10000, ge=1)  # registros pendentes antes de descartar
+
+    # Servidor de produção (python -m app.server)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = Field(5000, ge=1, le=65535)
+    SERVER_WORKERS: int = Field(0, ge=0)  # 0 = um por CPU disponível (considera cgroups e afinidade)
+    SERVER_MAX_WORKERS: int = Field(8, ge=1)  # Teto do cálculo automático (cada worker tem seu pool de conexões)
+    SERVER_PRELOAD: bool = True  # Importa a aplicação antes do fork; workers sobem mais rápido e compartilham memória
+    SERVER_BACKLOG: int = Field(2048, ge=1)  # Conexões aguardando accept no socket
+    SERVER_KEEPALIVE_SECONDS: float = Field(5, ge=0)  # Acima do keep-alive do proxy/load balancer à frente
+    SERVER_LIMIT_CONCURRENCY: int = Field(0, ge=0)  # Conexões simultâneas por worker antes de responder 503 (0 = sem limite)
+    # Tempo para as requisições em andamento (ex: chamadas à IA) terminarem após o SIGTERM
+    SERVER_GRACEFUL_TIMEOUT: float = Field(90, gt=0)
+
+    # Verificações de saúde (/health/live e /health/ready)
+    HEALTH_DB_CHECK_SECONDS: float = Field(5, ge=0)  # Resultado do teste do banco reaproveitado por esse tempo
+
     # Frontend URL
-    FRONTEND_URL: str = os.getenv("FRONTEND_URL", "http://localhost:5000")
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    FRONTEND_URL: str = "http://localhost:5000"
+    STATIC_DIR: str = "static"  # Build do frontend servido pela API
+
+    # Listagens serializadas direto das colunas (orjson), sem validação pelos esquemas Pydantic
+    FAST_JSON_RESPONSES: bool = True
+
+    # Métricas no formato do Prometheus em /metrics
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str = ""  # Se definido, exigido como Bearer no /metrics
+    METRICS_MULTIPROC_DIR: str = ""  # Diretório compartilhado entre workers
+    METRICS_FLUSH_INTERVAL: float = Field(5, gt=0)  # segundos
+    METRICS_LOOP_LAG_INTERVAL: float = Field(0.5, gt=0)  # segundos
+
+    # Consultas SQL por requisição
+    SLOW_QUERY_MS: float = Field(200, ge=0)  # Registra consultas mais lentas que isso (0 desativa)
+    # Cabeçalho Server-Timing com consultas e tempo de banco; apenas em desenvolvimento
+    SERVER_TIMING_ENABLED: bool = False
+
+    # Rastreamento (spans no formato OTLP/JSON do OpenTelemetry)
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATIO: float = Field(0.05, ge=0, le=1)  # Fração das requisições rastreadas
+    TRACING_EXPORTER: Literal["file", "otlp"] = "file"
+    TRACING_FILE_PATH: str = "/tmp/lawai-traces.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318"  # Collector OTLP/HTTP
+    TRACING_SERVICE_NAME: str = "lawai-api"
+    TRACING_EXPORT_INTERVAL: float = Field(5, gt=0)  # segundos
+    TRACING_MAX_QUEUE: int = Field(10000, ge=1)  # spans pendentes antes de descartar
+
+    # Profiling sob demanda (apenas administradores); desativado por padrão
+    PROFILING_ENABLED: bool = False
+    PROFILING_MAX_SECONDS: float = Field(60, gt=0)
+    PROFILING_SAMPLE_INTERVAL_MS: float = Field(5, ge=1)
+
+    # Compressão das respostas (gzip e, se instalado, brotli)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = Field(1024, ge=0)  # bytes
+    COMPRESSION_GZIP_LEVEL: int = Field(6, ge=1, le=9)
+    COMPRESSION_BROTLI_QUALITY: int = Field(4, ge=0, le=11)  # 4-5 equilibra taxa e CPU
+
+    # Armazenamento de arquivos enviados
+    STORAGE_BACKEND: Literal["local", "s3"] = "local"
+    STORAGE_LOCAL_PATH: str = "uploads"
+    STORAGE_S3_BUCKET: str = ""
+    STORAGE_S3_ENDPOINT_URL: Optional[str] = None  # Ex.: MinIO local
+    STORAGE_CHUNK_SIZE: int = Field(1024 * 1024, ge=1024)  # 1 MB
+    MAX_UPLOAD_SIZE: int = Field(50 * 1024 * 1024, ge=1)  # 50 MB
+
+    # Extração de texto de PDF/DOCX
+    EXTRACTION_MAX_WORKERS: int = Field(2, ge=1)
+    EXTRACTION_TIMEOUT: float = Field(120, gt=0)  # segundos
+
+    # Compressão de colunas de texto grandes (conteúdo e análise de documentos)
+    TEXT_COMPRESSION_CODEC: Literal["zstd", "zlib"] = "zstd"  # zstd (se instalado) ou zlib
+    TEXT_COMPRESSION_LEVEL: int = Field(6, ge=1)
+    TEXT_COMPRESSION_THRESHOLD: int = Field(1024, ge=0)  # bytes
+
+    # Histórico de versões: uma cópia completa a cada N versões, deltas entre elas
+    REVISION_SNAPSHOT_INTERVAL: int = Field(10, ge=1)
+
+    # Limite de requisições por usuário (ou IP, sem autenticação) e por rota
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: Literal["memory", "sqlite", "redis"] = "memory"
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_SQLITE_PATH: str = "/tmp/lawai-rate-limit.db"  # Compartilhado entre workers locais
+    RATE_LIMIT_DEFAULT: str = "120/minute"
+    # Regras por prefixo de rota, no formato "prefixo=limite;prefixo=limite"
+    RATE_LIMIT_RULES: str = "/api/ai=20/minute;/api/auth/token=10/minute;/api/auth/refresh=30/minute"
+
+    @field_validator("LOG_LEVEL", mode="before")
+    @classmethod
+    def _upper_level(cls, value):
+        return value.upper() if isinstance(value, str) else value
+
+    @field_validator("STORAGE_S3_ENDPOINT_URL", mode="before")
+    @classmethod
+    def _empty_as_none(cls, value):
+        return value or None
+
+    @model_validator(mode="after")
+    def _check_dependencies(self) -> "Settings":
+        if not self.DATABASE_URL:
+            raise ValueError("DATABASE_URL não definida")
+        if self.STORAGE_BACKEND == "s3" and not self.STORAGE_S3_BUCKET:
+            raise ValueError("STORAGE_S3_BUCKET é obrigatório com STORAGE_BACKEND=s3")
+        return self
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> "Settings":
+        """Lê cada campo da variável de ambiente de mesmo nome (ou a de `_ENV_NAMES`)"""
+        environ = os.environ if environ is None else environ
+        values = {}
+        for name in cls.model_fields:
+            value = environ.get(_ENV_NAMES.get(name, name))
+            if value is not None:
+                values[name] = value
+        return cls.model_validate(values)
+
+    def replace(self, **values) -> "Settings":
+        """Cópia validada com alguns valores alterados"""
+        return type(self).model_validate({**self.model_dump(), **values})
+
+    def changed_fields(self, other: "Settings") -> List[str]:
+        return [name for name in type(self).model_fields if getattr(self, name) != getattr(other, name)]
+
+# Chaves do .env já copiadas para o ambiente; só elas são atualizadas ao recarregar,
+# para que as variáveis definidas fora do .env continuem com prioridade
+_dotenv_keys = set()
+
+def _load_env_file(path: str) -> None:
+    values = {key: value for key, value in dotenv_values(path).items() if value is not None}
+    # Linhas removidas do .env deixam de valer: o campo volta ao padrão
+    for key in _dotenv_keys - values.keys():
+        os.environ.pop(key, None)
+        _dotenv_keys.discard(key)
+    for key, value in values.items():
+        if key not in os.environ or key in _dotenv_keys:
+            os.environ[key] = value
+            _dotenv_keys.add(key)
+
+def load_settings() -> Settings:
+    """Lê o .env e o ambiente e valida; erros de configuração impedem a inicialização"""
+    _load_env_file(ENV_FILE)
+    return Settings.from_env()
+
+class SettingsProxy:
+    """
+    Acesso às configurações vigentes: `settings.X` lê sempre o snapshot atual, então
+    quem importou `settings` enxerga a configuração recarregada sem reimportar nada.
+    """
+    __slots__ = ()
+
+    def __getattr__(self, name: str):
+        return getattr(_current, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        raise TypeError(f"Configurações são imutáveis ({name}); use override_settings() ou reload_settings()")
+
+    def __repr__(self) -> str:
+        return f"SettingsProxy({_current!r})"
+
+_current: Settings = load_settings()
+settings = SettingsProxy()
+
+# Funções chamadas após cada recarga, com (anterior, nova)
+_reload_hooks: List[Callable[[Settings, Settings], None]] = []
+# Reentrante: um SIGHUP pode chegar na thread principal durante uma recarga
+_reload_lock = threading.RLock()
+
+# Campos lidos apenas na inicialização: mudanças valem só após reiniciar os workers
+RESTART_REQUIRED = {
+    "API_V1_STR", "DATABASE_URL", "DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_POOL_TIMEOUT",
+    "DB_POOL_RECYCLE", "DB_POOL_PRE_PING", "LOG_FORMAT", "LOG_QUEUE_SIZE", "STATIC_DIR",
+    "COMPRESSION_MIN_SIZE", "STORAGE_BACKEND", "STORAGE_LOCAL_PATH", "STORAGE_S3_BUCKET",
+    "STORAGE_S3_ENDPOINT_URL", "EXTRACTION_MAX_WORKERS", "RATE_LIMIT_BACKEND", "RATE_LIMIT_REDIS_URL",
+    "RATE_LIMIT_SQLITE_PATH", "METRICS_MULTIPROC_DIR", "SERVER_HOST", "SERVER_PORT", "SERVER_WORKERS",
+    "SERVER_MAX_WORKERS", "SERVER_PRELOAD", "SERVER_BACKLOG", "SERVER_KEEPALIVE_SECONDS",
+    "SERVER_LIMIT_CONCURRENCY", "SERVER_GRACEFUL_TIMEOUT",
+}
+
+def get_settings() -> Settings:
+    return _current
+
+def set_settings(new: Settings) -> Settings:
+    """Troca o snapshot vigente e devolve o anterior (sem executar os ganchos de recarga)"""
+    global _current
+    previous, _current = _current, new
+    return previous
+
+def on_reload(hook: Callable[[Settings, Settings], None]) -> Callable[[Settings, Settings], None]:
+    """Registra uma função para aplicar mudanças em objetos criados na inicialização"""
+    _reload_hooks.append(hook)
+    return hook
+
+def reload_settings() -> Optional[Settings]:
+    """
+    Relê o .env e o ambiente. Uma configuração inválida é registrada e descartada,
+    mantendo a atual. Devolve as novas configurações, ou None se nada mudou ou se
+    a recarga falhou.
+    """
+    from app.utils.logger import logger
+
+    with _reload_lock:
+        try:
+            new = load_settings()
+        except ValidationError as e:
+            logger.error("Configuração inválida; mantendo a atual: %s", e)
+            return None
+        changed = new.changed_fields(_current)
+        pending = sorted(RESTART_REQUIRED.intersection(changed))
+        if pending:
+            # Esses campos seguem com o valor da inicialização: trocá-los no snapshot deixaria
+            # o worker meio migrado (ex: uploads num diretório, o backend gravando em outro)
+            logger.warning("Alterações que exigem reiniciar os workers: %s", ", ".join(pending))
+            try:
+                new = new.replace(**{name: getattr(_current, name) for name in pending})
+            except ValidationError as e:
+                logger.error("Configuração inválida sem reiniciar os workers; mantendo a atual: %s", e)
+                return None
+            changed = [name for name in changed if name not in pending]
+        if not changed:
+            logger.info("Configurações recarregadas sem alterações")
+            return None
+        previous = set_settings(new)
+        for hook in _reload_hooks:
+            try:
+                hook(previous, new)
+            except Exception as e:
+                logger.error("Erro ao aplicar configurações recarregadas em %s: %s", hook.__qualname__, e)
+    logger.info("Configurações recarregadas: %s", ", ".join(changed))
+    return new
+
+def install_reload_signal() -> bool:
+    """Recarrega as configurações ao receber SIGHUP (só na thread principal, fora do Windows)"""
+    if not hasattr(signal, "SIGHUP") or threading.current_thread() is not threading.main_thread():
+        return False
+    try:
+        # Com o event loop rodando, a recarga executa como callback do loop, entre requisições
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reload_settings)
+    except RuntimeError:
+        signal.signal(signal.SIGHUP, lambda signum, frame: reload_settings())
+    return True
 
-settings = Settings()
\ No newline at end of file
+@contextmanager
+def override_settings(**values):
+    """Substitui valores temporariamente (testes e benchmarks)"""
+    previous = set_settings(_current.replace(**values))
+    try:
+        yield _current
+    finally:
+        set_settings(previous)
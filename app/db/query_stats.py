@@ -0,0 +1,90 @@
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.utils.logger import logger
+from app.utils.metrics import route_label
+from app.utils.tracing import current_span, tracer
+
+@dataclass
+class QueryStats:
+    """Consultas SQL executadas durante uma requisição"""
+    count: int = 0
+    seconds: float = 0.0
+    scope: Optional[dict] = field(default=None, repr=False)  # Requisição ASGI, para identificar a rota
+
+    @property
+    def route(self) -> str:
+        if self.scope is None:
+            return "<fora de requisição>"
+        return route_label(self.scope)
+
+# Estatísticas da requisição atual; o objeto é compartilhado com as threads
+# do threadpool, que recebem uma cópia do contexto
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def start_request_stats(scope: Optional[dict] = None) -> QueryStats:
+    """Inicia a contagem de consultas para a requisição atual"""
+    stats = QueryStats(scope=scope)
+    _current_stats.set(stats)
+    return stats
+
+def current_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|(?<![:\w]):\w+|\$\d+|\?")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def normalize_sql(statement: str) -> str:
+    """
+    Forma canônica da consulta, sem valores literais nem parâmetros, para que
+    execuções da mesma consulta apareçam iguais no log (ex: IN (?, ?, ?) vira IN (...))
+    """
+    statement = _STRING_RE.sub("?", statement)
+    statement = _PARAM_RE.sub("?", statement)
+    statement = _NUMBER_RE.sub("?", statement)
+    statement = _LIST_RE.sub("(...)", statement)
+    return _WHITESPACE_RE.sub(" ", statement).strip()
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+
+    threshold = settings.SLOW_QUERY_MS
+    if threshold > 0 and elapsed * 1000 >= threshold:
+        route = stats.route if stats is not None else "<fora de requisição>"
+        logger.warning("Consulta lenta (%.1f ms) em %s: %s", elapsed * 1000, route, normalize_sql(statement))
+
+    if current_span() is not None:
+        # Span registrado depois da execução, com o início recalculado pela duração
+        end_ns = time.time_ns()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+        tracer.start_span(operation, kind="CLIENT", start_ns=end_ns - int(elapsed * 1e9), attributes={
+            "db.system": conn.dialect.name,
+            "db.operation": operation,
+            "db.statement": normalize_sql(statement),
+        }).end(end_ns)
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # Consultas com erro não passam pelo after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started_at"):
+        connection.info["query_started_at"].pop()
@@ -0,0 +1,79 @@
+import zlib
+from typing import Optional, Union
+
+from sqlalchemy.types import TypeDecorator, LargeBinary
+
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # zstd é opcional; sem ele usamos zlib
+    zstandard = None
+
+# Primeiro byte do valor armazenado, identificando o formato
+HEADER_RAW = b"\x00"
+HEADER_ZLIB = b"\x01"
+HEADER_ZSTD = b"\x02"
+
+def _codec() -> str:
+    if settings.TEXT_COMPRESSION_CODEC == "zstd" and zstandard is not None:
+        return "zstd"
+    return "zlib"
+
+def compress_text(value: str, threshold: Optional[int] = None) -> bytes:
+    """
+    Codifica um texto para armazenamento. Textos acima do limite são comprimidos
+    quando a compressão de fato reduz o tamanho.
+    """
+    raw = value.encode("utf-8")
+    threshold = settings.TEXT_COMPRESSION_THRESHOLD if threshold is None else threshold
+    if len(raw) < threshold:
+        return HEADER_RAW + raw
+
+    if _codec() == "zstd":
+        compressed = HEADER_ZSTD + zstandard.ZstdCompressor(level=settings.TEXT_COMPRESSION_LEVEL).compress(raw)
+    else:
+        compressed = HEADER_ZLIB + zlib.compress(raw, min(settings.TEXT_COMPRESSION_LEVEL, 9))
+
+    return compressed if len(compressed) < len(raw) else HEADER_RAW + raw
+
+def decompress_text(value: Union[bytes, memoryview, str, None]) -> Optional[str]:
+    """
+    Decodifica um valor armazenado. Linhas antigas, gravadas como texto puro
+    (ou convertidas para bytea sem cabeçalho), são lidas sem alteração.
+    """
+    if value is None or isinstance(value, str):
+        return value
+
+    data = bytes(value)
+    header, payload = data[:1], data[1:]
+    if header == HEADER_RAW:
+        return payload.decode("utf-8")
+    if header == HEADER_ZLIB:
+        return zlib.decompress(payload).decode("utf-8")
+    if header == HEADER_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Valor comprimido com zstd, mas o pacote zstandard não está instalado")
+        return zstandard.ZstdDecompressor().decompress(payload).decode("utf-8")
+    return data.decode("utf-8")
+
+class _StoredBinary(LargeBinary):
+    """Binário sem conversão na leitura: linhas antigas podem vir como str"""
+    def result_processor(self, dialect, coltype):
+        return None
+
+class CompressedText(TypeDecorator):
+    """
+    Coluna de texto armazenada comprimida (zlib, ou zstd se disponível)
+    quando ultrapassa TEXT_COMPRESSION_THRESHOLD bytes.
+    """
+    impl = _StoredBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
@@ -1,50 +1,158 @@
-from fastapi import FastAPI, Depends, HTTPException
+import time
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from starlette.responses import FileResponse
+from fastapi.responses import PlainTextResponse
 
 import os
-from dotenv import load_dotenv
 
 from app.api.api import api_router
-from app.core.config import settings
+from app.api.endpoints import health
+from app.core.config import install_reload_signal, settings
 from app.db.session import create_tables
-
-# Carregar variáveis de ambiente
-load_dotenv()
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.query_stats import QueryStatsMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.request_id import RequestIdMiddleware
+from app.middleware.tracing import TracingMiddleware
+from app.services.ai_service import ai_health
+from app.services.extraction_service import shutdown_executor
+from app.services.health_service import health_service
+from app.services.usage_service import usage_recorder
+from app.utils import metrics
+from app.utils.fast_json import TracedJSONResponse
+from app.utils.tracing import tracer
+from app.utils.startup import startup_report
+from app.utils.static_assets import AssetManifest, serve_asset
 
 app = FastAPI(
     title="LawAI API",
     description="API de backend para a plataforma LawAI de inteligência jurídica",
     version="1.0.0",
+    default_response_class=TracedJSONResponse,
 )
 
-# Configurar CORS
+# Limitar requisições por usuário e rota antes de qualquer trabalho no banco ou na IA
+app.add_middleware(RateLimitMiddleware, prefix=settings.API_V1_STR)
+
+# Comprimir respostas grandes (listas, análises da IA) conforme o Accept-Encoding
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
+# Amostragem das requisições de rotas marcadas pelo endpoint de profiling
+app.add_middleware(ProfilingMiddleware)
+
+# Métricas de latência, status e consultas SQL por rota
+app.add_middleware(MetricsMiddleware)
+
+# Consultas SQL e tempo de banco por requisição (Server-Timing em desenvolvimento)
+app.add_middleware(QueryStatsMiddleware)
+
+# Span raiz das requisições amostradas (autenticação, SQL, IA e serialização aninhados)
+app.add_middleware(TracingMiddleware)
+
+# ID da requisição nos logs e no cabeçalho X-Request-ID
+app.add_middleware(RequestIdMiddleware)
+
+# Configurar CORS (adicionado por último para envolver também as respostas 429)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Em produção, especifique os domínios permitidos
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
 
 # Incluir as rotas da API
 app.include_router(api_router, prefix="/api")
 
-# Servir arquivos estáticos (frontend React)
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Métricas no formato do Prometheus (fora do prefixo da API, sem limite de requisições)
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if settings.METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {settings.METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Não autorizado")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Sondas de liveness e readiness (fora do prefixo da API, sem autenticação nem limite de requisições)
+app.include_router(health.router, prefix="/health", include_in_schema=False)
+
+# Índice dos arquivos estáticos do frontend React, montado na inicialização
+static_manifest = AssetManifest(settings.STATIC_DIR)
 
 # Rota para o frontend (SPA)
-@app.get("/{full_path:path}")
-async def serve_frontend(full_path: str):
-    if os.path.exists(os.path.join("static", full_path)):
-        return FileResponse(os.path.join("static", full_path))
-    return FileResponse("static/index.html")
+@app.get("/{full_path:path}", include_in_schema=False)
+async def serve_frontend(request: Request, full_path: str):
+    # Rotas inexistentes da API devem responder 404, e não o index.html
+    api_prefix = settings.API_V1_STR.strip("/")
+    if full_path == api_prefix or full_path.startswith(api_prefix + "/"):
+        raise HTTPException(status_code=404, detail="Not Found")
+    
+    # Compatibilidade com o antigo prefixo /static
+    key = full_path[len("static/"):] if full_path.startswith("static/") else full_path
+    asset = static_manifest.get(key)
+    if asset:
+        return serve_asset(request, asset)
+    
+    # Arquivos inexistentes não recebem o fallback da SPA
+    if os.path.splitext(key)[1]:
+        raise HTTPException(status_code=404, detail="Arquivo não encontrado")
+    
+    index = static_manifest.get("index.html")
+    if not index:
+        raise HTTPException(status_code=404, detail="Frontend não encontrado")
+    return serve_asset(request, index)
 
 @app.on_event("startup")
 async def startup_event():
-    # Criar as tabelas no banco de dados
-    create_tables()
+    # Criar as tabelas no banco de dados (dispensável quando o esquema vem de migrações)
+    if settings.DB_CREATE_TABLES:
+        with startup_report.step("create_tables"):
+            create_tables()
+    
+    # Indexar os arquivos estáticos do frontend
+    with startup_report.step("static_manifest"):
+        static_manifest.build()
+    
+    # Gravar periodicamente o consumo de tokens da IA
+    usage_recorder.start()
+    
+    # Monitorar o atraso do event loop e compartilhar as métricas entre workers
+    metrics.background.start()
+    
+    # Exportar os spans em lotes
+    tracer.exporter.start()
+    
+    # Sondar a IA (listagem de modelos) apenas quando não houver chamadas reais
+    ai_health.start()
+    
+    # Recarregar as configurações do .env com SIGHUP, sem reiniciar o worker
+    install_reload_signal()
+    
+    startup_report.ready()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # A readiness passa a responder 503 enquanto o worker encerra
+    health_service.draining = True
+    
+    # Encerrar o pool de processos de extração de texto
+    shutdown_executor()
+    
+    # Gravar o consumo de tokens ainda pendente
+    await usage_recorder.stop()
+    
+    metrics.background.stop()
+    
+    ai_health.stop()
+    
+    await tracer.exporter.stop()
+
+startup_report.record("import app.main", time.perf_counter() - _import_started)
 
 if __name__ == "__main__":
     import uvicorn
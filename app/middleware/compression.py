@@ -0,0 +1,162 @@
+import zlib
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Tipos que já chegam comprimidos ou não se beneficiam de compressão
+_EXCLUDED_PREFIXES = ("image/", "video/", "audio/", "font/woff")
+_EXCLUDED_TYPES = {
+    "application/zip", "application/gzip", "application/x-gzip", "application/pdf",
+    "application/octet-stream", "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/x-7z-compressed", "application/x-rar-compressed",
+}
+# Respostas em fluxo que não podem ser retidas nem reagrupadas
+_STREAMING_TYPES = {"text/event-stream"}
+
+def accepted_encodings(header: str) -> set:
+    """Codificações aceitas no Accept-Encoding (ignorando as marcadas com q=0)"""
+    accepted = set()
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(name.strip().lower())
+    return accepted
+
+def choose_encoding(header: str) -> Optional[str]:
+    accepted = accepted_encodings(header)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if not media_type or media_type in _STREAMING_TYPES or media_type in _EXCLUDED_TYPES:
+        return False
+    if media_type == "image/svg+xml":
+        return True
+    return not media_type.startswith(_EXCLUDED_PREFIXES)
+
+class _Compressor:
+    """Compressor incremental com a mesma interface para gzip e brotli"""
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        if self.encoding == "br":
+            output = self._compressor.process(data)
+            return output + self._compressor.flush() if flush else output
+        output = self._compressor.compress(data)
+        return output + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else output
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.finish()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH)
+
+def _get_header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[str]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+def _without(headers: List[Tuple[bytes, bytes]], *names: bytes) -> List[Tuple[bytes, bytes]]:
+    return [(key, value) for key, value in headers if key.lower() not in names]
+
+def _add_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    vary = _get_header(headers, b"vary")
+    if vary is None:
+        return headers + [(b"vary", b"Accept-Encoding")]
+    if "accept-encoding" in vary.lower():
+        return headers
+    return _without(headers, b"vary") + [(b"vary", f"{vary}, Accept-Encoding".encode("latin-1"))]
+
+class CompressionMiddleware:
+    """
+    Compressão gzip/brotli negociada pelo Accept-Encoding.
+    Respostas de um único bloco abaixo de `minimum_size` seguem sem compressão;
+    respostas em vários blocos são comprimidas bloco a bloco, sem reter o corpo.
+    Não toca em SSE, respostas parciais (Range) nem conteúdo já comprimido.
+    """
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = dict(scope.get("headers", []))
+        encoding = choose_encoding(request_headers.get(b"accept-encoding", b"").decode("latin-1"))
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                eligible = (
+                    message["status"] not in (204, 206, 304)
+                    and _get_header(headers, b"content-encoding") is None
+                    and _get_header(headers, b"content-range") is None
+                    and is_compressible(_get_header(headers, b"content-type") or "")
+                )
+                if not eligible:
+                    passthrough = True
+                    await send(message)
+                    return
+                headers = _add_vary(headers)
+                if encoding is None:
+                    passthrough = True
+                    await send(dict(message, headers=headers))
+                    return
+                # Aguarda o primeiro bloco do corpo para decidir
+                start_message = dict(message, headers=headers)
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = start_message["headers"]
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding)
+                headers = _without(headers, b"content-length") + [(b"content-encoding", encoding.encode())]
+                if not more_body:
+                    compressed = compressor.finish(body)
+                    headers.append((b"content-length", str(len(compressed)).encode()))
+                    await send(dict(start_message, headers=headers))
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                await send(dict(start_message, headers=headers))
+
+            if more_body:
+                # Descarrega a cada bloco para o cliente receber os dados sem esperar o fim
+                await send({"type": "http.response.body", "body": compressor.compress(body, flush=True), "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": compressor.finish(body)})
+
+        await self.app(scope, receive, send_wrapper)
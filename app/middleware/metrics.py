@@ -0,0 +1,45 @@
+import time
+
+from app.core.config import settings
+from app.db.query_stats import current_stats, start_request_stats
+from app.utils import metrics
+from app.utils.startup import startup_report
+
+class MetricsMiddleware:
+    """
+    Registra contagem, latência e consultas SQL de cada requisição, agrupadas
+    pelo padrão da rota (ex: /api/cases/{case_id}) para limitar a cardinalidade.
+    """
+    def __init__(self, app, exclude_paths=("/metrics",)):
+        self.app = app
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        # Reaproveita a contagem iniciada pelo QueryStatsMiddleware, se houver
+        stats = current_stats() or start_request_stats(scope)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            metrics.http_exceptions.inc(scope["method"], metrics.route_label(scope))
+            raise
+        finally:
+            route = metrics.route_label(scope)
+            metrics.http_requests.inc(scope["method"], route, str(status_code))
+            metrics.http_request_duration.observe(time.perf_counter() - started, scope["method"], route)
+            metrics.db_queries_per_request.observe(stats.count, route)
+            metrics.db_time_per_request.observe(stats.seconds, route)
+            if startup_report.first_request_seconds is None:
+                startup_report.first_request()
@@ -0,0 +1,27 @@
+from app.utils.profiling import StackSampler, profiler
+
+class ProfilingMiddleware:
+    """
+    Amostra as pilhas durante as requisições de rotas marcadas para captura pelo
+    endpoint de profiling. Sem capturas pendentes, apenas repassa a requisição.
+    Amostras de outras requisições simultâneas no mesmo worker também entram no perfil.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiler.route_captures:
+            await self.app(scope, receive, send)
+            return
+
+        capture = profiler.match(scope["path"])
+        if capture is None:
+            await self.app(scope, receive, send)
+            return
+
+        sampler = StackSampler(capture.interval).start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            capture.samples.update(sampler.stop())
+            capture.captured += 1
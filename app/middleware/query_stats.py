@@ -0,0 +1,37 @@
+import time
+
+from app.core.config import settings
+from app.db.query_stats import start_request_stats
+
+class QueryStatsMiddleware:
+    """
+    Conta as consultas SQL e o tempo de banco de cada requisição. Com
+    SERVER_TIMING_ENABLED, os valores seguem no cabeçalho Server-Timing e
+    aparecem na aba de rede do navegador.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats = start_request_stats(scope)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and settings.SERVER_TIMING_ENABLED:
+                total_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={stats.seconds * 1000:.2f};desc="{stats.count} consultas", '
+                    f"app;dur={total_ms:.2f}"
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.encode("latin-1")))
+                # Permite ao frontend em outra origem ler os tempos pela Performance API
+                headers.append((b"timing-allow-origin", b"*"))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
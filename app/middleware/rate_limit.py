@@ -0,0 +1,327 @@
+import json
+import math
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import on_reload, settings
+from app.utils.logger import logger
+from app.utils.security import verify_token
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+@dataclass(frozen=True)
+class Rate:
+    """Limite de um token bucket: `capacity` requisições, repostas ao longo de `period` segundos"""
+    capacity: int
+    period: float
+
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.period
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        """Converte textos como "20/minute" ou "5/second" """
+        amount, _, period = value.strip().partition("/")
+        if period not in _PERIODS:
+            raise ValueError(f"Período de limite inválido: {value}")
+        return cls(capacity=int(amount), period=_PERIODS[period])
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    prefix: str
+    rate: Rate
+
+def parse_rules(value: str) -> List[RateLimitRule]:
+    """Lê as regras no formato "prefixo=limite;prefixo=limite" """
+    rules = []
+    for item in value.split(";"):
+        if item.strip():
+            prefix, _, rate = item.partition("=")
+            rules.append(RateLimitRule(prefix=prefix.strip(), rate=Rate.parse(rate)))
+    # Prefixos mais longos primeiro, para que a regra mais específica prevaleça
+    return sorted(rules, key=lambda rule: len(rule.prefix), reverse=True)
+
+# Backends de armazenamento dos buckets
+# consume() retorna (permitido, fichas restantes após a requisição); um custo
+# negativo devolve fichas, sem passar da capacidade
+
+class MemoryBackend:
+    """
+    Buckets em memória; adequado para um único processo. Guarda no máximo `max_keys`
+    buckets e descarta os usados há mais tempo (LRU), em O(1) por requisição mesmo sob
+    uma varredura de muitos IPs. Um bucket descartado volta cheio, como um cliente novo.
+    """
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def consume(self, key: str, rate: Rate, cost: float = 1.0) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (rate.capacity, now))
+            tokens = min(rate.capacity, tokens + (now - updated) * rate.refill_rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens = min(rate.capacity, tokens - cost)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+class SQLiteBackend:
+    """
+    Buckets em um arquivo SQLite compartilhado pelos workers da mesma máquina.
+    Substituto local do backend Redis para implantações com vários workers sem Redis.
+    Linhas paradas há mais que o maior período são apagadas a cada `prune_interval`
+    segundos: esses buckets já estariam cheios, como o de um cliente novo.
+    """
+    # Após o maior período sem uso, qualquer bucket está cheio
+    IDLE_SECONDS = max(_PERIODS.values())
+
+    def __init__(self, path: str, prune_interval: float = 60.0):
+        self.path = path
+        self.prune_interval = prune_interval
+        self._pruned_at = 0.0
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS buckets_updated ON buckets (updated)")
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _consume(self, key: str, rate: Rate, cost: float) -> Tuple[bool, float]:
+        connection = self._connect()
+        now = time.time()
+        # BEGIN IMMEDIATE serializa a leitura e a escrita entre processos
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (rate.capacity, now)
+            tokens = min(rate.capacity, tokens + max(0.0, now - updated) * rate.refill_rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens = min(rate.capacity, tokens - cost)
+            connection.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                (key, tokens, now)
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        if now - self._pruned_at >= self.prune_interval:
+            self._prune(now)
+        return allowed, tokens
+
+    def _prune(self, now: float) -> None:
+        self._pruned_at = now
+        removed = self._connect().execute(
+            "DELETE FROM buckets WHERE updated < ?", (now - self.IDLE_SECONDS,)
+        ).rowcount
+        if removed:
+            logger.debug("Removidos %s buckets de limite sem uso", removed)
+
+    async def consume(self, key: str, rate: Rate, cost: float = 1.0) -> Tuple[bool, float]:
+        return await run_in_threadpool(self._consume, key, rate, cost)
+
+    def reset(self) -> None:
+        self._connect().execute("DELETE FROM buckets")
+
+# Atualização atômica do bucket no Redis, usando o relógio do próprio servidor
+_REDIS_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(data[1]) or capacity
+local updated = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = math.min(capacity, tokens - cost)
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+class RedisBackend:
+    """Buckets no Redis, compartilhados por todos os workers e instâncias"""
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("O backend de limite 'redis' requer o pacote redis")
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(_REDIS_SCRIPT)
+
+    async def consume(self, key: str, rate: Rate, cost: float = 1.0) -> Tuple[bool, float]:
+        allowed, tokens = await self._script(keys=[f"ratelimit:{key}"], args=[rate.capacity, rate.refill_rate, cost])
+        return bool(allowed), float(tokens)
+
+    def reset(self) -> None:
+        pass
+
+def get_rate_limit_backend():
+    """Cria o backend configurado em RATE_LIMIT_BACKEND"""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisBackend(settings.RATE_LIMIT_REDIS_URL)
+    if settings.RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteBackend(settings.RATE_LIMIT_SQLITE_PATH)
+    return MemoryBackend()
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int  # Segundos até o bucket mais restritivo voltar a encher
+    retry_after: int = 0
+
+class RateLimiter:
+    """Aplica o bucket geral do usuário e o bucket da regra de rota correspondente"""
+    def __init__(self, backend, default: Rate, rules: List[RateLimitRule]):
+        self.backend = backend
+        self.default = default
+        self.rules = rules
+
+    def match(self, path: str) -> Optional[RateLimitRule]:
+        for rule in self.rules:
+            if path.startswith(rule.prefix):
+                return rule
+        return None
+
+    async def check(self, identity: str, path: str) -> RateLimitResult:
+        # O bucket geral primeiro: uma requisição barrada nele não gasta a cota da rota
+        buckets = [(identity, self.default)]
+        rule = self.match(path)
+        if rule:
+            buckets.append((f"{identity}:{rule.prefix}", rule.rate))
+
+        result = None
+        for key, rate in buckets:
+            allowed, tokens = await self.backend.consume(key, rate)
+            current = RateLimitResult(
+                allowed=allowed,
+                limit=rate.capacity,
+                remaining=max(0, math.floor(tokens)),
+                reset=math.ceil((rate.capacity - tokens) / rate.refill_rate),
+                retry_after=0 if allowed else math.ceil((1 - tokens) / rate.refill_rate)
+            )
+            if not allowed:
+                if result is not None:
+                    # O bucket da rota esgotado não consome o bucket geral: devolve a ficha
+                    await self.backend.consume(identity, self.default, cost=-1.0)
+                return current
+            if result is None or current.remaining < result.remaining:
+                result = current
+        return result
+
+    def reset(self) -> None:
+        self.backend.reset()
+
+limiter = RateLimiter(
+    get_rate_limit_backend(),
+    Rate.parse(settings.RATE_LIMIT_DEFAULT),
+    parse_rules(settings.RATE_LIMIT_RULES)
+)
+
+@on_reload
+def _reload_rules(previous, new) -> None:
+    # Os buckets existentes são mantidos; só os limites mudam
+    limiter.default = Rate.parse(new.RATE_LIMIT_DEFAULT)
+    limiter.rules = parse_rules(new.RATE_LIMIT_RULES)
+
+def _identity(scope) -> str:
+    """Identifica o usuário pelo token (sem consultar o banco) ou, sem token válido, pelo IP"""
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                try:
+                    return f"user:{verify_token(token)}"
+                except HTTPException:
+                    pass
+            break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+def _headers(result: RateLimitResult) -> List[Tuple[bytes, bytes]]:
+    headers = [
+        (b"ratelimit-limit", str(result.limit).encode()),
+        (b"ratelimit-remaining", str(result.remaining).encode()),
+        (b"ratelimit-reset", str(result.reset).encode()),
+    ]
+    if not result.allowed:
+        headers.append((b"retry-after", str(result.retry_after).encode()))
+    return headers
+
+class RateLimitMiddleware:
+    """
+    Middleware ASGI que aplica os limites antes de qualquer acesso ao banco ou à IA.
+    Apenas rotas da API são limitadas; arquivos estáticos passam direto.
+    """
+    def __init__(self, app, prefix: str = "/api"):
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or not scope["path"].startswith(self.prefix)
+            or scope["method"] == "OPTIONS"
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            result = await limiter.check(_identity(scope), scope["path"])
+        except Exception as e:
+            # Falha no backend compartilhado não deve derrubar a API
+            logger.error("Erro ao verificar limite de requisições: %s", e)
+            await self.app(scope, receive, send)
+            return
+
+        headers = _headers(result)
+        if not result.allowed:
+            body = json.dumps({"detail": "Limite de requisições excedido. Tente novamente mais tarde."}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())] + headers
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = dict(message, headers=list(message.get("headers", [])) + headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,37 @@
+import re
+import uuid
+
+from app.utils.logger import request_id_context
+
+# IDs recebidos de proxies e clientes são aceitos apenas neste formato
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+class RequestIdMiddleware:
+    """
+    Associa um ID a cada requisição (o X-Request-ID recebido, se válido, ou um novo),
+    incluído nos logs registrados durante a requisição e devolvido na resposta
+    """
+    def __init__(self, app, header_name: str = "x-request-id"):
+        self.app = app
+        self.header_name = header_name.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        received = dict(scope.get("headers", [])).get(self.header_name, b"").decode("latin-1")
+        request_id = received if _VALID_REQUEST_ID.match(received) else uuid.uuid4().hex
+        token = request_id_context.set(request_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((self.header_name, request_id.encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_context.reset(token)
@@ -0,0 +1,42 @@
+from app.utils.metrics import route_label
+from app.utils.tracing import tracer
+
+class TracingMiddleware:
+    """
+    Abre o span raiz de cada requisição amostrada. Os spans de autenticação, SQL,
+    chamadas à IA e serialização ficam aninhados nele. Um traceparent recebido
+    (W3C) continua o trace de quem chamou e mantém sua decisão de amostragem.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers", []))
+        traceparent = headers.get(b"traceparent", b"").decode("latin-1") or None
+        span = tracer.start_trace(
+            f"{scope['method']} {scope['path']}", traceparent,
+            attributes={"http.request.method": scope["method"], "url.path": scope["path"]}
+        )
+        if not span.recording:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.response.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.set_status("ERROR")
+            await send(message)
+
+        with span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # O nome final usa o padrão da rota, conhecido só após o roteamento
+                route = route_label(scope)
+                span.name = f"{scope['method']} {route}"
+                span.set_attribute("http.route", route)
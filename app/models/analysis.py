@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+from app.db.types import CompressedText
+
+class DocumentAnalysisCache(Base):
+    """
+    Análises por seção de cada documento (hashes e textos em JSON), para reanalisar
+    apenas o que mudou. Fica fora de `documents`, que é compartilhada com o servidor Node.
+    """
+    __tablename__ = "document_analysis_sections"
+
+    document_id = Column(String, ForeignKey("documents.id"), primary_key=True)
+    sections = Column(CompressedText, nullable=True)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+from app.db.types import CompressedText
+
+class Blob(Base):
+    """Modelo para arquivos armazenados por conteúdo (endereçados pelo SHA-256)"""
+    __tablename__ = "blobs"
+
+    sha256 = Column(String, primary_key=True, index=True)
+    size = Column(BigInteger)
+    content_type = Column(String, nullable=True)
+    ref_count = Column(Integer, default=0)  # Quantidade de documentos que referenciam o arquivo
+    extracted_text = Column(CompressedText, nullable=True)  # Cache do texto extraído (PDF/DOCX)
+    created_at = Column(DateTime, default=func.now())
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, String, Text, DateTime, ForeignKey
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 
 from app.db.session import Base
@@ -9,12 +10,15 @@ class Document(Base):
 
     id = Column(String, primary_key=True, index=True)
     title = Column(String, index=True)
-    content = Column(Text, nullable=True)
+    # Colunas grandes carregadas apenas quando acessadas. Ficam como texto puro: a tabela
+    # é compartilhada com o servidor Node (shared/schema.ts), que lê e grava strings. No
+    # PostgreSQL a compressão é a do próprio banco (lz4, ver scripts/compress_text_columns.py)
+    content = deferred(Column(Text, nullable=True))
     file_type = Column(String)
     file_info = Column(String, nullable=True)
     status = Column(String, default="draft")
     client_name = Column(String, nullable=True)
     document_type = Column(String, nullable=True)
-    analysis = Column(Text, nullable=True)
+    analysis = deferred(Column(Text, nullable=True))
     created_at = Column(DateTime, default=func.now())
     user_id = Column(String, ForeignKey("users.id"))
\ No newline at end of file
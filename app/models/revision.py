@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, UniqueConstraint
+from sqlalchemy.orm import deferred
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+from app.db.types import CompressedText
+
+class DocumentRevision(Base):
+    """Modelo para o histórico de versões do conteúdo de documentos"""
+    __tablename__ = "document_revisions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(String, ForeignKey("documents.id"), index=True)
+    version = Column(Integer)
+    is_snapshot = Column(Boolean, default=False)  # Cópia completa ou delta da versão anterior
+    base_version = Column(Integer)  # Versão do snapshot a partir do qual esta versão é reconstruída
+    data = deferred(Column(CompressedText))  # Texto completo (snapshot) ou delta em JSON
+    size = Column(Integer, default=0)  # Tamanho do conteúdo reconstruído, em caracteres
+    content_hash = Column(String(64), nullable=True)  # SHA-256 do conteúdo reconstruído
+    created_at = Column(DateTime, default=func.now())
+    user_id = Column(String, ForeignKey("users.id"))
+
+    __table_args__ = (
+        UniqueConstraint("document_id", "version", name="uq_document_revisions_version"),
+    )
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+from app.db.types import CompressedText
+
+class SearchEntry(Base):
+    """Entrada do índice de busca textual (documento, processo ou cliente)"""
+    __tablename__ = "search_entries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity_type = Column(String, index=True)  # document, case, client
+    entity_id = Column(String, index=True)
+    user_id = Column(String, ForeignKey("users.id"), index=True)
+    title = Column(String, nullable=True)
+    body = Column(CompressedText, nullable=True)  # Usado na montagem dos trechos destacados
+    length = Column(Integer, default=0)  # Quantidade de termos, usada na normalização do ranking
+    # Vetor de busca do PostgreSQL; nos demais bancos é usado o índice invertido (SearchPosting)
+    tsv = Column(Text().with_variant(TSVECTOR(), "postgresql"), nullable=True)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("entity_type", "entity_id", name="uq_search_entries_entity"),
+        Index("ix_search_entries_tsv", "tsv", postgresql_using="gin"),
+    )
+
+class SearchPosting(Base):
+    """Índice invertido embutido: frequência de cada termo por entrada"""
+    __tablename__ = "search_postings"
+
+    term = Column(String, primary_key=True)
+    entry_id = Column(Integer, ForeignKey("search_entries.id", ondelete="CASCADE"), primary_key=True, index=True)
+    tf = Column(Integer, default=1)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey
+
+from app.db.session import Base
+
+class Subscription(Base):
+    """Modelo para as assinaturas dos usuários (tabela compartilhada com o frontend)"""
+    __tablename__ = "subscriptions"
+
+    id = Column(String, primary_key=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    plan_id = Column(String, nullable=False)  # basic, professional, enterprise
+    status = Column(String, nullable=False)  # active, canceled, expired
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+class RefreshToken(Base):
+    """Modelo para os refresh tokens emitidos (apenas o hash do token é armazenado)"""
+    __tablename__ = "refresh_tokens"
+
+    id = Column(String, primary_key=True, index=True)  # SHA-256 do token
+    user_id = Column(String, ForeignKey("users.id"), index=True)
+    family_id = Column(String, index=True)  # Cadeia de rotações iniciada em um login
+    access_jti = Column(String, nullable=True)  # Access token emitido junto com este refresh token
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=func.now())
+    used_at = Column(DateTime, nullable=True)  # Preenchido quando o token é trocado por um novo
+    revoked_at = Column(DateTime, nullable=True)
+
+class RevokedToken(Base):
+    """Modelo para os access tokens revogados antes de expirar"""
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String, primary_key=True)
+    user_id = Column(String, ForeignKey("users.id"), index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)  # Após essa data a entrada pode ser descartada
+    revoked_at = Column(DateTime, nullable=False, index=True)
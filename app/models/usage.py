@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, UniqueConstraint
+
+from app.db.session import Base
+
+class AIUsage(Base):
+    """Modelo para o consumo de tokens da IA, agregado por usuário, dia, endpoint e modelo"""
+    __tablename__ = "ai_usage"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("users.id"), index=True, nullable=True)  # Nulo para chamadas internas
+    day = Column(Date, nullable=False, index=True)
+    endpoint = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    requests = Column(Integer, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", "endpoint", "model", name="uq_ai_usage_bucket"),
+    )
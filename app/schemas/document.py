@@ -41,4 +41,24 @@ class Document(DocumentBase):
 
 # Esquema para lista de documentos
 class DocumentList(BaseModel):
-    documents: list[Document]
\ No newline at end of file
+    documents: list[Document]
+
+# Esquema resumido para listagens (sem o conteúdo completo)
+class DocumentSummary(BaseModel):
+    id: str
+    title: str
+    status: Optional[str] = None
+    document_type: Optional[str] = None
+    client_name: Optional[str] = None
+    created_at: datetime
+    created_ago: Optional[str] = None
+    # Campos opcionais, incluídos apenas quando solicitados via `fields`
+    content: Optional[str] = None
+    analysis: Optional[str] = None
+    file_type: Optional[str] = None
+    file_info: Optional[str] = None
+    user_id: Optional[str] = None
+
+# Esquema para lista resumida de documentos
+class DocumentSummaryList(BaseModel):
+    documents: list[DocumentSummary]
\ No newline at end of file
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Optional
+
+# Esquema para resposta de emissão de tokens
+class Token(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int  # Validade do access token, em segundos
+
+# Esquema para renovação de tokens
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+# Esquema para encerramento de sessão
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
@@ -0,0 +1,263 @@
+"""
+Servidor de produção: um processo supervisor abre o socket e mantém N workers
+uvicorn, criados por fork. Com SERVER_PRELOAD a aplicação é importada antes do
+fork, então os workers sobem mais rápido e compartilham a memória do código.
+
+No SIGTERM (ou SIGINT) os workers param de aceitar conexões, a readiness passa a
+responder 503 e as requisições em andamento (ex: chamadas à IA) têm até
+SERVER_GRACEFUL_TIMEOUT segundos para terminar. O SIGHUP é repassado aos
+workers, que recarregam as configurações do .env.
+
+Uso: python -m app.server [--host 0.0.0.0] [--port 5000] [--workers N]
+"""
+import os
+import sys
+import math
+import time
+import signal
+import socket
+import argparse
+from typing import Optional, Set
+
+import uvicorn
+
+from app.core.config import Settings, get_settings, set_settings, settings
+from app.utils import metrics
+from app.utils.logger import logger, stop_listener
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """Limite de CPU do container (cgroup v2 ou v1), se houver"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as source:
+            quota, period = source.read().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as source:
+            quota = int(source.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as source:
+            period = int(source.read())
+        return quota / period if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+def available_cpus() -> int:
+    """CPUs que o processo pode usar: afinidade e limite do cgroup, não o total da máquina"""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit:
+        count = min(count, math.ceil(limit))
+    return max(count, 1)
+
+def worker_count() -> int:
+    # A aplicação é assíncrona: um worker por CPU basta; mais workers só multiplicam os pools de conexões
+    if settings.SERVER_WORKERS:
+        return settings.SERVER_WORKERS
+    return min(available_cpus(), settings.SERVER_MAX_WORKERS)
+
+def server_options() -> dict:
+    return {
+        "host": settings.SERVER_HOST,
+        "port": settings.SERVER_PORT,
+        "backlog": settings.SERVER_BACKLOG,
+        "timeout_keep_alive": math.ceil(settings.SERVER_KEEPALIVE_SECONDS),
+        "timeout_graceful_shutdown": math.ceil(settings.SERVER_GRACEFUL_TIMEOUT),
+        "limit_concurrency": settings.SERVER_LIMIT_CONCURRENCY or None,
+        # Os logs do uvicorn seguem pela configuração da aplicação (JSON, fila)
+        "log_config": None,
+        "access_log": False,
+        "lifespan": "on",
+    }
+
+class WorkerServer(uvicorn.Server):
+    def handle_exit(self, sig, frame) -> None:
+        # Sai da readiness antes de esperar as conexões abertas terminarem
+        from app.services.health_service import health_service
+
+        health_service.draining = True
+        super().handle_exit(sig, frame)
+
+def bind_socket(config: uvicorn.Config) -> socket.socket:
+    sock = config.bind_socket()
+    if sock.family in (socket.AF_INET, socket.AF_INET6) and sock.proto == 0:
+        # O asyncio só liga o TCP_NODELAY nas conexões aceitas de sockets com proto TCP; sem ele,
+        # Nagle e o ACK atrasado somam ~40 ms às respostas em conexões keep-alive
+        sock = socket.socket(sock.family, sock.type, socket.IPPROTO_TCP, fileno=sock.detach())
+        sock.set_inheritable(True)
+    return sock
+
+def _serve_worker(config: uvicorn.Config, sock: socket.socket) -> None:
+    # O uvicorn reenvia o sinal recebido ao terminar; sem efeito aqui, o worker sai normalmente
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda signum, frame: None)
+    # Ignorado até o evento de startup instalar a recarga das configurações
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    if "app.db.session" in sys.modules:
+        # Conexões abertas antes do fork não podem ser compartilhadas entre processos
+        from app.db.session import engine
+        engine.dispose(close=False)
+    WorkerServer(config).run(sockets=[sock])
+
+class Supervisor:
+    """Cria os workers, recria os que morrem e coordena o encerramento"""
+    def __init__(self, config: uvicorn.Config, sock: socket.socket, workers: int):
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self.children: Set[int] = set()
+        self.stopping = False
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _serve_worker(self.config, self.sock)
+            except BaseException as e:
+                logger.exception("Worker %s encerrado com erro: %s", os.getpid(), e)
+                code = 1
+            finally:
+                # Esvazia a fila de logs; os._exit evita executar o código do supervisor no filho
+                stop_listener()
+                os._exit(code)
+        self.children.add(pid)
+
+    def reap(self) -> int:
+        """Recolhe os workers encerrados e devolve quantos eram"""
+        finished = 0
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                break
+            if pid == 0:
+                break
+            if pid in self.children:
+                self.children.discard(pid)
+                finished += 1
+                # Um worker que morreu sem encerrar deixa o arquivo de métricas; o PID pode ser reutilizado
+                metrics.retire_snapshot(pid)
+                if not self.stopping:
+                    logger.warning("Worker %s terminou (código %s); criando outro", pid, os.waitstatus_to_exitcode(status))
+        return finished
+
+    def _stop(self, signum, frame) -> None:
+        self.stopping = True
+
+    def _forward(self, signum, frame) -> None:
+        self.signal_children(signum)
+
+    def signal_children(self, signum: int) -> None:
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                self.children.discard(pid)
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGHUP, self._forward)
+        for _ in range(self.workers):
+            self.spawn()
+        logger.info("Servidor em %s:%s com %s workers (PID %s)", self.config.host, self.config.port, self.workers, os.getpid())
+
+        while not self.stopping:
+            if self.reap():
+                # Evita um ciclo apertado quando o worker falha logo ao subir
+                time.sleep(1)
+                for _ in range(self.workers - len(self.children)):
+                    if not self.stopping:
+                        self.spawn()
+            time.sleep(0.2)
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        logger.info("Encerrando %s workers; aguardando as requisições em andamento", len(self.children))
+        self.signal_children(signal.SIGTERM)
+        # Margem além do tempo de drenagem para o evento de shutdown (gravar consumo, spans)
+        deadline = time.monotonic() + settings.SERVER_GRACEFUL_TIMEOUT + 10
+        while self.children and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        if self.children:
+            logger.warning("Forçando o encerramento de %s workers", len(self.children))
+            self.signal_children(signal.SIGKILL)
+            while self.children:
+                self.reap()
+                time.sleep(0.05)
+        self.sock.close()
+
+def _create_tables() -> None:
+    from app.main import app  # noqa: F401  (registra todos os modelos)
+    from app.db.session import create_tables
+
+    create_tables()
+
+def create_tables_once() -> None:
+    """
+    Cria as tabelas uma única vez, antes dos workers: vários workers executando o
+    create_all ao mesmo tempo entram em conflito. Os workers herdam DB_CREATE_TABLES
+    desligado (também no ambiente, para valer após um SIGHUP) e pulam a etapa no startup.
+    """
+    if not settings.DB_CREATE_TABLES:
+        return
+    if settings.SERVER_PRELOAD:
+        _create_tables()
+    else:
+        # Sem preload a aplicação não é importada no supervisor; um processo filho cria as tabelas
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                _create_tables()
+                code = 0
+            except BaseException as e:
+                logger.exception("Erro ao criar as tabelas: %s", e)
+            finally:
+                stop_listener()
+                os._exit(code)
+        _, status = os.waitpid(pid, 0)
+        if os.waitstatus_to_exitcode(status) != 0:
+            sys.exit("Não foi possível criar as tabelas do banco de dados")
+    os.environ["DB_CREATE_TABLES"] = "false"
+    set_settings(get_settings().replace(DB_CREATE_TABLES=False))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    # Passados pelo ambiente para continuarem valendo quando as configurações forem recarregadas
+    for name, value in (("SERVER_HOST", args.host), ("SERVER_PORT", args.port), ("SERVER_WORKERS", args.workers)):
+        if value is not None:
+            os.environ[name] = str(value)
+    set_settings(Settings.from_env())
+    # Arquivos de métricas de uma execução anterior não devem ser somados aos novos workers
+    metrics.clear_directory()
+
+    workers = worker_count()
+    if not hasattr(os, "fork"):
+        # Sem fork (Windows): o supervisor do próprio uvicorn, sem preload
+        uvicorn.run("app.main:app", workers=workers, **server_options())
+        return
+
+    create_tables_once()
+    if settings.SERVER_PRELOAD:
+        from app.main import app
+
+        config = uvicorn.Config(app, **server_options())
+    else:
+        config = uvicorn.Config("app.main:app", **server_options())
+    sock = bind_socket(config)
+    Supervisor(config, sock, workers).run()
+
+if __name__ == "__main__":
+    main()
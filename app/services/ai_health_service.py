@@ -0,0 +1,97 @@
+import time
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.logger import logger
+
+@dataclass
+class Observation:
+    ok: bool
+    source: str  # "request" (chamada real) ou "probe" (listagem de modelos)
+    detail: str
+    at: float
+
+class AIHealthMonitor:
+    """
+    Saúde da API de IA, mantida sem gastar tokens. Cada chamada real atualiza o
+    estado (observação passiva); só quando não há tráfego há AI_HEALTH_PROBE_INTERVAL
+    segundos uma sonda barata (listagem de modelos) é feita. `status()` apenas lê o
+    último resultado, então as verificações de saúde custam O(1).
+    """
+    def __init__(self, name: str, probe: Callable[[], Awaitable[Tuple[bool, str]]]):
+        self.name = name
+        self._probe = probe
+        self.last: Optional[Observation] = None
+        self.probes = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def observe(self, ok: bool, detail: str = "", source: str = "request") -> None:
+        self.last = Observation(ok, source, detail, time.monotonic())
+
+    def age(self) -> Optional[float]:
+        if self.last is None:
+            return None
+        return time.monotonic() - self.last.at
+
+    def is_fresh(self) -> bool:
+        age = self.age()
+        return age is not None and age < settings.AI_HEALTH_TTL_SECONDS
+
+    def status(self) -> Dict[str, Any]:
+        if self.last is None:
+            return {"healthy": None, "stale": True}
+        data: Dict[str, Any] = {
+            "healthy": self.last.ok,
+            "source": self.last.source,
+            "age_seconds": round(self.age(), 1),
+            "stale": not self.is_fresh(),
+        }
+        if self.last.detail:
+            data["detail"] = self.last.detail
+        return data
+
+    async def probe(self) -> Observation:
+        # Sondas simultâneas (vários testes de conexão) aguardam a mesma verificação
+        async with self._lock:
+            if self.last is not None and self.last.source == "probe" and self.age() < 1:
+                return self.last
+            self.probes += 1
+            try:
+                ok, detail = await self._probe()
+            except Exception as e:
+                ok, detail = False, f"{type(e).__name__}: {e}"
+            if not ok:
+                logger.warning("Sonda de saúde da IA (%s) falhou: %s", self.name, detail)
+            self.observe(ok, detail, source="probe")
+            return self.last
+
+    async def check(self) -> Dict[str, Any]:
+        """Estado atual; sonda apenas se o último resultado já expirou"""
+        if not self.is_fresh():
+            await self.probe()
+        return self.status()
+
+    async def _run(self) -> None:
+        while True:
+            interval = settings.AI_HEALTH_PROBE_INTERVAL
+            await asyncio.sleep(interval)
+            age = self.age()
+            # Com tráfego, as próprias chamadas mantêm o estado atualizado
+            if age is None or age >= interval:
+                await self.probe()
+
+    def start(self) -> None:
+        if self._task is None and settings.AI_HEALTH_PROBE_ENABLED:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def reset(self) -> None:
+        self.last = None
+        self.probes = 0
@@ -1,37 +1,88 @@
 import os
-import httpx
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any, Tuple
 import json
 
-from app.core.config import settings
+from app.core.config import on_reload, settings
+from app.services.ai_health_service import AIHealthMonitor
+from app.services.usage_service import usage_recorder
+from app.utils.circuit import CircuitBreaker
 from app.utils.logger import logger
+from app.utils.metrics import ai_timer
+from app.utils.tracing import tracer
+
+if TYPE_CHECKING:
+    import httpx
+
+# Falhas seguidas da API (erros 5xx, 429, 401/402/403 e de conexão) abrem o circuito: as chamadas
+# seguintes falham na hora em vez de esperar o tempo limite de cada uma
+ai_circuit = CircuitBreaker("deepseek", settings.AI_CIRCUIT_FAILURE_THRESHOLD, settings.AI_CIRCUIT_RESET_SECONDS)
+
+def _is_service_failure(status_code: int) -> bool:
+    """Respostas que indicam a API fora do ar, sobrecarregada ou com a conta/chave recusada"""
+    return status_code >= 500 or status_code in (401, 402, 403, 429)
 
 class DeepSeekService:
     """Serviço para integração com a API DeepSeek"""
     def __init__(self):
         self.api_key = settings.DEEPSEEK_API_KEY
         self.api_url = "https://api.deepseek.com/v1/chat/completions"
+        self.models_url = "https://api.deepseek.com/v1/models"
         self.headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}"
         }
     
-    async def analyze_document(self, document_text: str, document_type: str) -> Dict[str, Any]:
-        """Analisa um documento jurídico usando a API DeepSeek"""
+    async def _post(self, operation: str, payload: Dict[str, Any], timeout: float) -> "httpx.Response":
+        """Envia uma requisição à API DeepSeek, registrando a latência e o span de cada operação"""
+        # Importado no primeiro uso para não pesar na inicialização
+        import httpx
+        
+        attributes = {
+            "gen_ai.system": "deepseek",
+            "gen_ai.operation.name": operation,
+            "gen_ai.request.model": payload.get("model"),
+            "gen_ai.request.max_tokens": payload.get("max_tokens"),
+        }
+        trial = ai_circuit.check()
+        with ai_timer(operation) as call, tracer.start_span(f"deepseek {operation}", kind="CLIENT", attributes=attributes) as span:
+            try:
+                async with httpx.AsyncClient() as client:
+                    response = await client.post(
+                        self.api_url,
+                        headers=self.headers,
+                        json=payload,
+                        timeout=httpx.Timeout(timeout, connect=min(timeout, settings.AI_CONNECT_TIMEOUT))
+                    )
+            except httpx.TransportError as e:
+                ai_circuit.record_failure()
+                ai_health.observe(False, type(e).__name__)
+                raise
+            except BaseException:
+                # Cancelada ou com erro local: sem veredito sobre a API, libera a chamada de teste
+                if trial:
+                    ai_circuit.release_trial()
+                raise
+            # Cada chamada real atualiza o circuito e a saúde da IA, dispensando sondas enquanto houver tráfego;
+            # um pedido recusado por conteúdo (4xx) não diz nada sobre a disponibilidade da API
+            if _is_service_failure(response.status_code):
+                ai_circuit.record_failure()
+                ai_health.observe(False, f"HTTP {response.status_code}")
+            else:
+                ai_circuit.record_success()
+                ai_health.observe(True)
+            call.status = response.status_code
+            span.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code != 200:
+                span.set_status("ERROR")
+            elif span.recording:
+                usage = response.json().get("usage") or {}
+                span.set_attribute("gen_ai.usage.input_tokens", usage.get("prompt_tokens"))
+                span.set_attribute("gen_ai.usage.output_tokens", usage.get("completion_tokens"))
+        return response
+    
+    async def _analyze(self, operation: str, prompt: str, max_tokens: int, failure: str, error: str) -> Dict[str, Any]:
+        """Envia um pedido de análise à API DeepSeek; `failure` e `error` são as mensagens exibidas em caso de falha"""
         try:
-            prompt = f"""Você é um assistente jurídico especializado em análise de documentos. 
-            Por favor, analise o seguinte {document_type} e forneça insights jurídicos relevantes,
-            potenciais problemas e recomendações:
-
-            {document_text}
-            
-            Forneça sua análise em formato estruturado, com seções para:
-            1. Resumo geral
-            2. Pontos principais
-            3. Potenciais problemas ou omissões
-            4. Recomendações
-            """
-            
             payload = {
                 "model": "deepseek-chat",
                 "messages": [
@@ -39,39 +90,71 @@ class DeepSeekService:
                     {"role": "user", "content": prompt}
                 ],
                 "temperature": 0.3,
-                "max_tokens": 1500
+                "max_tokens": max_tokens
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json=payload,
-                    timeout=60.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    content = result["choices"][0]["message"]["content"]
-                    return {
-                        "success": True,
-                        "analysis": content
-                    }
-                else:
-                    logger.error(f"Erro na API DeepSeek: {response.status_code} - {response.text}")
-                    return {
-                        "success": False,
-                        "error": f"Erro na API: {response.status_code}",
-                        "analysis": "Não foi possível analisar o documento. Por favor, tente novamente mais tarde."
-                    }
+            response = await self._post(operation, payload, timeout=settings.AI_REQUEST_TIMEOUT)
+            
+            if response.status_code == 200:
+                result = response.json()
+                usage_recorder.record(payload["model"], result.get("usage"))
+                content = result["choices"][0]["message"]["content"]
+                return {
+                    "success": True,
+                    "analysis": content
+                }
+            else:
+                logger.error("Erro na API DeepSeek: %s - %s", response.status_code, response.text)
+                return {
+                    "success": False,
+                    "error": f"Erro na API: {response.status_code}",
+                    "analysis": failure
+                }
         except Exception as e:
-            logger.error(f"Erro ao analisar documento: {str(e)}")
+            logger.error("Erro na análise (%s): %s", operation, e)
             return {
                 "success": False,
                 "error": str(e),
-                "analysis": "Ocorreu um erro durante a análise do documento."
+                "analysis": error
             }
     
+    async def analyze_document(self, document_text: str, document_type: str) -> Dict[str, Any]:
+        """Analisa um documento jurídico usando a API DeepSeek"""
+        prompt = f"""Você é um assistente jurídico especializado em análise de documentos. 
+            Por favor, analise o seguinte {document_type} e forneça insights jurídicos relevantes,
+            potenciais problemas e recomendações:
+
+            {document_text}
+            
+            Forneça sua análise em formato estruturado, com seções para:
+            1. Resumo geral
+            2. Pontos principais
+            3. Potenciais problemas ou omissões
+            4. Recomendações
+            """
+        return await self._analyze(
+            "analyze_document", prompt, 1500,
+            failure="Não foi possível analisar o documento. Por favor, tente novamente mais tarde.",
+            error="Ocorreu um erro durante a análise do documento."
+        )
+    
+    async def analyze_section(self, section_text: str, document_type: str, heading: Optional[str] = None) -> Dict[str, Any]:
+        """Analisa uma seção (cláusula, capítulo) de um documento jurídico usando a API DeepSeek"""
+        prompt = f"""Você é um assistente jurídico especializado em análise de documentos.
+            O trecho abaixo é uma seção{f' ({heading})' if heading else ''} de um {document_type}.
+            Analise apenas esta seção e responda de forma concisa, apontando:
+            1. Pontos principais
+            2. Potenciais problemas ou omissões
+            3. Recomendações
+
+            {section_text}
+            """
+        return await self._analyze(
+            "analyze_section", prompt, 600,
+            failure="Não foi possível analisar esta seção.",
+            error="Ocorreu um erro durante a análise desta seção."
+        )
+    
     async def legal_search(self, query: str, context: Optional[str] = None) -> Dict[str, Any]:
         """Realiza uma pesquisa jurídica usando a API DeepSeek"""
         try:
@@ -100,30 +183,25 @@ class DeepSeekService:
                 "max_tokens": 2000
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json=payload,
-                    timeout=60.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    content = result["choices"][0]["message"]["content"]
-                    return {
-                        "success": True,
-                        "result": content
-                    }
-                else:
-                    logger.error(f"Erro na API DeepSeek: {response.status_code} - {response.text}")
-                    return {
-                        "success": False,
-                        "error": f"Erro na API: {response.status_code}",
-                        "result": "Não foi possível realizar a pesquisa. Por favor, tente novamente mais tarde."
-                    }
+            response = await self._post("legal_search", payload, timeout=settings.AI_REQUEST_TIMEOUT)
+            
+            if response.status_code == 200:
+                result = response.json()
+                usage_recorder.record(payload["model"], result.get("usage"))
+                content = result["choices"][0]["message"]["content"]
+                return {
+                    "success": True,
+                    "result": content
+                }
+            else:
+                logger.error("Erro na API DeepSeek: %s - %s", response.status_code, response.text)
+                return {
+                    "success": False,
+                    "error": f"Erro na API: {response.status_code}",
+                    "result": "Não foi possível realizar a pesquisa. Por favor, tente novamente mais tarde."
+                }
         except Exception as e:
-            logger.error(f"Erro ao realizar pesquisa jurídica: {str(e)}")
+            logger.error("Erro ao realizar pesquisa jurídica: %s", e)
             return {
                 "success": False,
                 "error": str(e),
@@ -154,64 +232,75 @@ class DeepSeekService:
                 "max_tokens": 3000
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json=payload,
-                    timeout=60.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    content = result["choices"][0]["message"]["content"]
-                    return {
-                        "success": True,
-                        "document": content
-                    }
-                else:
-                    logger.error(f"Erro na API DeepSeek: {response.status_code} - {response.text}")
-                    return {
-                        "success": False,
-                        "error": f"Erro na API: {response.status_code}",
-                        "document": "Não foi possível gerar o documento. Por favor, tente novamente mais tarde."
-                    }
+            response = await self._post("generate_document", payload, timeout=settings.AI_REQUEST_TIMEOUT)
+            
+            if response.status_code == 200:
+                result = response.json()
+                usage_recorder.record(payload["model"], result.get("usage"))
+                content = result["choices"][0]["message"]["content"]
+                return {
+                    "success": True,
+                    "document": content
+                }
+            else:
+                logger.error("Erro na API DeepSeek: %s - %s", response.status_code, response.text)
+                return {
+                    "success": False,
+                    "error": f"Erro na API: {response.status_code}",
+                    "document": "Não foi possível gerar o documento. Por favor, tente novamente mais tarde."
+                }
         except Exception as e:
-            logger.error(f"Erro ao gerar documento: {str(e)}")
+            logger.error("Erro ao gerar documento: %s", e)
             return {
                 "success": False,
                 "error": str(e),
                 "document": "Ocorreu um erro durante a geração do documento."
             }
     
-    async def test_connection(self) -> bool:
-        """Verifica a conexão com a API DeepSeek"""
-        try:
-            payload = {
-                "model": "deepseek-chat",
-                "messages": [
-                    {"role": "system", "content": "Você é um assistente jurídico."},
-                    {"role": "user", "content": "Olá, teste de conexão."}
-                ],
-                "max_tokens": 5
-            }
-            
+    async def list_models(self) -> Tuple[bool, str]:
+        """Lista os modelos da API: confirma a conexão e a chave sem consumir tokens"""
+        if not self.api_key:
+            return False, "DEEPSEEK_API_KEY não definida"
+        import httpx
+        
+        timeout = settings.AI_TEST_TIMEOUT
+        attributes = {"gen_ai.system": "deepseek", "gen_ai.operation.name": "list_models"}
+        with ai_timer("list_models") as call, tracer.start_span("deepseek list_models", kind="CLIENT", attributes=attributes) as span:
             async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.api_url,
+                response = await client.get(
+                    self.models_url,
                     headers=self.headers,
-                    json=payload,
-                    timeout=10.0
+                    timeout=httpx.Timeout(timeout, connect=min(timeout, settings.AI_CONNECT_TIMEOUT))
                 )
-                
-                return response.status_code == 200
-        except Exception as e:
-            logger.error(f"Erro ao testar conexão com DeepSeek: {str(e)}")
-            return False
+            call.status = response.status_code
+            span.set_attribute("http.response.status_code", response.status_code)
+        if response.status_code != 200:
+            return False, f"HTTP {response.status_code}"
+        return True, ""
+    
+    async def test_connection(self) -> bool:
+        """
+        Verifica a conexão com a API DeepSeek pelo estado em cache; a sonda (listagem
+        de modelos, sem tokens) só é feita se o último resultado já expirou
+        """
+        status = await ai_health.check()
+        return bool(status["healthy"])
 
 # Instância do serviço
 deepseek_service = DeepSeekService()
 
+# Saúde da API, alimentada pelas chamadas reais e, sem tráfego, pela listagem de modelos
+ai_health = AIHealthMonitor("deepseek", lambda: deepseek_service.list_models())
+
+@on_reload
+def _reload_deepseek(previous, new) -> None:
+    if new.DEEPSEEK_API_KEY != previous.DEEPSEEK_API_KEY:
+        deepseek_service.__init__()
+        # O estado observado com a chave anterior não vale mais
+        ai_health.reset()
+    ai_circuit.failure_threshold = new.AI_CIRCUIT_FAILURE_THRESHOLD
+    ai_circuit.reset_timeout = new.AI_CIRCUIT_RESET_SECONDS
+
 # Funções para facilitar o uso dos serviços
 async def analyze_document(document_text: str, document_type: str) -> Dict[str, Any]:
     """Analisa um documento jurídico usando o serviço de IA disponível"""
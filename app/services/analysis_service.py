@@ -0,0 +1,156 @@
+import re
+import json
+import asyncio
+import hashlib
+from typing import List, Dict, Any, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.analysis import DocumentAnalysisCache
+from app.services.ai_service import deepseek_service
+from app.utils.logger import logger
+
+# Linhas que iniciam uma nova seção em documentos jurídicos
+_HEADING_RE = re.compile(
+    r"^\s*(?:"
+    r"CL[ÁA]USULA\b|Cl[áa]usula\b|ARTIGO\b|Art\.\s*\d|CAP[ÍI]TULO\b|SE[ÇC][ÃA]O\b|T[ÍI]TULO\b|"
+    r"D[OA]S?\s+[A-ZÁÉÍÓÚÂÊÔÃÕÇ]{3,}|"
+    r"\d+(?:\.\d+)*\s*[.)\-–]\s+\S|"
+    r"[IVXLC]+\s*[.)\-–]\s+\S"
+    r")"
+)
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+def section_hash(text: str, document_type: str) -> str:
+    """Impressão digital de uma seção; alterações só de espaçamento não mudam o hash"""
+    return hashlib.sha256(f"{document_type}\x00{_normalize(text)}".encode("utf-8")).hexdigest()
+
+def _split_long(text: str, max_chars: int) -> List[str]:
+    """Divide um trecho longo em blocos de parágrafos com até `max_chars` caracteres"""
+    chunks, current = [], ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+def split_sections(text: str, max_chars: Optional[int] = None) -> List[Dict[str, str]]:
+    """
+    Divide o documento em seções pelos títulos (cláusulas, artigos, capítulos...).
+    Sem títulos reconhecíveis, agrupa parágrafos em blocos de tamanho limitado.
+    """
+    max_chars = max_chars or settings.ANALYSIS_SECTION_MAX_CHARS
+    sections: List[Dict[str, str]] = []
+    heading, lines = None, []
+
+    def flush():
+        body = "\n".join(lines).strip()
+        if body:
+            for chunk in _split_long(body, max_chars):
+                sections.append({"heading": heading, "text": chunk})
+
+    for line in text.splitlines():
+        if _HEADING_RE.match(line) and any(l.strip() for l in lines):
+            flush()
+            heading, lines = None, []
+        if heading is None and line.strip():
+            heading = line.strip()[:120]
+        lines.append(line)
+    flush()
+    return sections
+
+def get_cached_sections(db: Session, document_id: str) -> Optional[str]:
+    """JSON das análises por seção salvas para o documento, se houver"""
+    cache = db.get(DocumentAnalysisCache, document_id)
+    return cache.sections if cache else None
+
+def save_cached_sections(db: Session, document_id: str, sections: str) -> None:
+    """Grava as análises por seção do documento. O commit fica a cargo de quem chama."""
+    cache = db.get(DocumentAnalysisCache, document_id)
+    if cache is None:
+        db.add(DocumentAnalysisCache(document_id=document_id, sections=sections))
+    else:
+        cache.sections = sections
+
+def delete_cached_sections(db: Session, document_id: str) -> None:
+    """Remove as análises por seção do documento. O commit fica a cargo de quem chama."""
+    db.query(DocumentAnalysisCache).filter(DocumentAnalysisCache.document_id == document_id).delete()
+
+def load_cached_sections(analysis_sections: Optional[str]) -> Dict[str, str]:
+    """Lê o JSON de análises por seção (hash -> análise)"""
+    if not analysis_sections:
+        return {}
+    try:
+        data = json.loads(analysis_sections)
+    except ValueError:
+        return {}
+    return {item["hash"]: item["analysis"] for item in data.get("sections", []) if item.get("hash")}
+
+def merge_analysis(sections: List[Dict[str, Any]]) -> str:
+    """Monta a análise completa a partir das análises de cada seção"""
+    parts = []
+    for index, section in enumerate(sections, start=1):
+        title = section.get("heading") or f"Seção {index}"
+        parts.append(f"## {title}\n\n{section['analysis'].strip()}")
+    return "\n\n".join(parts)
+
+async def analyze_document_incremental(
+    document_text: str,
+    document_type: str,
+    cached_sections: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Analisa o documento por seções, reenviando à IA apenas as seções cujo hash mudou.
+    Retorna a análise consolidada e o JSON de seções a ser salvo com save_cached_sections.
+    """
+    cache = load_cached_sections(cached_sections)
+    sections = split_sections(document_text)
+    for section in sections:
+        section["hash"] = section_hash(section["text"], document_type)
+
+    pending = [section for section in sections if section["hash"] not in cache]
+    semaphore = asyncio.Semaphore(settings.AI_MAX_CONCURRENCY)
+
+    async def analyze(section):
+        async with semaphore:
+            return await deepseek_service.analyze_section(section["text"], document_type, section["heading"])
+
+    results = await asyncio.gather(*(analyze(section) for section in pending))
+
+    errors = []
+    for section, result in zip(pending, results):
+        section["analysis"] = result.get("analysis", "")
+        if not result.get("success"):
+            # Seções com erro não entram no cache, para serem reanalisadas na próxima vez
+            section["failed"] = True
+            errors.append(result.get("error"))
+    for section in sections:
+        if section["hash"] in cache:
+            section["analysis"] = cache[section["hash"]]
+
+    logger.info("Análise incremental: %s de %s seções reanalisadas", len(pending), len(sections))
+
+    stored = {
+        "document_type": document_type,
+        "sections": [
+            {"hash": s["hash"], "heading": s["heading"], "analysis": s["analysis"]}
+            for s in sections if not s.get("failed")
+        ]
+    }
+    result = {
+        "success": not errors,
+        "analysis": merge_analysis(sections),
+        "sections_total": len(sections),
+        "sections_reanalyzed": len(pending),
+        "sections_reused": len(sections) - len(pending),
+        "analysis_sections": json.dumps(stored, ensure_ascii=False)
+    }
+    if errors:
+        result["error"] = errors[0]
+    return result
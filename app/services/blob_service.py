@@ -0,0 +1,157 @@
+from typing import Dict, Any, Optional, Tuple, List
+from fastapi import UploadFile
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.models.blob import Blob
+from app.services import storage_service
+from app.services.storage_service import StagedFile, stage_upload, discard_staged
+from app.utils.logger import logger
+
+class DedupeStats:
+    """Contadores de deduplicação do processo atual"""
+    def __init__(self):
+        self.uploads = 0
+        self.hits = 0
+        self.bytes_saved = 0
+
+    def record(self, size: int, hit: bool) -> None:
+        self.uploads += 1
+        if hit:
+            self.hits += 1
+            self.bytes_saved += size
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "uploads": self.uploads,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.uploads, 4) if self.uploads else 0.0,
+            "bytes_saved": self.bytes_saved
+        }
+
+dedupe_stats = DedupeStats()
+
+def blob_key(sha256: str) -> str:
+    """Chave de armazenamento de um blob, particionada pelos primeiros caracteres do hash"""
+    return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+def _locked_blob(db: Session, sha256: str) -> Optional[Blob]:
+    return db.query(Blob).filter(Blob.sha256 == sha256).with_for_update().first()
+
+def _insert_blob(db: Session, staged: StagedFile) -> Optional[Blob]:
+    """
+    Insere o registro de um blob novo em um savepoint. Retorna None se um upload
+    simultâneo do mesmo conteúdo o inseriu primeiro (violação da chave primária).
+    """
+    blob = Blob(
+        sha256=staged.sha256,
+        size=staged.size,
+        content_type=staged.content_type,
+        ref_count=1
+    )
+    try:
+        with db.begin_nested():
+            db.add(blob)
+    except IntegrityError:
+        return None
+    return blob
+
+async def store_upload(db: Session, file: UploadFile) -> Tuple[Blob, StagedFile, bool]:
+    """
+    Armazena um upload de forma deduplicada.
+    Se já existir um blob com o mesmo SHA-256, apenas incrementa a contagem de referências
+    e descarta a cópia temporária. O commit fica a cargo de quem chama.
+    Retorna o blob, os dados do arquivo recebido e se houve deduplicação.
+    """
+    staged = await stage_upload(file)
+    key = blob_key(staged.sha256)
+    backend = storage_service.storage_backend
+
+    try:
+        blob = _locked_blob(db, staged.sha256)
+        if blob is None:
+            # O registro é inserido antes do arquivo: um upload simultâneo do mesmo conteúdo
+            # espera na inserção pelo commit deste e segue como deduplicação
+            new_blob = _insert_blob(db, staged)
+            if new_blob is not None:
+                await run_in_threadpool(backend.put, staged, key)
+                dedupe_stats.record(staged.size, hit=False)
+                return new_blob, staged, False
+            blob = db.query(Blob).filter(Blob.sha256 == staged.sha256).with_for_update().one()
+
+        blob.ref_count = (blob.ref_count or 0) + 1
+        if await run_in_threadpool(backend.exists, key):
+            discard_staged(staged.path)
+            dedupe_stats.record(staged.size, hit=True)
+            logger.info("Arquivo deduplicado: %s (%s bytes)", staged.sha256, staged.size)
+            return blob, staged, True
+
+        # O registro existia mas o arquivo havia se perdido: regravar
+        await run_in_threadpool(backend.put, staged, key)
+        dedupe_stats.record(staged.size, hit=False)
+        return blob, staged, False
+    except Exception:
+        discard_staged(staged.path)
+        raise
+
+def discard_new_blob(db: Session, sha256: str) -> None:
+    """
+    Remove o arquivo de um blob recém-gravado cuja transação falhou.
+    Só apaga o arquivo se nenhum outro registro o referencia.
+    """
+    if not db.query(Blob).filter(Blob.sha256 == sha256).first():
+        storage_service.delete_file(blob_key(sha256))
+
+def release_blob(db: Session, sha256: Optional[str]) -> Optional[str]:
+    """
+    Decrementa a contagem de referências de um blob.
+    Quando não há mais referências, remove o registro e retorna a chave do arquivo
+    para que seja apagado após o commit. O commit fica a cargo de quem chama.
+    """
+    if not sha256:
+        return None
+
+    blob = db.query(Blob).filter(Blob.sha256 == sha256).with_for_update().first()
+    if not blob:
+        return None
+
+    blob.ref_count = (blob.ref_count or 0) - 1
+    if blob.ref_count <= 0:
+        db.delete(blob)
+        return blob_key(sha256)
+    return None
+
+def collect_garbage(db: Session) -> List[str]:
+    """Remove blobs sem referências que possam ter sobrado de falhas anteriores"""
+    orphans = db.query(Blob).filter(Blob.ref_count <= 0).all()
+    keys = [blob_key(blob.sha256) for blob in orphans]
+    for blob in orphans:
+        db.delete(blob)
+    db.commit()
+
+    for key in keys:
+        storage_service.delete_file(key)
+    if keys:
+        logger.info("Coleta de lixo removeu %s arquivos sem referência", len(keys))
+    return keys
+
+def get_storage_stats(db: Session) -> Dict[str, Any]:
+    """Obtém estatísticas de deduplicação do armazenamento"""
+    blob_count, references, physical_bytes, logical_bytes = db.query(
+        func.count(Blob.sha256),
+        func.coalesce(func.sum(Blob.ref_count), 0),
+        func.coalesce(func.sum(Blob.size), 0),
+        func.coalesce(func.sum(Blob.size * Blob.ref_count), 0)
+    ).filter(Blob.ref_count > 0).one()
+
+    return {
+        "blobs": blob_count,
+        "references": int(references),
+        "physical_bytes": int(physical_bytes),
+        "logical_bytes": int(logical_bytes),
+        "bytes_saved": int(logical_bytes - physical_bytes),
+        "dedupe_ratio": round(logical_bytes / physical_bytes, 4) if physical_bytes else 1.0,
+        "process": dedupe_stats.as_dict()
+    }
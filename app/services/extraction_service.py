@@ -0,0 +1,114 @@
+import os
+import asyncio
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Callable
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.models.blob import Blob
+from app.models.document import Document
+from app.services import storage_service
+from app.utils.text_extraction import extract_text, detect_kind
+from app.utils.logger import logger
+
+# Estados do documento durante a extração de texto
+STATUS_PROCESSING = "processing"
+STATUS_EXTRACTION_FAILED = "extraction_failed"
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+def get_executor() -> ProcessPoolExecutor:
+    """Cria sob demanda o pool de processos limitado usado na extração"""
+    global _executor
+    if _executor is None:
+        # spawn evita herdar threads e conexões do processo do servidor
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.EXTRACTION_MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+def shutdown_executor() -> None:
+    """Encerra o pool de processos de extração"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def needs_extraction(content_type: Optional[str], filename: Optional[str]) -> bool:
+    """Indica se o arquivo possui um extrator em processo separado (PDF/DOCX)"""
+    return detect_kind(content_type, filename) in ("pdf", "docx")
+
+def get_cached_text(db: Session, sha256: str) -> Optional[str]:
+    """Retorna o texto já extraído de um arquivo com o mesmo hash, se houver"""
+    blob = db.query(Blob).filter(Blob.sha256 == sha256).first()
+    return blob.extracted_text if blob else None
+
+def _materialize(storage_key: str, size: int) -> str:
+    """Garante um caminho local para o arquivo, baixando-o se o backend for remoto"""
+    path = storage_service.storage_backend.local_path(storage_key)
+    if path:
+        return path
+
+    path = os.path.join(storage_service.storage_backend.staging_dir(), uuid.uuid4().hex)
+    with open(path, "wb") as f:
+        for chunk in storage_service.read_range(storage_key, 0, size - 1):
+            f.write(chunk)
+    return path
+
+async def run_extraction(path: str, kind: str) -> str:
+    """Executa a extração no pool de processos, fora do event loop"""
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(get_executor(), extract_text, path, kind)
+    return await asyncio.wait_for(future, timeout=settings.EXTRACTION_TIMEOUT)
+
+async def extract_document_text(
+    session_factory: Callable[[], Session],
+    document_id: str,
+    file_info: dict,
+    final_status: str
+) -> None:
+    """
+    Extrai o texto do arquivo de um documento e atualiza seu conteúdo e status.
+    O texto extraído fica associado ao hash do arquivo, para reaproveitamento.
+    """
+    sha256 = file_info["sha256"]
+    storage_key = file_info["storage_key"]
+    kind = detect_kind(file_info.get("content_type"), file_info.get("filename"))
+
+    db = session_factory()
+    temp_path = None
+    try:
+        text = get_cached_text(db, sha256)
+        if text is None:
+            path = await run_in_threadpool(_materialize, storage_key, file_info["size"])
+            if path != storage_service.storage_backend.local_path(storage_key):
+                temp_path = path
+            text = await run_extraction(path, kind)
+
+            blob = db.query(Blob).filter(Blob.sha256 == sha256).first()
+            if blob:
+                blob.extracted_text = text
+
+        document = db.query(Document).filter(Document.id == document_id).first()
+        if document:
+            if not document.content:
+                document.content = text
+            document.status = final_status
+        db.commit()
+        logger.info("Texto extraído do documento %s (%s caracteres)", document_id, len(text))
+    except Exception as e:
+        db.rollback()
+        logger.error("Erro ao extrair texto do documento %s: %s", document_id, e)
+        document = db.query(Document).filter(Document.id == document_id).first()
+        if document:
+            document.status = STATUS_EXTRACTION_FAILED
+            db.commit()
+    finally:
+        if temp_path:
+            storage_service.discard_staged(temp_path)
+        db.close()
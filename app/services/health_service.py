@@ -0,0 +1,96 @@
+import time
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.session import engine
+from app.services.ai_service import ai_circuit, ai_health
+from app.utils.logger import logger
+
+class HealthService:
+    """
+    Estado de saúde do worker para as sondas do orquestrador e do load balancer.
+    Nenhuma verificação faz trabalho caro: o teste do banco é reaproveitado por
+    HEALTH_DB_CHECK_SECONDS e o estado da IA vem do circuito e do último resultado
+    observado, sem chamar a API.
+    """
+    def __init__(self):
+        self.draining = False
+        self._database: Optional[Dict[str, Any]] = None
+        self._database_checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def pool_status() -> Dict[str, Any]:
+        pool = engine.pool
+        status: Dict[str, Any] = {"class": type(pool).__name__}
+        # Apenas o QueuePool informa tamanho e uso; os pools do SQLite em memória não
+        for name in ("size", "checkedout", "overflow"):
+            method = getattr(pool, name, None)
+            if callable(method):
+                status[name] = method()
+        return status
+
+    @staticmethod
+    def _pool_exhausted(status: Dict[str, Any]) -> bool:
+        if "size" not in status:
+            return False
+        return status["checkedout"] >= status["size"] + max(getattr(engine.pool, "_max_overflow", 0), 0)
+
+    @staticmethod
+    def _ping() -> None:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    def _cached_database(self) -> Optional[Dict[str, Any]]:
+        if self._database is not None and time.monotonic() - self._database_checked_at < settings.HEALTH_DB_CHECK_SECONDS:
+            return self._database
+        return None
+
+    async def check_database(self) -> Dict[str, Any]:
+        cached = self._cached_database()
+        if cached is not None:
+            return cached
+        # Sondas simultâneas esperam o mesmo teste em vez de abrir várias conexões
+        async with self._lock:
+            cached = self._cached_database()
+            if cached is not None:
+                return cached
+            pool = self.pool_status()
+            if self._pool_exhausted(pool) and self._database is not None:
+                # Sem conexão livre, o teste esperaria o pool_timeout; vale o último resultado
+                return {**self._database, "pool": pool}
+            started = time.perf_counter()
+            try:
+                await run_in_threadpool(self._ping)
+                result: Dict[str, Any] = {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+            except Exception as e:
+                logger.warning("Banco de dados indisponível na verificação de saúde: %s", e)
+                result = {"ok": False, "error": str(e)[:200]}
+            result["pool"] = pool
+            self._database, self._database_checked_at = result, time.monotonic()
+            return result
+
+    async def readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Pronto para receber tráfego: fora do encerramento e com o banco acessível.
+        O circuito da IA é informado, mas não tira o worker de circulação: uma falha
+        da IA atinge todos os workers igualmente e o resto da API continua útil.
+        """
+        if self.draining:
+            return False, {"status": "draining"}
+        database = await self.check_database()
+        return database["ok"], {
+            "status": "ready" if database["ok"] else "unavailable",
+            "checks": {"database": database, "ai": {**ai_circuit.snapshot(), **ai_health.status()}},
+        }
+
+    def reset(self) -> None:
+        self.draining = False
+        self._database = None
+        self._database_checked_at = 0.0
+
+health_service = HealthService()
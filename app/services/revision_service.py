@@ -0,0 +1,168 @@
+import json
+import difflib
+import hashlib
+from typing import List, Dict, Any, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session, undefer
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.models.document import Document
+from app.models.revision import DocumentRevision
+
+# Operações do delta, aplicadas sobre as linhas da versão anterior:
+#   ["c", n]       copia n linhas
+#   ["d", n]       descarta n linhas
+#   ["i", [...]]   insere as linhas informadas
+
+def compute_delta(old: str, new: str) -> List[list]:
+    """Calcula o delta por linhas que transforma `old` em `new`"""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+
+    delta: List[list] = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            delta.append(["c", i2 - i1])
+            continue
+        if i2 > i1:
+            delta.append(["d", i2 - i1])
+        if j2 > j1:
+            delta.append(["i", new_lines[j1:j2]])
+    return delta
+
+def apply_delta(old: str, delta: List[list]) -> str:
+    """Reconstrói uma versão aplicando o delta sobre a versão anterior"""
+    old_lines = old.splitlines(keepends=True)
+    result: List[str] = []
+    cursor = 0
+    for op, arg in delta:
+        if op == "c":
+            result.extend(old_lines[cursor:cursor + arg])
+            cursor += arg
+        elif op == "d":
+            cursor += arg
+        elif op == "i":
+            result.extend(arg)
+    return "".join(result)
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def _latest_revision(db: Session, document_id: str) -> Optional[DocumentRevision]:
+    return db.query(DocumentRevision).filter(
+        DocumentRevision.document_id == document_id
+    ).order_by(DocumentRevision.version.desc()).first()
+
+async def record_revision(db: Session, document: Document, old_content: Optional[str], new_content: str, user_id: str) -> DocumentRevision:
+    """
+    Registra uma nova versão do conteúdo de um documento. O commit fica a cargo de quem chama.
+    Documentos sem histórico ganham primeiro um snapshot da versão anterior.
+    """
+    latest = _latest_revision(db, document.id)
+
+    if latest is None and old_content is not None:
+        latest = DocumentRevision(
+            document_id=document.id,
+            version=1,
+            is_snapshot=True,
+            base_version=1,
+            data=old_content,
+            size=len(old_content),
+            content_hash=content_hash(old_content),
+            user_id=document.user_id
+        )
+        db.add(latest)
+
+    # O servidor Node e a extração de texto gravam `content` sem passar por aqui: se o
+    # texto atual não é o da última versão, o delta parte da versão reconstruída
+    base_content = old_content or ""
+    if latest is not None and (old_content is None or latest.content_hash != content_hash(old_content)):
+        base_content = get_revision_content(db, document.id, latest.version)
+
+    version = latest.version + 1 if latest else 1
+    revision = DocumentRevision(
+        document_id=document.id,
+        version=version,
+        size=len(new_content),
+        content_hash=content_hash(new_content),
+        user_id=user_id
+    )
+
+    delta = None
+    if latest and version - latest.base_version < settings.REVISION_SNAPSHOT_INTERVAL:
+        # O diff é CPU-bound: calculá-lo fora do event loop
+        delta = await run_in_threadpool(compute_delta, base_content, new_content)
+        encoded = json.dumps(delta, ensure_ascii=False, separators=(",", ":"))
+        # Deltas maiores que o próprio texto não compensam
+        if len(encoded) >= len(new_content):
+            delta = None
+
+    if delta is None:
+        revision.is_snapshot = True
+        revision.base_version = version
+        revision.data = new_content
+    else:
+        revision.is_snapshot = False
+        revision.base_version = latest.base_version
+        revision.data = encoded
+
+    db.add(revision)
+    return revision
+
+def get_revision_content(db: Session, document_id: str, version: int) -> str:
+    """Reconstrói uma versão a partir do snapshot base e dos deltas seguintes"""
+    target = db.query(DocumentRevision).filter(
+        DocumentRevision.document_id == document_id,
+        DocumentRevision.version == version
+    ).first()
+    if not target:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Versão não encontrada"
+        )
+
+    chain = db.query(DocumentRevision).options(undefer(DocumentRevision.data)).filter(
+        DocumentRevision.document_id == document_id,
+        DocumentRevision.version >= target.base_version,
+        DocumentRevision.version <= version
+    ).order_by(DocumentRevision.version).all()
+
+    content = chain[0].data
+    for revision in chain[1:]:
+        content = apply_delta(content, json.loads(revision.data))
+    return content
+
+def list_revisions(db: Session, document_id: str) -> List[Dict[str, Any]]:
+    """Lista as versões de um documento, sem carregar o conteúdo"""
+    revisions = db.query(DocumentRevision).filter(
+        DocumentRevision.document_id == document_id
+    ).order_by(DocumentRevision.version.desc()).all()
+
+    return [
+        {
+            "version": revision.version,
+            "is_snapshot": revision.is_snapshot,
+            "size": revision.size,
+            "created_at": revision.created_at,
+            "user_id": revision.user_id
+        }
+        for revision in revisions
+    ]
+
+def diff_revisions(db: Session, document_id: str, from_version: int, to_version: int) -> str:
+    """Gera o diff unificado entre duas versões"""
+    old = get_revision_content(db, document_id, from_version)
+    new = get_revision_content(db, document_id, to_version)
+    return "".join(difflib.unified_diff(
+        old.splitlines(keepends=True),
+        new.splitlines(keepends=True),
+        fromfile=f"versão {from_version}",
+        tofile=f"versão {to_version}"
+    ))
+
+def delete_revisions(db: Session, document_id: str) -> None:
+    """Remove o histórico de um documento. O commit fica a cargo de quem chama."""
+    db.query(DocumentRevision).filter(DocumentRevision.document_id == document_id).delete()
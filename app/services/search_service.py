@@ -0,0 +1,249 @@
+import math
+from collections import Counter
+from html import escape
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+from sqlalchemy import case, event, delete, insert, select, func, inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.case import Case
+from app.models.client import Client
+from app.models.document import Document
+from app.models.search import SearchEntry, SearchPosting
+from app.utils.portuguese import analyze, iter_tokens, fold_accents
+from app.utils.logger import logger
+
+# Campos indexados por modelo: (tipo, campo de título, campos do corpo)
+INDEXED_MODELS = {
+    Document: ("document", "title", ("client_name", "document_type", "content", "analysis")),
+    Case: ("case", "title", ("number", "description")),
+    Client: ("client", "name", ("notes",)),
+}
+INTEGER_ID_TYPES = {"case", "client"}
+
+# Parâmetros do ranking BM25 do índice invertido embutido
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SNIPPET_WIDTH = 200
+
+def _entry_data(obj) -> Dict[str, Any]:
+    entity_type, title_field, body_fields = INDEXED_MODELS[type(obj)]
+    title = getattr(obj, title_field) or ""
+    body = "\n".join(value for value in (getattr(obj, field) for field in body_fields) if value)
+    return {
+        "entity_type": entity_type,
+        "entity_id": str(obj.id),
+        "user_id": obj.user_id,
+        "title": title,
+        "body": body,
+    }
+
+def _remove_entry(connection: Connection, entity_type: str, entity_id: str) -> None:
+    entry_ids = select(SearchEntry.id).where(
+        SearchEntry.entity_type == entity_type,
+        SearchEntry.entity_id == entity_id
+    ).scalar_subquery()
+    connection.execute(delete(SearchPosting).where(SearchPosting.entry_id.in_(entry_ids)))
+    connection.execute(delete(SearchEntry).where(
+        SearchEntry.entity_type == entity_type,
+        SearchEntry.entity_id == entity_id
+    ))
+
+def _write_entry(connection: Connection, data: Dict[str, Any]) -> None:
+    """Substitui a entrada de uma entidade no índice"""
+    _remove_entry(connection, data["entity_type"], data["entity_id"])
+
+    terms = analyze(data["title"]) + analyze(data["body"])
+    values = dict(data, length=len(terms))
+
+    if connection.dialect.name == "postgresql":
+        # O PostgreSQL radicaliza e indexa (GIN); os acentos são removidos antes
+        values["tsv"] = func.setweight(
+            func.to_tsvector("portuguese", fold_accents(data["title"])), "A"
+        ).op("||")(func.setweight(
+            func.to_tsvector("portuguese", fold_accents(data["body"])), "B"
+        ))
+        connection.execute(insert(SearchEntry).values(**values))
+        return
+
+    entry_id = connection.execute(insert(SearchEntry).values(**values)).inserted_primary_key[0]
+    postings = [{"term": term, "entry_id": entry_id, "tf": tf} for term, tf in Counter(terms).items()]
+    if postings:
+        connection.execute(insert(SearchPosting), postings)
+
+def _has_indexed_changes(obj) -> bool:
+    _, title_field, body_fields = INDEXED_MODELS[type(obj)]
+    state = inspect(obj)
+    return any(
+        state.attrs[field].history.has_changes()
+        for field in (title_field, "user_id") + body_fields
+    )
+
+@event.listens_for(Session, "after_flush")
+def _update_search_index(session: Session, flush_context) -> None:
+    """Atualiza o índice de busca de forma incremental, na mesma transação da escrita"""
+    to_index = [
+        obj for obj in session.new
+        if type(obj) in INDEXED_MODELS
+    ] + [
+        obj for obj in session.dirty
+        if type(obj) in INDEXED_MODELS and _has_indexed_changes(obj)
+    ]
+    to_remove = [obj for obj in session.deleted if type(obj) in INDEXED_MODELS]
+
+    if not to_index and not to_remove:
+        return
+
+    connection = session.connection()
+    for obj in to_remove:
+        _remove_entry(connection, INDEXED_MODELS[type(obj)][0], str(obj.id))
+    for obj in to_index:
+        _write_entry(connection, _entry_data(obj))
+
+def rebuild_index(db: Session, batch_size: int = 500) -> int:
+    """Reconstrói todo o índice de busca a partir das tabelas de origem"""
+    connection = db.connection()
+    connection.execute(delete(SearchPosting))
+    connection.execute(delete(SearchEntry))
+
+    total = 0
+    for model in INDEXED_MODELS:
+        for obj in db.query(model).yield_per(batch_size):
+            _write_entry(connection, _entry_data(obj))
+            total += 1
+    db.commit()
+    logger.info("Índice de busca reconstruído com %s entradas", total)
+    return total
+
+def _rank_inverted(
+    db: Session, user_id: str, terms: List[str], entity_types: Optional[Iterable[str]], limit: int, offset: int
+) -> Tuple[List[Tuple[int, float]], int]:
+    """
+    Ranking BM25 sobre o índice invertido embutido (SQLite e testes). A pontuação é
+    somada, ordenada e paginada no banco; só a página volta para o Python.
+    """
+    scope = [SearchEntry.user_id == user_id]
+    if entity_types:
+        scope.append(SearchEntry.entity_type.in_(entity_types))
+
+    corpus_size, average_length = db.query(
+        func.count(SearchEntry.id), func.avg(SearchEntry.length)
+    ).filter(*scope).one()
+    if not corpus_size:
+        return [], 0
+    average_length = float(average_length or 1) or 1.0
+
+    postings = db.query(SearchPosting).join(
+        SearchEntry, SearchEntry.id == SearchPosting.entry_id
+    ).filter(SearchPosting.term.in_(terms), *scope)
+    document_frequency = dict(
+        postings.with_entities(SearchPosting.term, func.count(SearchPosting.entry_id)).group_by(SearchPosting.term).all()
+    )
+    # Todos os termos da consulta devem estar presentes, como no plainto_tsquery
+    if len(document_frequency) < len(terms):
+        return [], 0
+
+    idf = case({
+        term: math.log(1 + (corpus_size - frequency + 0.5) / (frequency + 0.5))
+        for term, frequency in document_frequency.items()
+    }, value=SearchPosting.term)
+    norm = SearchPosting.tf + BM25_K1 * (1 - BM25_B + BM25_B * func.coalesce(SearchEntry.length, 0) / average_length)
+    score = func.sum(idf * SearchPosting.tf * (BM25_K1 + 1) / norm).label("score")
+    matches = postings.with_entities(SearchPosting.entry_id, score).group_by(
+        SearchPosting.entry_id
+    ).having(func.count(SearchPosting.term) == len(terms))
+
+    total = db.query(func.count()).select_from(matches.subquery()).scalar()
+    page = matches.order_by(score.desc(), SearchPosting.entry_id).offset(offset).limit(limit).all()
+    return [(entry_id, float(value)) for entry_id, value in page], total
+
+def _rank_postgres(
+    db: Session, user_id: str, query: str, entity_types: Optional[Iterable[str]], limit: int, offset: int
+) -> Tuple[List[Tuple[int, float]], int]:
+    """Ranking com tsvector/GIN do PostgreSQL, paginado no banco"""
+    tsquery = func.plainto_tsquery("portuguese", fold_accents(query))
+    rank = func.ts_rank_cd(SearchEntry.tsv, tsquery)
+    q = db.query(SearchEntry.id, rank).filter(
+        SearchEntry.user_id == user_id,
+        SearchEntry.tsv.op("@@")(tsquery)
+    )
+    if entity_types:
+        q = q.filter(SearchEntry.entity_type.in_(entity_types))
+    total = q.with_entities(func.count(SearchEntry.id)).scalar()
+    page = q.order_by(rank.desc(), SearchEntry.id).offset(offset).limit(limit).all()
+    return [(entry_id, float(score)) for entry_id, score in page], total
+
+def build_snippet(text: str, terms: Iterable[str], width: int = SNIPPET_WIDTH) -> str:
+    """Monta um trecho do texto com os termos encontrados destacados em <mark>"""
+    text = text or ""
+    terms = set(terms)
+    matches = [(start, end) for term, start, end in iter_tokens(text) if term in terms]
+
+    if not matches:
+        return escape(text[:width]) + ("…" if len(text) > width else "")
+
+    # Janela com a maior quantidade de ocorrências
+    best_start, best_count, j = 0, 0, 0
+    for i, (start, _) in enumerate(matches):
+        while j < len(matches) and matches[j][1] - start <= width:
+            j += 1
+        if j - i > best_count:
+            best_start, best_count = i, j - i
+
+    window_start = max(0, matches[best_start][0] - width // 4)
+    window_end = min(len(text), window_start + width)
+
+    parts = ["…" if window_start > 0 else ""]
+    cursor = window_start
+    for start, end in matches[best_start:best_start + best_count]:
+        if end > window_end:
+            break
+        parts.append(escape(text[cursor:start]))
+        parts.append(f"<mark>{escape(text[start:end])}</mark>")
+        cursor = end
+    parts.append(escape(text[cursor:window_end]))
+    parts.append("…" if window_end < len(text) else "")
+    return "".join(parts)
+
+def search(
+    db: Session,
+    user_id: str,
+    query: str,
+    entity_types: Optional[List[str]] = None,
+    limit: int = 20,
+    offset: int = 0
+) -> Dict[str, Any]:
+    """
+    Pesquisa textual nos documentos, processos e clientes do usuário,
+    com radicalização em português e remoção de acentos.
+    """
+    terms = list(dict.fromkeys(analyze(query)))
+    if not terms:
+        return {"query": query, "total": 0, "results": []}
+
+    if db.get_bind().dialect.name == "postgresql":
+        page, total = _rank_postgres(db, user_id, query, entity_types, limit, offset)
+    else:
+        page, total = _rank_inverted(db, user_id, terms, entity_types, limit, offset)
+
+    entries = {
+        entry.id: entry
+        for entry in db.query(SearchEntry).filter(SearchEntry.id.in_([entry_id for entry_id, _ in page]))
+    }
+
+    results = []
+    for entry_id, score in page:
+        entry = entries.get(entry_id)
+        if not entry:
+            continue
+        results.append({
+            "type": entry.entity_type,
+            "id": int(entry.entity_id) if entry.entity_type in INTEGER_ID_TYPES else entry.entity_id,
+            "title": entry.title,
+            "score": round(score, 4),
+            "snippet": build_snippet(entry.body or entry.title, terms)
+        })
+
+    return {"query": query, "total": total, "results": results}
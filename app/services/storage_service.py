@@ -0,0 +1,279 @@
+import os
+import uuid
+import hashlib
+from dataclasses import dataclass
+from typing import Optional, Iterator, Tuple
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.utils.logger import logger
+
+@dataclass
+class StagedFile:
+    """Arquivo recebido e gravado em área temporária, ainda sem chave definitiva"""
+    path: str
+    size: int
+    sha256: str
+    content_type: Optional[str] = None
+    filename: Optional[str] = None
+
+class UploadTooLargeError(Exception):
+    """O arquivo enviado excede o tamanho máximo permitido"""
+
+class StorageBackend:
+    """Interface comum para os backends de armazenamento de arquivos"""
+    name = "base"
+
+    def put(self, staged: StagedFile, key: str) -> None:
+        """Move um arquivo da área temporária para a chave definitiva"""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def size(self, key: str) -> int:
+        raise NotImplementedError
+
+    def iter_range(self, key: str, start: int, end: int, chunk_size: int) -> Iterator[bytes]:
+        """Lê os bytes [start, end] (inclusivo) do arquivo em blocos"""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Caminho no disco local, quando o backend o possui"""
+        return None
+
+    def staging_dir(self) -> str:
+        """Diretório para gravação temporária dos uploads"""
+        path = os.path.join(os.path.abspath(settings.STORAGE_LOCAL_PATH), ".tmp")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+class LocalStorageBackend(StorageBackend):
+    """Armazena os arquivos no sistema de arquivos local"""
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        # Impedir que uma chave malformada escape do diretório raiz
+        if not path.startswith(self.root + os.sep):
+            raise ValueError("Chave de armazenamento inválida")
+        return path
+
+    def put(self, staged: StagedFile, key: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(staged.path, path)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self._path(key))
+
+    def iter_range(self, key: str, start: int, end: int, chunk_size: int) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self._path(key)
+
+    def staging_dir(self) -> str:
+        # Área temporária sob a mesma raiz, para que o os.replace final seja atômico
+        path = os.path.join(self.root, ".tmp")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+class S3StorageBackend(StorageBackend):
+    """
+    Armazena os arquivos em um bucket compatível com S3.
+    Em desenvolvimento pode apontar para um MinIO local via STORAGE_S3_ENDPOINT_URL.
+    """
+    name = "s3"
+
+    def __init__(self, bucket: str, endpoint_url: Optional[str] = None):
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url
+        self._client = None
+
+    @property
+    def client(self):
+        # O boto3 é pesado para importar; o cliente é criado no primeiro uso, não na inicialização
+        if self._client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise RuntimeError("O backend S3 requer o pacote boto3 instalado")
+            self._client = boto3.client("s3", endpoint_url=self.endpoint_url)
+        return self._client
+
+    def put(self, staged: StagedFile, key: str) -> None:
+        # upload_file envia em partes a partir do disco, sem carregar tudo na memória
+        extra_args = {"ContentType": staged.content_type} if staged.content_type else None
+        self.client.upload_file(staged.path, self.bucket, key, ExtraArgs=extra_args)
+        os.remove(staged.path)
+
+    @staticmethod
+    def _is_not_found(error: Exception) -> bool:
+        code = getattr(error, "response", {}).get("Error", {}).get("Code")
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def _head(self, key: str) -> dict:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)
+        except Exception as e:
+            # Mesma exceção do backend local, para quem chama tratar a ausência do arquivo
+            if self._is_not_found(e):
+                raise FileNotFoundError(key) from e
+            raise
+
+    def exists(self, key: str) -> bool:
+        try:
+            self._head(key)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def size(self, key: str) -> int:
+        return self._head(key)["ContentLength"]
+
+    def iter_range(self, key: str, start: int, end: int, chunk_size: int) -> Iterator[bytes]:
+        response = self.client.get_object(Bucket=self.bucket, Key=key, Range=f"bytes={start}-{end}")
+        yield from response["Body"].iter_chunks(chunk_size)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+def get_storage_backend() -> StorageBackend:
+    """Cria o backend de armazenamento configurado"""
+    if settings.STORAGE_BACKEND == "s3":
+        return S3StorageBackend(settings.STORAGE_S3_BUCKET, settings.STORAGE_S3_ENDPOINT_URL)
+    return LocalStorageBackend(settings.STORAGE_LOCAL_PATH)
+
+async def stage_upload(file: UploadFile, max_size: Optional[int] = None) -> StagedFile:
+    """
+    Grava o upload em disco em blocos, calculando o SHA-256 durante a escrita.
+    Nunca mantém o arquivo inteiro em memória.
+    """
+    max_size = max_size or settings.MAX_UPLOAD_SIZE
+    path = os.path.join(storage_backend.staging_dir(), uuid.uuid4().hex)
+    digest = hashlib.sha256()
+    size = 0
+
+    out = await run_in_threadpool(open, path, "wb")
+    try:
+        while True:
+            chunk = await file.read(settings.STORAGE_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise UploadTooLargeError(f"Arquivo excede o limite de {max_size} bytes")
+            digest.update(chunk)
+            await run_in_threadpool(out.write, chunk)
+    except BaseException:
+        out.close()
+        discard_staged(path)
+        raise
+    await run_in_threadpool(out.close)
+
+    return StagedFile(
+        path=path,
+        size=size,
+        sha256=digest.hexdigest(),
+        content_type=file.content_type,
+        filename=file.filename
+    )
+
+def discard_staged(path: str) -> None:
+    """Remove um arquivo temporário que não será mais utilizado"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def parse_range_header(range_header: Optional[str], file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta um cabeçalho Range de intervalo único (ex: "bytes=0-1023").
+    Retorna None quando não há Range e levanta ValueError se o intervalo for inválido.
+    """
+    if not range_header:
+        return None
+
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        raise ValueError("Intervalo não suportado")
+
+    start_text, _, end_text = spec.strip().partition("-")
+    if start_text == "":
+        # Sufixo: os últimos N bytes
+        if not end_text.isdigit() or int(end_text) == 0:
+            raise ValueError("Intervalo inválido")
+        length = min(int(end_text), file_size)
+        return file_size - length, file_size - 1
+
+    if not start_text.isdigit() or (end_text and not end_text.isdigit()):
+        raise ValueError("Intervalo inválido")
+
+    start = int(start_text)
+    end = int(end_text) if end_text else file_size - 1
+    end = min(end, file_size - 1)
+    if start >= file_size or start > end:
+        raise ValueError("Intervalo fora do arquivo")
+    return start, end
+
+# Instância do backend configurado
+storage_backend = get_storage_backend()
+
+# Funções para facilitar o uso do armazenamento
+async def save_upload(file: UploadFile, key: str) -> StagedFile:
+    """Recebe um upload em streaming e o armazena na chave informada"""
+    staged = await stage_upload(file)
+    try:
+        await run_in_threadpool(storage_backend.put, staged, key)
+    except Exception:
+        discard_staged(staged.path)
+        raise
+    return staged
+
+def file_size(key: str) -> int:
+    """Retorna o tamanho em bytes de um arquivo armazenado"""
+    return storage_backend.size(key)
+
+def read_range(key: str, start: int, end: int) -> Iterator[bytes]:
+    """Lê um intervalo de bytes de um arquivo armazenado, em blocos"""
+    return storage_backend.iter_range(key, start, end, settings.STORAGE_CHUNK_SIZE)
+
+def read_text(key: str, size: int) -> str:
+    """Lê um arquivo de texto armazenado inteiro (bloqueante: chame fora do event loop)"""
+    if not size:
+        return ""
+    return b"".join(read_range(key, 0, size - 1)).decode("utf-8", errors="replace")
+
+def delete_file(key: str) -> None:
+    """Remove um arquivo armazenado"""
+    try:
+        storage_backend.delete(key)
+    except Exception as e:
+        logger.error("Erro ao remover arquivo %s do armazenamento: %s", key, e)
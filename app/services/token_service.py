@@ -0,0 +1,110 @@
+import uuid
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.token import RefreshToken, RevokedToken
+from app.utils.logger import logger
+from app.utils.security import create_access_token, revocation_list
+
+def _hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Refresh token inválido ou expirado",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def issue_tokens(db: Session, user_id: str, family_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Emite um par access token + refresh token. O commit fica a cargo de quem chama.
+    O refresh token é opaco; no banco fica apenas o seu hash.
+    """
+    now = datetime.utcnow()
+    jti = uuid.uuid4().hex
+    access_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(subject=user_id, expires_delta=access_expires, jti=jti)
+
+    refresh_token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        id=_hash_token(refresh_token),
+        user_id=user_id,
+        family_id=family_id or uuid.uuid4().hex,
+        access_jti=jti,
+        expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": int(access_expires.total_seconds())
+    }
+
+def revoke_access_token(db: Session, jti: str, user_id: str, expires_at: datetime) -> None:
+    """Revoga um access token antes da expiração. O commit fica a cargo de quem chama."""
+    if expires_at <= datetime.utcnow() or jti in revocation_list or db.get(RevokedToken, jti):
+        return
+    db.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at, revoked_at=datetime.utcnow()))
+    revocation_list.add(jti, expires_at)
+
+def revoke_family(db: Session, family_id: str) -> None:
+    """
+    Revoga todos os refresh tokens de uma cadeia de rotações e os access tokens
+    emitidos junto com eles. O commit fica a cargo de quem chama.
+    """
+    now = datetime.utcnow()
+    access_lifetime = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    tokens = db.query(RefreshToken).filter(RefreshToken.family_id == family_id).all()
+    for token in tokens:
+        if token.revoked_at is None:
+            token.revoked_at = now
+        # Access tokens de pares trocados há mais de um tempo de vida já expiraram;
+        # para os demais, a revogação vale por um tempo de vida a partir de agora
+        if token.access_jti and (token.used_at is None or token.used_at > now - access_lifetime):
+            revoke_access_token(db, token.access_jti, token.user_id, now + access_lifetime)
+
+def revoke_user_tokens(db: Session, user_id: str) -> None:
+    """Encerra todas as sessões de um usuário. O commit fica a cargo de quem chama."""
+    families = db.query(RefreshToken.family_id).filter(
+        RefreshToken.user_id == user_id,
+        RefreshToken.revoked_at.is_(None),
+        RefreshToken.expires_at > datetime.utcnow()
+    ).distinct().all()
+    for (family_id,) in families:
+        revoke_family(db, family_id)
+
+def rotate_refresh_token(db: Session, refresh_token: str) -> Dict[str, Any]:
+    """
+    Troca um refresh token por um novo par de tokens na mesma cadeia.
+    A reutilização de um token já trocado indica vazamento: a cadeia inteira é revogada.
+    """
+    token = db.get(RefreshToken, _hash_token(refresh_token))
+    if not token or token.revoked_at is not None or token.expires_at <= datetime.utcnow():
+        raise _invalid_refresh_token()
+
+    if token.used_at is not None:
+        logger.warning("Reutilização de refresh token detectada para o usuário %s; revogando a sessão", token.user_id)
+        revoke_family(db, token.family_id)
+        db.commit()
+        raise _invalid_refresh_token()
+
+    token.used_at = datetime.utcnow()
+    return issue_tokens(db, token.user_id, family_id=token.family_id)
+
+def get_refresh_token(db: Session, refresh_token: str) -> Optional[RefreshToken]:
+    return db.get(RefreshToken, _hash_token(refresh_token))
+
+def purge_expired_tokens(db: Session) -> int:
+    """Remove refresh tokens e revogações já expirados. O commit fica a cargo de quem chama."""
+    now = datetime.utcnow()
+    removed = db.query(RefreshToken).filter(RefreshToken.expires_at <= now).delete(synchronize_session=False)
+    removed += db.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete(synchronize_session=False)
+    return removed
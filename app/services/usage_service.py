@@ -0,0 +1,260 @@
+import asyncio
+import threading
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.session import SessionLocal, get_db
+from app.models.subscription import Subscription
+from app.models.usage import AIUsage
+from app.utils.cache import TTLCache
+from app.utils.logger import logger
+from app.utils.security import get_current_user, CurrentUser
+
+@dataclass(frozen=True)
+class UsageContext:
+    user_id: Optional[str]
+    endpoint: str
+
+# Usuário e endpoint da requisição atual, para atribuir o consumo das chamadas à IA
+usage_context: ContextVar[Optional[UsageContext]] = ContextVar("usage_context", default=None)
+
+def parse_quotas(value: str) -> Dict[str, int]:
+    """Lê as cotas no formato "plano=tokens;plano=tokens" """
+    quotas = {}
+    for item in value.split(";"):
+        if item.strip():
+            plan, _, tokens = item.partition("=")
+            quotas[plan.strip()] = int(tokens)
+    return quotas
+
+def month_start(day: Optional[date] = None) -> date:
+    return (day or date.today()).replace(day=1)
+
+# (user_id, dia, endpoint, modelo) -> [prompt_tokens, completion_tokens, requisições]
+UsageKey = Tuple[Optional[str], date, str, str]
+
+class UsageRecorder:
+    """
+    Acumula o consumo de tokens em memória e grava no banco em lotes, fora do
+    caminho da requisição. Registros do mesmo usuário, dia, endpoint e modelo
+    são somados antes da gravação.
+    """
+    def __init__(self, session_factory=SessionLocal, flush_interval: float = 5.0, max_pending: int = 500):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[UsageKey, List[int]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, model: str, usage: Optional[Dict[str, Any]]) -> None:
+        """Registra o bloco `usage` de uma resposta da API no contexto da requisição atual"""
+        if not usage:
+            return
+        context = usage_context.get() or UsageContext(user_id=None, endpoint="interno")
+        prompt_tokens = int(usage.get("prompt_tokens") or 0)
+        completion_tokens = int(usage.get("completion_tokens") or 0)
+        key = (context.user_id, date.today(), context.endpoint, model)
+
+        with self._lock:
+            totals = self._pending.setdefault(key, [0, 0, 0])
+            totals[0] += prompt_tokens
+            totals[1] += completion_tokens
+            totals[2] += 1
+            pending = len(self._pending)
+
+        if context.user_id:
+            _add_to_month_usage(context.user_id, prompt_tokens + completion_tokens)
+
+        if pending >= self.max_pending:
+            try:
+                asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:
+                pass
+
+    def pending_tokens(self, user_id: str, since: date) -> int:
+        """Tokens ainda não gravados de um usuário a partir de uma data"""
+        with self._lock:
+            return sum(
+                totals[0] + totals[1]
+                for (key_user, day, _, _), totals in self._pending.items()
+                if key_user == user_id and day >= since
+            )
+
+    def _write(self, batch: Dict[UsageKey, List[int]]) -> None:
+        db = self.session_factory()
+        try:
+            for (user_id, day, endpoint, model), (prompt_tokens, completion_tokens, requests) in batch.items():
+                row = db.query(AIUsage).filter(
+                    AIUsage.user_id == user_id if user_id else AIUsage.user_id.is_(None),
+                    AIUsage.day == day,
+                    AIUsage.endpoint == endpoint,
+                    AIUsage.model == model
+                ).first()
+                if row is None:
+                    row = AIUsage(
+                        user_id=user_id, day=day, endpoint=endpoint, model=model,
+                        prompt_tokens=0, completion_tokens=0, requests=0
+                    )
+                    db.add(row)
+                row.prompt_tokens += prompt_tokens
+                row.completion_tokens += completion_tokens
+                row.requests += requests
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def flush(self) -> None:
+        """Grava os registros acumulados; em caso de erro, eles voltam para a fila"""
+        async with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return
+            try:
+                await run_in_threadpool(self._write, batch)
+            except Exception as e:
+                logger.error("Erro ao gravar o consumo de tokens da IA: %s", e)
+                with self._lock:
+                    for key, (prompt_tokens, completion_tokens, requests) in batch.items():
+                        totals = self._pending.setdefault(key, [0, 0, 0])
+                        totals[0] += prompt_tokens
+                        totals[1] += completion_tokens
+                        totals[2] += requests
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Interrompe a gravação periódica e grava o que estiver pendente"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+usage_recorder = UsageRecorder(
+    flush_interval=settings.AI_USAGE_FLUSH_INTERVAL,
+    max_pending=settings.AI_USAGE_MAX_PENDING
+)
+
+# Plano e consumo do mês por usuário, para que a verificação de cota não consulte o banco a cada chamada
+_plan_cache = TTLCache(maxsize=10000, ttl=300)
+_month_usage_cache = TTLCache(maxsize=10000, ttl=60)
+
+def _add_to_month_usage(user_id: str, tokens: int) -> None:
+    cached = _month_usage_cache.get(user_id)
+    if cached is not None and cached[0] == month_start():
+        _month_usage_cache.set(user_id, (cached[0], cached[1] + tokens))
+
+def clear_usage_cache() -> None:
+    _plan_cache.clear()
+    _month_usage_cache.clear()
+
+def get_user_plan(db: Session, user_id: str) -> str:
+    """Plano da assinatura ativa do usuário (ou o plano padrão)"""
+    plan = _plan_cache.get(user_id)
+    if plan is None:
+        subscription = db.query(Subscription.plan_id).filter(
+            Subscription.user_id == user_id,
+            Subscription.status == "active",
+            Subscription.expires_at > datetime.utcnow()
+        ).order_by(Subscription.expires_at.desc()).first()
+        plan = subscription[0] if subscription else settings.AI_DEFAULT_PLAN
+        _plan_cache.set(user_id, plan)
+    return plan
+
+def get_quota(plan: str) -> Optional[int]:
+    """Cota mensal de tokens do plano; None para ilimitado"""
+    quota = parse_quotas(settings.AI_TOKEN_QUOTAS).get(plan)
+    return quota or None
+
+def get_month_usage(db: Session, user_id: str) -> int:
+    """Tokens consumidos pelo usuário no mês corrente, incluindo os ainda não gravados"""
+    start = month_start()
+    cached = _month_usage_cache.get(user_id)
+    if cached is not None and cached[0] == start:
+        return cached[1]
+
+    stored = db.query(
+        func.coalesce(func.sum(AIUsage.prompt_tokens + AIUsage.completion_tokens), 0)
+    ).filter(AIUsage.user_id == user_id, AIUsage.day >= start).scalar()
+    total = int(stored) + usage_recorder.pending_tokens(user_id, start)
+    _month_usage_cache.set(user_id, (start, total))
+    return total
+
+async def track_ai_usage(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+) -> None:
+    """
+    Dependência dos endpoints de IA: recusa a requisição se a cota do mês acabou
+    e associa o consumo das chamadas seguintes ao usuário e ao endpoint.
+    """
+    quota = get_quota(get_user_plan(db, current_user.id))
+    if quota is not None and get_month_usage(db, current_user.id) >= quota:
+        raise HTTPException(
+            status_code=status.HTTP_402_PAYMENT_REQUIRED,
+            detail="Cota mensal de uso da IA esgotada para o seu plano"
+        )
+    usage_context.set(UsageContext(user_id=current_user.id, endpoint=request.url.path))
+
+async def get_usage_report(db: Session, user_id: str, days: int = 30) -> Dict[str, Any]:
+    """Relatório de consumo do usuário: cota do mês e totais por endpoint, modelo e dia"""
+    await usage_recorder.flush()
+
+    since = date.today() - timedelta(days=days - 1)
+    base = db.query(AIUsage).filter(AIUsage.user_id == user_id, AIUsage.day >= since)
+    tokens = func.sum(AIUsage.prompt_tokens + AIUsage.completion_tokens)
+
+    def grouped(column):
+        rows = base.with_entities(
+            column,
+            func.sum(AIUsage.prompt_tokens),
+            func.sum(AIUsage.completion_tokens),
+            func.sum(AIUsage.requests)
+        ).group_by(column).order_by(tokens.desc()).all()
+        return [
+            {
+                "key": str(key),
+                "prompt_tokens": int(prompt_tokens or 0),
+                "completion_tokens": int(completion_tokens or 0),
+                "total_tokens": int((prompt_tokens or 0) + (completion_tokens or 0)),
+                "requests": int(requests or 0)
+            }
+            for key, prompt_tokens, completion_tokens, requests in rows
+        ]
+
+    daily = sorted(grouped(AIUsage.day), key=lambda item: item["key"])
+    plan = get_user_plan(db, user_id)
+    quota = get_quota(plan)
+    _month_usage_cache.pop(user_id)
+    used = get_month_usage(db, user_id)
+
+    return {
+        "plan": plan,
+        "quota": quota,
+        "used_this_month": used,
+        "remaining": max(0, quota - used) if quota is not None else None,
+        "by_endpoint": grouped(AIUsage.endpoint),
+        "by_model": grouped(AIUsage.model),
+        "daily": daily
+    }
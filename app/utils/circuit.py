@@ -0,0 +1,82 @@
+import time
+import threading
+from typing import Any, Dict, Optional
+
+class CircuitOpenError(Exception):
+    """Chamada recusada sem tentar: o serviço externo falhou repetidamente há pouco"""
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+class CircuitBreaker:
+    """
+    Disjuntor de chamadas a um serviço externo. Após `failure_threshold` falhas
+    seguidas o circuito abre e as chamadas falham na hora, sem esperar o tempo
+    limite; passados `reset_timeout` segundos, uma única chamada de teste decide
+    se ele fecha de novo ou continua aberto.
+    """
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def _acquire(self) -> Optional[bool]:
+        """None se a chamada for recusada; senão, se ela é a chamada de teste"""
+        with self._lock:
+            state = self.state
+            if state == CLOSED:
+                return False
+            if state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return None
+
+    def allow(self) -> bool:
+        return self._acquire() is not None
+
+    def check(self) -> bool:
+        """Recusa a chamada com o circuito aberto; retorna se ela é a chamada de teste"""
+        trial = self._acquire()
+        if trial is None:
+            raise CircuitOpenError(f"Circuito {self.name} aberto após {self.failures} falhas seguidas")
+        return trial
+
+    def release_trial(self) -> None:
+        """Libera a chamada de teste que terminou sem resultado (cancelada ou com erro local)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                # A chamada de teste falhou (ou o limite foi atingido): recomeça a espera
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def reset(self) -> None:
+        self.record_success()
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.state
+        data: Dict[str, Any] = {"state": state, "failures": self.failures}
+        if state == OPEN:
+            data["retry_in"] = round(self.reset_timeout - (time.monotonic() - self._opened_at), 1)
+        return data
@@ -0,0 +1,63 @@
+import json
+import datetime
+import decimal
+from typing import Any, Dict, Iterable, List, Type
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse, Response
+
+from app.core.config import settings
+from app.utils.tracing import tracer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(value: Any) -> Any:
+    """Conversões do fallback com a biblioteca padrão (o orjson já trata datetime nativamente)"""
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    raise TypeError(f"Tipo não serializável em JSON: {type(value).__name__}")
+
+def dumps(content: Any) -> bytes:
+    """Serializa para JSON em bytes, usando o orjson quando instalado"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(Response):
+    """Resposta JSON que serializa diretamente, sem passar pelo jsonable_encoder"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        with tracer.start_span("serialize", attributes={"serializer": "orjson" if orjson is not None else "json"}) as span:
+            body = dumps(content)
+            span.set_attribute("response.body.size", len(body))
+            return body
+
+class TracedJSONResponse(JSONResponse):
+    """JSONResponse padrão do FastAPI, com a serialização registrada no trace da requisição"""
+
+    def render(self, content: Any) -> bytes:
+        with tracer.start_span("serialize", attributes={"serializer": "json"}) as span:
+            body = super().render(content)
+            span.set_attribute("response.body.size", len(body))
+            return body
+
+def schema_columns(model, schema: Type[BaseModel]) -> List:
+    """Colunas do modelo correspondentes aos campos do esquema de resposta, na mesma ordem"""
+    return [getattr(model, name) for name in schema.model_fields]
+
+def list_response(key: str, rows: Iterable) -> Any:
+    """
+    Monta a resposta de um endpoint de listagem a partir de tuplas de colunas (ou dicionários).
+    No modo rápido a resposta é serializada direto, sem validação pelo response_model;
+    as colunas devem vir de `schema_columns` para que o formato seja o mesmo do esquema.
+    """
+    items: List[Dict[str, Any]] = [row if isinstance(row, dict) else dict(row._mapping) for row in rows]
+    if settings.FAST_JSON_RESPONSES:
+        return FastJSONResponse({key: items})
+    return {key: items}
@@ -1,18 +1,159 @@
-import logging
+import os
 import sys
-from typing import Any
+import json
+import copy
+import queue
+import atexit
+import logging
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import on_reload, settings
+
+# ID da requisição atual, definido pelo RequestIdMiddleware
+request_id_context: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+def truncate(value: str, limit: int) -> str:
+    if limit <= 0 or len(value) <= limit:
+        return value
+    return f"{value[:limit]}…[+{len(value) - limit} caracteres]"
+
+class JsonFormatter(logging.Formatter):
+    """Um objeto JSON por linha, com o ID da requisição quando houver"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            data["request_id"] = request_id
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+class TruncatingQueueHandler(QueueHandler):
+    """
+    Enfileira os registros para uma thread de escrita, sem bloquear o event loop
+    na saída. A mensagem só é montada aqui, para registros que passaram do nível
+    configurado, e argumentos grandes (ex: corpo de respostas da IA) são truncados.
+    Com a fila cheia, o registro é descartado.
+    """
+    def __init__(self, log_queue: queue.Queue, max_length: int):
+        super().__init__(log_queue)
+        self.max_length = max_length
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        args = record.args
+        if isinstance(args, tuple):
+            args = tuple(truncate(arg, self.max_length) if isinstance(arg, str) else arg for arg in args)
+        record.msg = truncate(record.msg % args if args else str(record.msg), self.max_length)
+        record.args = None
+        if record.exc_info:
+            # Tracebacks não atravessam a fila; seguem já formatados
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.message = record.msg
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def _record_factory(factory):
+    def create(*args, **kwargs) -> logging.LogRecord:
+        record = factory(*args, **kwargs)
+        # Lido no contexto de quem registrou, antes de o registro ir para a fila
+        record.request_id = request_id_context.get()
+        return record
+    return create
 
-# Configurar o logger
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+def create_queue_handler(handler: logging.Handler) -> Tuple[TruncatingQueueHandler, QueueListener]:
+    """Handler de fila ligado a um QueueListener que escreve em `handler`"""
+    log_queue: queue.Queue = queue.Queue(settings.LOG_QUEUE_SIZE)
+    queue_handler = TruncatingQueueHandler(log_queue, settings.LOG_MAX_MESSAGE_LENGTH)
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    return queue_handler, listener
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    """Níveis por logger: 'sqlalchemy.engine=INFO;httpx=WARNING' -> {'sqlalchemy.engine': 'INFO', 'httpx': 'WARNING'}"""
+    levels = {}
+    for item in spec.split(";"):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def _apply_levels(level: str, spec: str, previous_spec: str = "") -> None:
+    logging.getLogger().setLevel(level.upper())
+    levels = _parse_levels(spec)
+    # Loggers retirados de LOG_LEVELS voltam a herdar o nível da raiz
+    for name in _parse_levels(previous_spec).keys() - levels.keys():
+        logging.getLogger(name).setLevel(logging.NOTSET)
+    for name, logger_level in levels.items():
+        logging.getLogger(name).setLevel(logger_level)
+
+def configure_logging() -> QueueListener:
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+
+    queue_handler, listener = create_queue_handler(stream_handler)
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    _apply_levels(settings.LOG_LEVEL, settings.LOG_LEVELS)
+
+    logging.setLogRecordFactory(_record_factory(logging.getLogRecordFactory()))
+    listener.start()
+    atexit.register(stop_listener)
+    # A thread de escrita não sobrevive ao fork dos workers (ex: gunicorn --preload)
+    os.register_at_fork(after_in_child=_restart_listener)
+    return listener
+
+def fork_listener(queue_handler: QueueHandler, listener: QueueListener) -> QueueListener:
+    """
+    Nova fila e nova thread de escrita para o processo filho, ligadas ao mesmo handler.
+    A fila herdada não é reaproveitada: a thread do pai esperava nela no momento do
+    fork e continuaria registrada na condição, recebendo os avisos da nova thread.
+    Os registros pendentes ficam com o pai, que os escreve.
+    """
+    log_queue: queue.Queue = queue.Queue(settings.LOG_QUEUE_SIZE)
+    queue_handler.queue = log_queue
+    child_listener = QueueListener(log_queue, *listener.handlers, respect_handler_level=listener.respect_handler_level)
+    child_listener.start()
+    return child_listener
+
+def _restart_listener() -> None:
+    global listener
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, TruncatingQueueHandler):
+            listener = fork_listener(handler, listener)
+
+def stop_listener() -> None:
+    """Escreve os registros pendentes e encerra a thread de escrita do processo atual"""
+    listener.stop()
+
+@on_reload
+def _reload_logging(previous, new) -> None:
+    _apply_levels(new.LOG_LEVEL, new.LOG_LEVELS, previous.LOG_LEVELS)
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, TruncatingQueueHandler):
+            handler.max_length = new.LOG_MAX_MESSAGE_LENGTH
+
+listener = configure_logging()
 
 # Criar o logger
 logger = logging.getLogger("lawai")
-
-# Definir nível de log com base no ambiente
-logger.setLevel(logging.INFO)  # Pode ser ajustado com base em variáveis de ambiente
\ No newline at end of file
@@ -0,0 +1,386 @@
+import os
+import json
+import glob
+import time
+import asyncio
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.utils.logger import logger
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            values = [[list(labels), self._copy(value)] for labels, value in self._values.items()]
+        return {"type": self.type_name, "help": self.documentation, "labelnames": list(self.labelnames), "values": values}
+
+    def _copy(self, value):
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+class Counter(_Metric):
+    """Contador monotônico por combinação de rótulos"""
+    type_name = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+class Gauge(_Metric):
+    """Valor instantâneo por combinação de rótulos"""
+    type_name = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+class Histogram(_Metric):
+    """
+    Histograma com buckets fixos. Cada observação incrementa apenas um bucket;
+    os valores acumulados são calculados na exposição.
+    """
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            data = self._values.get(labels)
+            if data is None:
+                # Contagem por bucket (o último é +Inf), soma e total
+                data = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            data[0][index] += 1
+            data[1] += value
+            data[2] += 1
+
+    def _copy(self, value):
+        return [list(value[0]), value[1], value[2]]
+
+    def snapshot(self) -> dict:
+        data = super().snapshot()
+        data["buckets"] = list(self.buckets)
+        return data
+
+class Registry:
+    """Conjunto das métricas do processo"""
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def clear(self) -> None:
+        for metric in self._metrics.values():
+            metric.clear()
+
+registry = Registry()
+
+# Métricas da aplicação
+http_requests = registry.counter(
+    "lawai_http_requests_total", "Requisições HTTP atendidas", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "lawai_http_request_duration_seconds", "Latência das requisições HTTP", ("method", "route")
+)
+http_exceptions = registry.counter(
+    "lawai_http_exceptions_total", "Exceções não tratadas durante requisições", ("method", "route")
+)
+db_queries_per_request = registry.histogram(
+    "lawai_db_queries_per_request", "Consultas SQL por requisição", ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+db_time_per_request = registry.histogram(
+    "lawai_db_seconds_per_request", "Tempo gasto em consultas SQL por requisição", ("route",)
+)
+ai_request_duration = registry.histogram(
+    "lawai_ai_request_duration_seconds", "Latência das chamadas à API de IA", ("operation", "status")
+)
+event_loop_lag = registry.gauge(
+    "lawai_event_loop_lag_seconds", "Atraso mais recente do event loop", ("pid",)
+)
+event_loop_lag_histogram = registry.histogram(
+    "lawai_event_loop_lag_distribution_seconds", "Distribuição do atraso do event loop",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+startup_step_seconds = registry.gauge(
+    "lawai_startup_step_seconds", "Duração de cada etapa da inicialização do worker", ("pid", "step")
+)
+time_to_first_request = registry.gauge(
+    "lawai_time_to_first_request_seconds", "Tempo entre o início do processo e a primeira resposta", ("pid",)
+)
+
+# Vários workers: cada processo grava periodicamente seu snapshot em METRICS_MULTIPROC_DIR
+# e a exposição soma os arquivos de todos os processos. Os contadores e histogramas de
+# processos encerrados são somados a um único arquivo, para que os totais não diminuam
+
+RETIRED_FILE = "metrics-retired.json"
+
+def _snapshot_path(directory: str, pid: int) -> str:
+    return os.path.join(directory, f"metrics-{pid}.json")
+
+@contextmanager
+def _directory_lock(directory: str, exclusive: bool):
+    """Impede que a exposição leia os arquivos no meio da incorporação de um processo encerrado"""
+    try:
+        import fcntl
+    except ImportError:  # Sem fork (Windows) não há vários workers gravando
+        yield
+        return
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, ".lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def _write_json(path: str, data) -> None:
+    with open(path + ".tmp", "w") as output:
+        json.dump(data, output)
+    os.replace(path + ".tmp", path)
+
+def write_snapshot() -> None:
+    directory = settings.METRICS_MULTIPROC_DIR
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    _write_json(_snapshot_path(directory, os.getpid()), registry.snapshot())
+
+def _merge(target: Dict[str, dict], snapshot: Dict[str, dict]) -> None:
+    for name, data in snapshot.items():
+        merged = target.setdefault(name, {key: value for key, value in data.items() if key != "values"})
+        values = merged.setdefault("_values", {})
+        for labels, value in data["values"]:
+            key = tuple(labels)
+            current = values.get(key)
+            if current is None:
+                values[key] = value
+            elif data["type"] == "counter":
+                values[key] = current + value
+            elif data["type"] == "histogram":
+                values[key] = [
+                    [a + b for a, b in zip(current[0], value[0])],
+                    current[1] + value[1],
+                    current[2] + value[2]
+                ]
+            else:
+                values[key] = value
+
+def collect() -> Dict[str, dict]:
+    """Métricas de todos os processos (ou apenas deste, sem diretório compartilhado)"""
+    merged: Dict[str, dict] = {}
+    directory = settings.METRICS_MULTIPROC_DIR
+    if directory:
+        own_path = _snapshot_path(directory, os.getpid())
+        with _directory_lock(directory, exclusive=False):
+            for path in glob.glob(os.path.join(directory, "metrics-*.json")):
+                if path == own_path:
+                    continue
+                try:
+                    with open(path) as source:
+                        _merge(merged, json.load(source))
+                except (OSError, ValueError):
+                    continue
+    # Os valores deste processo vêm da memória, não do último arquivo gravado
+    _merge(merged, registry.snapshot())
+    return merged
+
+def _as_snapshot(merged: Dict[str, dict]) -> Dict[str, dict]:
+    """Converte o resultado de _merge de volta para o formato gravado nos arquivos"""
+    return {
+        name: dict(
+            {key: value for key, value in data.items() if key != "_values"},
+            values=[[list(labels), value] for labels, value in data["_values"].items()]
+        )
+        for name, data in merged.items()
+    }
+
+def retire_snapshot(pid: Optional[int] = None) -> None:
+    """
+    Soma os contadores e histogramas de um processo encerrado ao arquivo dos processos
+    anteriores e remove o arquivo dele. Sem `pid`, usa os valores em memória deste processo
+    (encerramento normal); o supervisor informa o PID dos workers que morreram.
+    """
+    directory = settings.METRICS_MULTIPROC_DIR
+    if not directory:
+        return
+    path = _snapshot_path(directory, pid or os.getpid())
+    with _directory_lock(directory, exclusive=True):
+        if pid is None:
+            snapshot = registry.snapshot()
+        else:
+            try:
+                with open(path) as source:
+                    snapshot = json.load(source)
+            except FileNotFoundError:
+                return
+            except ValueError:
+                snapshot = {}
+        # O valor de um gauge só vale enquanto o processo existe
+        snapshot = {name: data for name, data in snapshot.items() if data["type"] != "gauge"}
+
+        retired_path = os.path.join(directory, RETIRED_FILE)
+        merged: Dict[str, dict] = {}
+        try:
+            with open(retired_path) as source:
+                _merge(merged, json.load(source))
+        except (OSError, ValueError):
+            pass
+        _merge(merged, snapshot)
+        _write_json(retired_path, _as_snapshot(merged))
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def clear_directory() -> None:
+    """Remove os arquivos de uma execução anterior; chamado pelo supervisor antes de criar os workers"""
+    directory = settings.METRICS_MULTIPROC_DIR
+    if not directory:
+        return
+    with _directory_lock(directory, exclusive=True):
+        for path in glob.glob(os.path.join(directory, "metrics-*.json*")):
+            os.remove(path)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+def render(metrics: Optional[Dict[str, dict]] = None) -> str:
+    """Formato de exposição em texto do Prometheus"""
+    metrics = collect() if metrics is None else metrics
+    lines: List[str] = []
+    for name, data in sorted(metrics.items()):
+        lines.append(f"# HELP {name} {data['help']}")
+        lines.append(f"# TYPE {name} {data['type']}")
+        labelnames = data["labelnames"]
+        for labels, value in sorted(data.get("_values", {}).items()):
+            if data["type"] != "histogram":
+                lines.append(f"{name}{_labels(labelnames, labels)} {_format_number(value)}")
+                continue
+            counts, total, count = value
+            cumulative = 0
+            for bound, bucket_count in zip(list(data["buckets"]) + [float("inf")], counts):
+                cumulative += bucket_count
+                le = _format_number(bound)
+                lines.append(f"{name}_bucket{_labels(labelnames, labels, ('le', le))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labelnames, labels)} {_format_number(total)}")
+            lines.append(f"{name}_count{_labels(labelnames, labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+class _BackgroundTasks:
+    """Monitor de atraso do event loop e gravação periódica do snapshot"""
+    def __init__(self):
+        self._tasks: List[asyncio.Task] = []
+
+    async def _monitor_lag(self, interval: float) -> None:
+        loop = asyncio.get_running_loop()
+        pid = str(os.getpid())
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - started - interval)
+            event_loop_lag.set(lag, pid)
+            event_loop_lag_histogram.observe(lag)
+
+    async def _flush(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                write_snapshot()
+            except OSError as e:
+                logger.error("Erro ao gravar snapshot de métricas: %s", e)
+
+    def start(self) -> None:
+        if self._tasks or not settings.METRICS_ENABLED:
+            return
+        loop = asyncio.get_running_loop()
+        self._tasks.append(loop.create_task(self._monitor_lag(settings.METRICS_LOOP_LAG_INTERVAL)))
+        if settings.METRICS_MULTIPROC_DIR:
+            self._tasks.append(loop.create_task(self._flush(settings.METRICS_FLUSH_INTERVAL)))
+
+    def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        try:
+            retire_snapshot()
+        except OSError as e:
+            logger.error("Erro ao gravar snapshot de métricas: %s", e)
+
+background = _BackgroundTasks()
+
+class ai_timer:
+    """Mede a duração de uma chamada à API de IA: `with ai_timer("legal_search") as call: ...`"""
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.status = "error"
+
+    def __enter__(self) -> "ai_timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        ai_request_duration.observe(time.perf_counter() - self._started, self.operation, str(self.status))
+
+def route_label(scope) -> str:
+    """Padrão da rota da requisição (ex: /api/cases/{case_id}), usado como rótulo"""
+    # Rotas sem correspondência não devem gerar um rótulo por URL
+    if scope.get("route") is None:
+        return "<sem rota>"
+    # Reconstrói o padrão a partir do caminho e dos parâmetros (rotas incluídas
+    # com prefixo não expõem o padrão completo)
+    path = scope["path"]
+    for name, value in scope.get("path_params", {}).items():
+        value = str(value)
+        if not value:
+            continue
+        index = path.rfind("/" + value)
+        end = index + len(value) + 1
+        if index >= 0 and (end == len(path) or path[end] == "/"):
+            path = f"{path[:index + 1]}{{{name}}}{path[end:]}"
+    return path
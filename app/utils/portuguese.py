@@ -0,0 +1,79 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List, Iterator, Tuple
+
+# Palavras muito frequentes que não ajudam na busca
+STOPWORDS = frozenset("""
+a ao aos as ate com como da das de dela dele deles do dos e ela elas ele eles em entre
+era essa esse esta este eu foi ha isso isto ja lhe mais mas me mesmo meu minha na nas
+nao nem no nos o os ou para pela pelas pelo pelos por qual quando que quem se sem ser
+seu sua suas seus so sob sobre tambem te tem um uma umas uns voce
+""".split())
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Regras de redução aplicadas em ordem: (sufixo, substituição, tamanho mínimo do radical)
+_PLURAL_RULES = [
+    ("oes", "ao", 1), ("aes", "ao", 1), ("ais", "al", 1), ("eis", "el", 2),
+    ("ois", "ol", 1), ("is", "il", 2), ("les", "l", 2), ("res", "r", 2),
+    ("zes", "z", 2), ("ns", "m", 1), ("s", "", 2),
+]
+_FEMININE_RULES = [
+    ("ona", "ao", 3), ("ora", "or", 2), ("eira", "eiro", 3), ("ica", "ico", 3),
+    ("ada", "ado", 2), ("ida", "ido", 3), ("iva", "ivo", 3), ("osa", "oso", 3),
+    ("na", "no", 4), ("a", "o", 3),
+]
+_SUFFIX_RULES = [
+    ("amentos", "", 4), ("imentos", "", 4), ("amento", "", 3), ("imento", "", 3),
+    ("adores", "", 3), ("adoras", "", 3), ("ador", "", 3), ("adora", "", 3),
+    ("acoes", "", 3), ("icoes", "", 4), ("acao", "", 3), ("icao", "", 4),
+    ("mente", "", 4), ("idade", "", 4), ("ancia", "", 3), ("encia", "", 3),
+    ("avel", "", 3), ("ivel", "", 3), ("ismo", "", 3), ("ista", "", 3),
+    ("ando", "", 2), ("endo", "", 3), ("indo", "", 3),
+    ("ado", "", 2), ("ido", "", 3), ("ivo", "", 3), ("oso", "", 3),
+    ("ar", "", 2), ("er", "", 3), ("ir", "", 3),
+]
+_VOWEL_ENDINGS = ("a", "e", "o")
+
+def fold_accents(text: str) -> str:
+    """Remove acentos e cedilhas (ex: "ação" -> "acao")"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+def _apply_rules(word: str, rules) -> str:
+    for suffix, replacement, min_stem in rules:
+        if word.endswith(suffix) and len(word) - len(suffix) >= min_stem:
+            return word[: len(word) - len(suffix)] + replacement
+    return word
+
+@lru_cache(maxsize=50000)
+def stem(word: str) -> str:
+    """
+    Radicalizador leve para o português (inspirado no RSLP): reduz plural,
+    feminino e sufixos comuns. Espera palavras já em minúsculas e sem acentos.
+    """
+    if len(word) < 4:
+        return word
+    word = _apply_rules(word, _PLURAL_RULES)
+    word = _apply_rules(word, _FEMININE_RULES)
+    word = _apply_rules(word, _SUFFIX_RULES)
+    if len(word) > 3 and word.endswith(_VOWEL_ENDINGS):
+        word = word[:-1]
+    return word
+
+def normalize_token(token: str) -> str:
+    """Normaliza um token: minúsculas, sem acentos e radicalizado"""
+    return stem(fold_accents(token.lower()))
+
+def iter_tokens(text: str) -> Iterator[Tuple[str, int, int]]:
+    """Percorre os termos indexáveis do texto com suas posições (termo, início, fim)"""
+    for match in _TOKEN_RE.finditer(text or ""):
+        folded = fold_accents(match.group().lower())
+        if len(folded) < 2 or folded in STOPWORDS or folded.isdigit() and len(folded) < 3:
+            continue
+        yield stem(folded), match.start(), match.end()
+
+def analyze(text: str) -> List[str]:
+    """Converte um texto na lista de termos normalizados usados pelo índice"""
+    return [term for term, _, _ in iter_tokens(text)]
@@ -0,0 +1,177 @@
+import os
+import re
+import sys
+import asyncio
+import threading
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.utils.logger import logger
+
+# Saída no formato "collapsed" (uma pilha por linha, quadros separados por ";" e a
+# contagem no fim), lido por flamegraph.pl, speedscope e inferno.
+
+class ProfilerError(Exception):
+    """Coleta em andamento ou ainda não iniciada neste worker"""
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}:{code.co_firstlineno}"
+
+def _collapse(frame, thread_name: str) -> str:
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.append(thread_name)
+    return ";".join(reversed(stack))
+
+def render_collapsed(samples: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+class StackSampler:
+    """
+    Amostra periodicamente as pilhas de todas as threads do processo (incluindo a
+    do event loop) a partir de uma thread separada. Não altera o código amostrado;
+    o custo existe só enquanto a amostragem está ativa.
+    """
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self.samples[_collapse(frame, names.get(thread_id, str(thread_id)))] += 1
+
+    def start(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._run, name="lawai-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.samples
+
+def _route_pattern(route: str) -> re.Pattern:
+    """/api/cases/{case_id} -> expressão que aceita qualquer valor no lugar dos parâmetros"""
+    parts = re.split(r"(\{[^}]+\})", route)
+    return re.compile("".join("[^/]+" if part.startswith("{") else re.escape(part) for part in parts) + "$")
+
+@dataclass
+class RouteCapture:
+    route: str
+    remaining: int
+    interval: float
+    pattern: re.Pattern = field(init=False)
+    samples: Counter = field(default_factory=Counter)
+    captured: int = 0
+
+    def __post_init__(self):
+        self.pattern = _route_pattern(self.route)
+
+    @property
+    def done(self) -> bool:
+        return self.remaining <= 0
+
+class Profiler:
+    """
+    Coletas sob demanda de um worker: pilhas amostradas por alguns segundos, pilhas
+    das próximas K requisições de uma rota e diferenças entre snapshots do tracemalloc.
+    """
+    def __init__(self):
+        self._sampling = False
+        self.route_captures: Dict[str, RouteCapture] = {}
+        self._previous_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    # Pilhas amostradas por um período
+
+    async def sample(self, seconds: float, interval: float) -> Counter:
+        if self._sampling:
+            raise ProfilerError("Já existe uma amostragem em andamento")
+        self._sampling = True
+        sampler = StackSampler(interval).start()
+        try:
+            # O event loop continua atendendo requisições enquanto é amostrado
+            await asyncio.sleep(seconds)
+        finally:
+            samples = sampler.stop()
+            self._sampling = False
+        logger.info("Perfil de CPU coletado: %ss, %s amostras", seconds, sum(samples.values()))
+        return samples
+
+    # Próximas K requisições de uma rota
+
+    def capture_route(self, route: str, count: int, interval: float) -> RouteCapture:
+        capture = RouteCapture(route=route, remaining=count, interval=interval)
+        self.route_captures[route] = capture
+        return capture
+
+    def match(self, path: str) -> Optional[RouteCapture]:
+        for capture in self.route_captures.values():
+            if not capture.done and capture.pattern.match(path):
+                # Reserva a vaga antes da requisição, para não ultrapassar K com requisições simultâneas
+                capture.remaining -= 1
+                return capture
+        return None
+
+    def pop_route_capture(self, route: str) -> Optional[RouteCapture]:
+        return self.route_captures.pop(route, None)
+
+    # Alocações de memória
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        # Ignora as alocações do próprio tracemalloc
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+
+    def start_memory(self, frames: int) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._previous_snapshot = self._take_snapshot()
+
+    def memory_diff(self, top: int, collapsed: bool = False) -> str:
+        """Maiores variações de memória desde o snapshot anterior, que passa a ser o atual"""
+        if not tracemalloc.is_tracing() or self._previous_snapshot is None:
+            raise ProfilerError("Rastreamento de memória não iniciado")
+        snapshot = self._take_snapshot()
+        group = "traceback" if collapsed else "lineno"
+        stats = snapshot.compare_to(self._previous_snapshot, group)[:top]
+        self._previous_snapshot = snapshot
+
+        if collapsed:
+            lines = []
+            for stat in stats:
+                if stat.size_diff <= 0:
+                    continue
+                stack = ";".join(
+                    f"{os.path.splitext(os.path.basename(frame.filename))[0]}:{frame.lineno}"
+                    for frame in reversed(stat.traceback)
+                )
+                lines.append(f"{stack} {stat.size_diff}\n")
+            return "".join(lines)
+        return "".join(f"{stat}\n" for stat in stats)
+
+    def stop_memory(self) -> None:
+        self._previous_snapshot = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+profiler = Profiler()
+
+def sample_interval(interval_ms: Optional[float]) -> float:
+    return max(interval_ms or settings.PROFILING_SAMPLE_INTERVAL_MS, 1.0) / 1000
@@ -0,0 +1,75 @@
+import time
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.token import RevokedToken
+from app.utils.logger import logger
+
+class RevocationList:
+    """
+    Conjunto em memória dos access tokens revogados (jti -> expiração).
+    A consulta é uma busca em set; a sincronização com o banco é incremental
+    e ocorre no máximo a cada `sync_interval` segundos, o que também limita
+    quanto tempo um token revogado em outro worker continua aceito aqui.
+    
+    revoked_at é gravado antes do commit, pelo relógio de cada worker: uma
+    revogação pode ficar visível depois de outra com horário posterior. Por isso
+    cada carga relê os últimos `overlap` segundos antes da marca d'água.
+    """
+    def __init__(self, sync_interval: float = 5.0, overlap: float = 60.0):
+        self.sync_interval = sync_interval
+        self.overlap = overlap
+        self._entries: Dict[str, datetime] = {}
+        self._watermark: Optional[datetime] = None  # Maior revoked_at já carregado
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        """Registra uma revogação feita neste processo, sem esperar a próxima sincronização"""
+        with self._lock:
+            self._entries[jti] = expires_at
+
+    def sync(self, db: Session) -> None:
+        """Carrega do banco as revogações novas e descarta as que já expiraram"""
+        now = datetime.utcnow()
+        query = db.query(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at).filter(
+            RevokedToken.expires_at > now
+        )
+        if self._watermark is not None:
+            # Relê a janela de folga: revogações com horário anterior podem ter sido confirmadas depois
+            query = query.filter(RevokedToken.revoked_at >= self._watermark - timedelta(seconds=self.overlap))
+
+        rows = query.all()
+        with self._lock:
+            for jti, expires_at, revoked_at in rows:
+                self._entries[jti] = expires_at
+                if self._watermark is None or revoked_at > self._watermark:
+                    self._watermark = revoked_at
+            for jti in [jti for jti, expires_at in self._entries.items() if expires_at <= now]:
+                del self._entries[jti]
+            self._checked_at = time.monotonic()
+
+    def sync_if_stale(self, db: Session) -> None:
+        if time.monotonic() - self._checked_at < self.sync_interval:
+            return
+        try:
+            self.sync(db)
+        except Exception as e:
+            # Sem o banco, seguimos com o conjunto atual e tentamos de novo no próximo intervalo
+            self._checked_at = time.monotonic()
+            logger.error("Erro ao sincronizar a lista de tokens revogados: %s", e)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._watermark = None
+            self._checked_at = 0.0
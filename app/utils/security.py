@@ -1,23 +1,76 @@
+import time
+import uuid
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Any, Optional, Union
 
-from jose import jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
-from app.core.config import settings
+from app.core.config import on_reload, settings
 from app.db.session import get_db
 from app.models.user import User
-
-# Configuração de segurança para senhas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.utils.cache import TTLCache
+from app.utils.revocation import RevocationList
+from app.utils.tracing import tracer
 
 # Configuração para o token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
 
-def create_access_token(subject: Union[str, Any], expires_delta: Optional[timedelta] = None) -> str:
+@dataclass(frozen=True)
+class CurrentUser:
+    """Cópia imutável dos dados do usuário autenticado, segura para manter em cache"""
+    id: str
+    email: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    profile_image_url: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "CurrentUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            profile_image_url=user.profile_image_url,
+            created_at=user.created_at,
+            updated_at=user.updated_at
+        )
+
+# Tokens já verificados (token -> (user_id, jti)) e usuários já carregados (user_id -> CurrentUser)
+_token_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+_user_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+
+# Access tokens revogados antes de expirar, sincronizados periodicamente com o banco
+revocation_list = RevocationList(
+    sync_interval=settings.REVOCATION_SYNC_SECONDS, overlap=settings.REVOCATION_SYNC_OVERLAP_SECONDS
+)
+
+@on_reload
+def _reload_auth_cache(previous, new) -> None:
+    for cache in (_token_cache, _user_cache):
+        cache.maxsize = new.AUTH_CACHE_MAX_ENTRIES
+        cache.ttl = new.AUTH_CACHE_TTL_SECONDS
+    revocation_list.sync_interval = new.REVOCATION_SYNC_SECONDS
+    revocation_list.overlap = new.REVOCATION_SYNC_OVERLAP_SECONDS
+
+def invalidate_user_cache(user_id: str) -> None:
+    """Remove um usuário do cache (ex: após atualização dos seus dados)"""
+    _user_cache.pop(user_id)
+
+def clear_auth_cache() -> None:
+    """Limpa os caches de autenticação"""
+    _token_cache.clear()
+    _user_cache.clear()
+    revocation_list.clear()
+
+def create_access_token(
+    subject: Union[str, Any], expires_delta: Optional[timedelta] = None, jti: Optional[str] = None
+) -> str:
     """
     Cria um token de acesso JWT
     """
@@ -26,43 +79,110 @@ def create_access_token(subject: Union[str, Any], expires_delta: Optional[timede
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode = {"exp": expire, "sub": str(subject)}
+    from jose import jwt
+    
+    # O jti identifica o token para que ele possa ser revogado
+    to_encode = {"exp": expire, "sub": str(subject), "jti": jti or uuid.uuid4().hex}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str) -> str:
+def decode_token(token: str) -> dict:
     """
-    Verifica a validade de um token JWT
+    Decodifica e valida a assinatura e a expiração de um token JWT
     """
+    from jose import jwt
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token inválido",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        return user_id
     except jwt.JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido ou expirado",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if payload.get("sub") is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+def verify_token(token: str) -> str:
+    """
+    Verifica a validade de um token JWT
+    """
+    cached = _token_cache.get(token)
+    if cached is not None:
+        user_id, jti = cached
+    else:
+        payload = decode_token(token)
+        user_id, jti = payload["sub"], payload.get("jti")
+        
+        # O token não pode permanecer no cache além da sua própria expiração
+        ttl = settings.AUTH_CACHE_TTL_SECONDS
+        if payload.get("exp"):
+            ttl = min(ttl, payload["exp"] - time.time())
+        _token_cache.set(token, (user_id, jti), ttl=ttl)
+    
+    # A revogação é conferida mesmo quando o token está em cache
+    if jti and jti in revocation_list:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revogado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user_id
+
+async def get_current_user_id(
+    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+) -> str:
+    """
+    Obtém apenas o ID do usuário atual a partir do token, sem consultar a tabela de usuários.
+    Indicado para endpoints de leitura que filtram dados pelo usuário.
+    """
+    with tracer.start_span("get_current_user_id") as span:
+        revocation_list.sync_if_stale(db)
+        user_id = verify_token(token)
+        span.set_attribute("enduser.id", user_id)
+        return user_id
 
 async def get_current_user(
     db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> User:
+) -> CurrentUser:
     """
     Obtém o usuário atual com base no token
     """
-    user_id = verify_token(token)
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    with tracer.start_span("get_current_user") as span:
+        revocation_list.sync_if_stale(db)
+        user_id = verify_token(token)
+        
+        current_user = _user_cache.get(user_id)
+        span.set_attribute("enduser.id", user_id)
+        span.set_attribute("cache.hit", current_user is not None)
+        if current_user is not None:
+            return current_user
+        
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Usuário não encontrado",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        current_user = CurrentUser.from_user(user)
+        _user_cache.set(user_id, current_user)
+        return current_user
+
+async def get_admin_user(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+    """
+    Usuário atual, desde que esteja em ADMIN_USER_IDS
+    """
+    admin_ids = {user_id.strip() for user_id in settings.ADMIN_USER_IDS.split(",") if user_id.strip()}
+    if current_user.id not in admin_ids:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Usuário não encontrado",
-            headers={"WWW-Authenticate": "Bearer"},
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso restrito a administradores"
         )
-    return user
\ No newline at end of file
+    return current_user
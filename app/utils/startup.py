@@ -0,0 +1,77 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+from app.utils import metrics
+from app.utils.logger import logger
+
+def _process_started_at() -> Optional[float]:
+    """Instante (time.time) em que o processo foi criado, lido do /proc no Linux"""
+    try:
+        with open("/proc/self/stat") as source:
+            # O nome do processo pode conter espaços; os campos seguem após o último ")"
+            fields = source.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as source:
+            uptime = float(source.read().split()[0])
+        started_after_boot = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+        return time.time() - (uptime - started_after_boot)
+    except (OSError, ValueError, IndexError):
+        return None
+
+class StartupReport:
+    """
+    Tempos da inicialização do worker: importação da aplicação, cada etapa do
+    evento de startup e o intervalo até a primeira resposta. Registrado no log
+    e exposto em /metrics.
+    """
+    def __init__(self):
+        self._started_at: Optional[Tuple[int, Optional[float]]] = None
+        self.steps: List[Tuple[str, float]] = []
+        self.first_request_seconds: Optional[float] = None
+
+    @property
+    def process_started_at(self) -> Optional[float]:
+        # Lido por PID: workers criados por fork (ex: gunicorn --preload) têm o próprio início
+        pid = os.getpid()
+        if self._started_at is None or self._started_at[0] != pid:
+            self._started_at = (pid, _process_started_at())
+        return self._started_at[1]
+
+    def since_process_start(self) -> Optional[float]:
+        started_at = self.process_started_at
+        if started_at is None:
+            return None
+        return time.time() - started_at
+
+    def record(self, name: str, seconds: float) -> None:
+        self.steps.append((name, seconds))
+        metrics.startup_step_seconds.set(seconds, str(os.getpid()), name)
+
+    @contextmanager
+    def step(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def ready(self) -> None:
+        steps = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.steps)
+        elapsed = self.since_process_start()
+        if elapsed is None:
+            logger.info("Inicialização concluída: %s", steps)
+        else:
+            logger.info("Inicialização concluída em %.2f s desde o início do processo: %s", elapsed, steps)
+
+    def first_request(self) -> None:
+        """Chamado ao final da primeira resposta do worker"""
+        if self.first_request_seconds is not None:
+            return
+        elapsed = self.since_process_start()
+        self.first_request_seconds = elapsed if elapsed is not None else 0.0
+        if elapsed is not None:
+            metrics.time_to_first_request.set(elapsed, str(os.getpid()))
+            logger.info("Primeira resposta %.2f s após o início do processo", elapsed)
+
+startup_report = StartupReport()
@@ -0,0 +1,126 @@
+import os
+import re
+import mimetypes
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+
+from app.utils.logger import logger
+
+# Arquivos com hash de conteúdo no nome (ex.: index-3f9a1c2b.js) nunca mudam
+_HASHED_NAME_RE = re.compile(r"[.-][0-9A-Za-z_-]{8,}\.[0-9a-z]+$")
+_HAS_DIGIT_RE = re.compile(r"\d")
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+# Variantes pré-comprimidas, em ordem de preferência
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+@dataclass
+class AssetVariant:
+    path: str
+    stat: os.stat_result
+    etag: str
+
+@dataclass
+class Asset:
+    media_type: str
+    immutable: bool
+    variants: Dict[str, AssetVariant] = field(default_factory=dict)  # codificação ("identity", "br", "gzip") -> arquivo
+
+def _is_hashed(name: str) -> bool:
+    match = _HASHED_NAME_RE.search(name)
+    # Exigir ao menos um dígito evita tratar nomes como "bootstrap-reboot.css" como hash
+    return bool(match and _HAS_DIGIT_RE.search(match.group(0)))
+
+def _etag(stat: os.stat_result, encoding: str) -> str:
+    suffix = "" if encoding == "identity" else f"-{encoding}"
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}{suffix}"'
+
+class AssetManifest:
+    """
+    Índice em memória dos arquivos do build do frontend, montado uma vez na inicialização.
+    Evita chamadas ao sistema de arquivos por requisição e escolhe a variante
+    pré-comprimida (.br/.gz) aceita pelo navegador.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.assets: Dict[str, Asset] = {}
+
+    def build(self) -> "AssetManifest":
+        assets: Dict[str, Asset] = {}
+        if not os.path.isdir(self.directory):
+            logger.warning("Diretório de arquivos estáticos não encontrado: %s", self.directory)
+            self.assets = assets
+            return self
+
+        compressed = tuple(suffix for _, suffix in ENCODINGS)
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(compressed):
+                    continue
+                path = os.path.join(root, name)
+                key = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                stat = os.stat(path)
+                asset = Asset(
+                    media_type=mimetypes.guess_type(name)[0] or "application/octet-stream",
+                    immutable=_is_hashed(name)
+                )
+                asset.variants["identity"] = AssetVariant(path, stat, _etag(stat, "identity"))
+                for encoding, suffix in ENCODINGS:
+                    if os.path.isfile(path + suffix):
+                        variant_stat = os.stat(path + suffix)
+                        asset.variants[encoding] = AssetVariant(path + suffix, variant_stat, _etag(stat, encoding))
+                assets[key] = asset
+
+        self.assets = assets
+        logger.info("Manifesto de arquivos estáticos: %s arquivos em %s", len(assets), self.directory)
+        return self
+
+    def get(self, key: str) -> Optional[Asset]:
+        return self.assets.get(key)
+
+def _accepted_encodings(request: Request) -> set:
+    accepted = set()
+    for item in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = item.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(name.lower())
+    return accepted
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+def serve_asset(request: Request, asset: Asset) -> Response:
+    """Responde com a melhor variante do arquivo, ou 304 se o navegador já a tiver"""
+    encoding = "identity"
+    if len(asset.variants) > 1:
+        accepted = _accepted_encodings(request)
+        for name, _ in ENCODINGS:
+            if name in asset.variants and name in accepted:
+                encoding = name
+                break
+    variant = asset.variants[encoding]
+
+    headers = {
+        "cache-control": IMMUTABLE_CACHE if asset.immutable else REVALIDATE_CACHE,
+        "etag": variant.etag,
+    }
+    if len(asset.variants) > 1:
+        headers["vary"] = "Accept-Encoding"
+    if encoding != "identity":
+        headers["content-encoding"] = encoding
+
+    if _etag_matches(request, variant.etag):
+        headers.pop("content-encoding", None)
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(variant.path, headers=headers, media_type=asset.media_type, stat_result=variant.stat)
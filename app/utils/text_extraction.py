@@ -0,0 +1,65 @@
+import os
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Optional
+
+# Este módulo roda dentro dos processos de extração: deve depender apenas da
+# biblioteca padrão (e de pypdf, opcional) para que os workers iniciem rápido.
+
+PDF_TYPES = {"application/pdf"}
+DOCX_TYPES = {"application/vnd.openxmlformats-officedocument.wordprocessingml.document"}
+
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+class UnsupportedFileType(Exception):
+    """Tipo de arquivo sem extrator de texto disponível"""
+
+def detect_kind(content_type: Optional[str], filename: Optional[str]) -> Optional[str]:
+    """Identifica o tipo do arquivo para extração (pdf, docx ou text)"""
+    extension = os.path.splitext(filename or "")[1].lower()
+    if content_type in PDF_TYPES or extension == ".pdf":
+        return "pdf"
+    if content_type in DOCX_TYPES or extension == ".docx":
+        return "docx"
+    if (content_type or "").startswith("text/") or extension == ".txt":
+        return "text"
+    return None
+
+def extract_text(path: str, kind: str) -> str:
+    """Extrai o texto de um arquivo. Executado em um processo separado."""
+    if kind == "pdf":
+        return _extract_pdf(path)
+    if kind == "docx":
+        return _extract_docx(path)
+    if kind == "text":
+        with open(path, "rb") as f:
+            return f.read().decode("utf-8", errors="replace")
+    raise UnsupportedFileType(kind)
+
+def _extract_pdf(path: str) -> str:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise UnsupportedFileType("A extração de PDF requer o pacote pypdf instalado")
+
+    reader = PdfReader(path)
+    pages = [page.extract_text() or "" for page in reader.pages]
+    return "\n\n".join(page.strip() for page in pages if page.strip())
+
+def _extract_docx(path: str) -> str:
+    with zipfile.ZipFile(path) as archive:
+        with archive.open("word/document.xml") as f:
+            tree = ET.parse(f)
+
+    paragraphs = []
+    for paragraph in tree.iter(f"{_WORD_NS}p"):
+        parts = []
+        for node in paragraph.iter():
+            if node.tag == f"{_WORD_NS}t" and node.text:
+                parts.append(node.text)
+            elif node.tag == f"{_WORD_NS}tab":
+                parts.append("\t")
+            elif node.tag in (f"{_WORD_NS}br", f"{_WORD_NS}cr"):
+                parts.append("\n")
+        paragraphs.append("".join(parts))
+    return "\n".join(paragraphs).strip()
@@ -0,0 +1,263 @@
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import on_reload, settings
+from app.utils.logger import logger
+
+# Spans no formato do OpenTelemetry (OTLP/JSON). O arquivo gerado pode ser lido pelo
+# receiver "otlpjsonfile" do OpenTelemetry Collector; com TRACING_EXPORTER=otlp, os
+# lotes são enviados para um collector em TRACING_OTLP_ENDPOINT/v1/traces.
+
+SPAN_KINDS = {"INTERNAL": 1, "SERVER": 2, "CLIENT": 3}
+_STATUS_CODES = {"UNSET": 0, "OK": 1, "ERROR": 2}
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _attribute_value(value)} for key, value in attributes.items() if value is not None]
+
+class Span:
+    """Intervalo medido dentro de um trace; usado como gerenciador de contexto"""
+    recording = True
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: str = "INTERNAL",
+                 attributes: Optional[Dict[str, Any]] = None, start_ns: Optional[int] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "UNSET"
+        self.status_message = ""
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_status(self, status: str, message: str = "") -> None:
+        self.status = status
+        self.status_message = message
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is None:
+            self.end_ns = end_ns or time.time_ns()
+            tracer.exporter.add(self)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None and self.status == "UNSET":
+            self.set_status("ERROR", f"{exc_type.__name__}: {exc}")
+        _current_span.reset(self._token)
+        self.end()
+
+    def to_otlp(self) -> Dict[str, Any]:
+        data = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KINDS[self.kind],
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _attributes(self.attributes),
+            "status": {"code": _STATUS_CODES[self.status]},
+        }
+        if self.parent_id:
+            data["parentSpanId"] = self.parent_id
+        if self.status_message:
+            data["status"]["message"] = self.status_message
+        return data
+
+class _NonRecordingSpan:
+    """Span descartado (trace não amostrado ou rastreamento desativado); não custa nada"""
+    recording = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_status(self, status: str, message: str = "") -> None:
+        pass
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        pass
+
+    def __enter__(self) -> "_NonRecordingSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+NON_RECORDING_SPAN = _NonRecordingSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def parse_traceparent(header: str) -> Optional[Tuple[str, str, bool]]:
+    """Cabeçalho W3C traceparent -> (trace_id, span_id do pai, amostrado)"""
+    parts = header.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or parts[0] == "ff":
+        return None
+    try:
+        int(parts[1], 16)
+        int(parts[2], 16)
+        flags = int(parts[3][:2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+def format_traceparent(span: Span) -> str:
+    return f"00-{span.trace_id}-{span.span_id}-01"
+
+class SpanExporter:
+    """
+    Fila limitada de spans finalizados, exportados em lotes por uma tarefa em
+    segundo plano. Com a fila cheia os spans são descartados, sem bloquear requisições.
+    """
+    def __init__(self):
+        self._queue: Deque[Span] = deque()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            if len(self._queue) >= settings.TRACING_MAX_QUEUE:
+                self.dropped += 1
+                return
+            self._queue.append(span)
+
+    def drain(self) -> List[Span]:
+        with self._lock:
+            spans = list(self._queue)
+            self._queue.clear()
+        return spans
+
+    @staticmethod
+    def encode(spans: List[Span]) -> Dict[str, Any]:
+        """Lote no formato ExportTraceServiceRequest do OTLP/JSON"""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _attributes({
+                    "service.name": settings.TRACING_SERVICE_NAME,
+                    "process.pid": os.getpid(),
+                })},
+                "scopeSpans": [{
+                    "scope": {"name": "lawai"},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }]
+        }
+
+    def _write_file(self, body: bytes) -> None:
+        path = settings.TRACING_FILE_PATH
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Um lote por linha; várias gravações em modo append não se misturam entre workers
+        with open(path, "ab") as output:
+            output.write(body + b"\n")
+
+    async def _post(self, body: bytes) -> None:
+        import httpx
+
+        url = settings.TRACING_OTLP_ENDPOINT.rstrip("/") + "/v1/traces"
+        async with httpx.AsyncClient() as client:
+            response = await client.post(url, content=body, headers={"Content-Type": "application/json"}, timeout=10.0)
+        if response.status_code >= 400:
+            logger.error("Collector de traces respondeu %s", response.status_code)
+
+    async def flush(self) -> None:
+        spans = self.drain()
+        if not spans:
+            return
+        body = json.dumps(self.encode(spans), separators=(",", ":")).encode("utf-8")
+        try:
+            if settings.TRACING_EXPORTER == "otlp":
+                await self._post(body)
+            else:
+                await asyncio.to_thread(self._write_file, body)
+        except Exception as e:
+            logger.error("Erro ao exportar %s spans: %s", len(spans), e)
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None and settings.TRACING_ENABLED:
+            self._task = asyncio.get_running_loop().create_task(self._run(settings.TRACING_EXPORT_INTERVAL))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    def clear(self) -> None:
+        self.drain()
+        self.dropped = 0
+
+class Tracer:
+    """
+    Cria spans filhos do span atual. Fora de um trace amostrado, `start_span`
+    devolve um span descartado, então a instrumentação pode ficar sempre ativa.
+    """
+    def __init__(self):
+        self.exporter = SpanExporter()
+
+    def start_trace(self, name: str, traceparent: Optional[str] = None, kind: str = "SERVER",
+                    attributes: Optional[Dict[str, Any]] = None):
+        """Span raiz de uma requisição, respeitando a decisão de amostragem de quem chamou"""
+        if not settings.TRACING_ENABLED:
+            return NON_RECORDING_SPAN
+        parent = parse_traceparent(traceparent) if traceparent else None
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+            sampled = random.random() < settings.TRACING_SAMPLE_RATIO
+        if not sampled:
+            return NON_RECORDING_SPAN
+        return Span(name, trace_id, parent_id, kind, attributes)
+
+    def start_span(self, name: str, kind: str = "INTERNAL", attributes: Optional[Dict[str, Any]] = None,
+                   start_ns: Optional[int] = None):
+        parent = _current_span.get()
+        if parent is None:
+            return NON_RECORDING_SPAN
+        return Span(name, parent.trace_id, parent.span_id, kind, attributes, start_ns)
+
+tracer = Tracer()
+
+@on_reload
+def _reload_tracing(previous, new) -> None:
+    # Rastreamento ligado por recarga: a exportação precisa começar neste worker
+    if new.TRACING_ENABLED and not previous.TRACING_ENABLED:
+        try:
+            tracer.exporter.start()
+        except RuntimeError:
+            pass
@@ -0,0 +1,56 @@
+"""
+Benchmark do custo de autenticação por requisição.
+
+Compara a verificação do JWT e a carga do usuário atual com e sem o cache
+de autenticação, usando um banco SQLite em memória.
+
+Uso: python -m benchmarks.bench_auth
+"""
+import asyncio
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.session import Base
+from app.models.user import User
+from app.utils import security
+
+REQUESTS = 5000
+
+def run(db, token: str, cached: bool) -> float:
+    """Executa as dependências de autenticação e retorna o tempo médio por requisição"""
+    security.clear_auth_cache()
+    ttl = security.settings.AUTH_CACHE_TTL_SECONDS if cached else 0
+    security._token_cache.ttl = ttl
+    security._user_cache.ttl = ttl
+
+    async def loop():
+        for _ in range(REQUESTS):
+            await security.get_current_user(db=db, token=token)
+
+    started = time.perf_counter()
+    asyncio.run(loop())
+    return (time.perf_counter() - started) / REQUESTS
+
+def main():
+    engine = create_engine(
+        "sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(User(id="bench-user", email="bench@example.com", first_name="Bench"))
+    db.commit()
+
+    token = security.create_access_token("bench-user")
+    without_cache = run(db, token, cached=False)
+    with_cache = run(db, token, cached=True)
+
+    print(f"{'modo':>12} {'por requisição':>15}")
+    print(f"{'sem cache':>12} {without_cache * 1e6:>12.1f} µs")
+    print(f"{'com cache':>12} {with_cache * 1e6:>12.1f} µs")
+    print(f"redução de {(1 - with_cache / without_cache) * 100:.1f}%")
+
+if __name__ == "__main__":
+    main()
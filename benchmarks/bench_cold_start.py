@@ -0,0 +1,94 @@
+"""
+Benchmark da inicialização a frio da API.
+
+Mostra os módulos que mais pesam na importação de app.main (python -X importtime)
+e mede, em processos novos do uvicorn, o tempo até a primeira resposta servida.
+
+Uso: python -m benchmarks.bench_cold_start [--runs 5] [--top 25]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/lawai-bench-cold-start.db")
+    env.setdefault("SESSION_SECRET", "benchmark")
+    env["PYTHONWARNINGS"] = "ignore"
+    return env
+
+def import_profile():
+    """Lista (módulo, próprio, acumulado) em segundos, a partir do -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=_env(), capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(own) / 1e6, int(cumulative) / 1e6))
+    return rows
+
+def print_import_profile(top: int):
+    rows = import_profile()
+    total = next(cumulative for name, _, cumulative in rows if name == "app.main")
+    print(f"Importação de app.main: {total * 1000:.0f} ms\n")
+
+    # Pacotes de terceiros agrupados pelo nome de topo; módulos da aplicação individualmente
+    packages = {}
+    for name, own, _ in rows:
+        key = name if name.startswith("app.") or name == "app" else name.split(".")[0]
+        packages[key] = packages.get(key, 0.0) + own
+    print(f"{'módulo/pacote':>40} {'próprio':>10}")
+    for name, own in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"{name:>40} {own * 1000:>8.1f}ms")
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def time_to_first_response(timeout: float = 30.0) -> float:
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    # Um único cliente: criar um por tentativa custa dezenas de ms e distorce a medida
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            while time.perf_counter() - started < timeout:
+                try:
+                    client.get(f"http://127.0.0.1:{port}/metrics")
+                    return time.perf_counter() - started
+                except httpx.TransportError:
+                    time.sleep(0.01)
+        raise RuntimeError("A API não respondeu dentro do tempo limite")
+    finally:
+        process.terminate()
+        process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    print_import_profile(args.top)
+
+    samples = [time_to_first_response() for _ in range(args.runs)]
+    print(f"\nTempo até a primeira resposta ({args.runs} execuções): "
+          f"mediana {statistics.median(samples) * 1000:.0f} ms, mínimo {min(samples) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark da compressão das respostas da API.
+
+Mede, para cargas representativas (lista de documentos em JSON e análise
+da IA em português), o tamanho transferido e o custo de CPU de cada
+codificação, e a vazão do middleware em uma requisição completa.
+
+Uso: python -m benchmarks.bench_compression
+"""
+import json
+import time
+import zlib
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware.compression import CompressionMiddleware, brotli
+from benchmarks.bench_text_compression import legal_text
+
+def document_list(count: int) -> bytes:
+    """Lista de documentos no formato do endpoint de listagem"""
+    items = [
+        {
+            "id": f"doc-{index:05d}",
+            "title": f"Contrato de locação residencial nº {index}",
+            "document_type": "Contrato",
+            "status": "draft" if index % 3 else "final",
+            "created_at": "2025-03-14T10:22:31",
+            "updated_at": "2025-03-18T16:05:12",
+            "client_id": f"client-{index % 40:03d}",
+            "case_id": None if index % 2 else f"case-{index % 25:03d}",
+        }
+        for index in range(count)
+    ]
+    return json.dumps(items, ensure_ascii=False).encode("utf-8")
+
+def analysis(size: int) -> bytes:
+    return json.dumps({"success": True, "analysis": legal_text(size)}, ensure_ascii=False).encode("utf-8")
+
+def timed(fn, *args, repeat: int = 20) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.perf_counter() - started) / repeat
+
+def codecs():
+    available = {
+        "gzip-1": lambda data: zlib.compress(data, 1),
+        "gzip-6": lambda data: zlib.compress(data, 6),
+    }
+    if brotli is not None:
+        available["br-4"] = lambda data: brotli.compress(data, quality=4)
+        available["br-11"] = lambda data: brotli.compress(data, quality=11)
+    return available
+
+def bench_codecs(payloads):
+    print(f"{'carga':>22} {'codec':>7} {'original':>10} {'enviado':>9} {'razão':>7} {'CPU':>10}")
+    for name, payload in payloads.items():
+        for codec, compress in codecs().items():
+            compressed = compress(payload)
+            seconds = timed(compress, payload)
+            print(
+                f"{name:>22} {codec:>7} {len(payload):>10} {len(compressed):>9} "
+                f"{len(compressed) / len(payload):>7.3f} {seconds * 1e3:>8.2f}ms"
+            )
+
+def bench_middleware(payloads, requests: int = 200):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/{name}")
+    async def endpoint(name: str):
+        from starlette.responses import Response
+        return Response(payloads[name], media_type="application/json")
+
+    client = TestClient(app)
+    print(f"\n{'carga':>22} {'codificação':>12} {'req/s':>9} {'bytes/req':>10}")
+    for name in payloads:
+        for encoding in ("identity", "gzip", "br"):
+            if encoding == "br" and brotli is None:
+                continue
+            headers = {"Accept-Encoding": encoding}
+            sent = int(client.get(f"/{name}", headers=headers).headers["content-length"])
+            started = time.perf_counter()
+            for _ in range(requests):
+                client.get(f"/{name}", headers=headers)
+            rate = requests / (time.perf_counter() - started)
+            print(f"{name:>22} {encoding:>12} {rate:>9.0f} {sent:>10}")
+
+def main():
+    payloads = {
+        "lista-50-documentos": document_list(50),
+        "lista-500-documentos": document_list(500),
+        "analise-8k": analysis(8 * 1024),
+        "analise-64k": analysis(64 * 1024),
+    }
+    bench_codecs(payloads)
+    bench_middleware(payloads)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark da serialização das listagens da API.
+
+Popula um banco SQLite em memória e mede a vazão de cada endpoint de
+listagem com a serialização rápida (colunas + orjson) e com a validação
+pelos esquemas Pydantic (FAST_JSON_RESPONSES desativado).
+
+Uso: python -m benchmarks.bench_serialization [--rows 500] [--requests 200]
+"""
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import override_settings
+from app.db.session import Base, get_db
+from app.main import app
+from app.models.case import Case
+from app.models.client import Client
+from app.models.deadline import Deadline
+from app.models.document import Document
+from app.models.user import User
+from app.utils.security import create_access_token
+
+ENDPOINTS = ["/api/clients", "/api/cases", "/api/deadlines", "/api/documents"]
+
+def seed(session, rows: int) -> None:
+    session.add(User(id="bench-user", email="bench@example.com", first_name="Bench"))
+    now = datetime(2025, 3, 1, 9, 0)
+    clients = [
+        Client(name=f"Cliente {index}", email=f"cliente{index}@example.com", phone="(11) 99999-0000",
+               document="123.456.789-00", address="Rua das Flores, 100 - São Paulo/SP", user_id="bench-user")
+        for index in range(rows)
+    ]
+    session.add_all(clients)
+    session.flush()
+    cases = [
+        Case(title=f"Ação de cobrança {index}", number=f"0001234-56.2025.8.26.{index:04d}", type="Cível",
+             court="TJSP", value=1000.0 + index, description="Cobrança de aluguéis em atraso",
+             client_id=clients[index % len(clients)].id, user_id="bench-user")
+        for index in range(rows)
+    ]
+    session.add_all(cases)
+    session.flush()
+    session.add_all([
+        Deadline(title=f"Prazo {index}", description="Apresentar contestação", due_date=now + timedelta(hours=index),
+                 case_id=cases[index % len(cases)].id, user_id="bench-user")
+        for index in range(rows)
+    ])
+    session.add_all([
+        Document(id=f"doc-{index}", title=f"Contrato {index}", document_type="Contrato", status="draft",
+                 client_name=f"Cliente {index}", user_id="bench-user")
+        for index in range(rows)
+    ])
+    session.commit()
+
+def measure(client: TestClient, path: str, headers: dict, requests: int) -> float:
+    client.get(path, headers=headers)
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get(path, headers=headers)
+    return requests / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da serialização das listagens")
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    seed(session_factory(), args.rows)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    headers = {
+        "Authorization": f"Bearer {create_access_token('bench-user')}",
+        "Accept-Encoding": "identity",
+    }
+
+    client = TestClient(app)
+    print(f"{'endpoint':>16} {'pydantic req/s':>15} {'rápido req/s':>13} {'ganho':>7}")
+    for path in ENDPOINTS:
+        with override_settings(RATE_LIMIT_ENABLED=False, FAST_JSON_RESPONSES=False):
+            validated = measure(client, f"{path}?limit={args.rows}", headers, args.requests)
+        with override_settings(RATE_LIMIT_ENABLED=False, FAST_JSON_RESPONSES=True):
+            fast = measure(client, f"{path}?limit={args.rows}", headers, args.requests)
+        print(f"{path:>16} {validated:>15.0f} {fast:>13.0f} {fast / validated:>6.2f}x")
+
+if __name__ == "__main__":
+    main()
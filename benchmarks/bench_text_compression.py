@@ -0,0 +1,127 @@
+"""
+Benchmark da compressão das colunas de texto grandes.
+
+Mede, para textos jurídicos sintéticos de vários tamanhos, a razão de
+compressão e o custo de codificação/decodificação de cada codec.
+
+Com --database-url de um PostgreSQL 14+, mede também a compressão nativa
+(TOAST pglz e lz4) usada nas colunas de `documents`, que continuam TEXT, e o
+espaço ocupado hoje por documents.content e documents.analysis.
+
+Uso: python -m benchmarks.bench_text_compression [--database-url postgresql://...]
+"""
+import argparse
+import random
+import time
+import zlib
+
+from app.db.types import compress_text, decompress_text, zstandard
+
+CLAUSES = [
+    "CLÁUSULA {n}ª - O LOCATÁRIO obriga-se a pagar pontualmente o aluguel mensal de R$ {valor},00, "
+    "até o quinto dia útil de cada mês, sob pena de multa de 10% e juros de mora de 1% ao mês.",
+    "CLÁUSULA {n}ª - A rescisão antecipada do presente contrato por qualquer das partes implicará "
+    "o pagamento de multa equivalente a {meses} aluguéis, proporcional ao tempo restante.",
+    "CLÁUSULA {n}ª - As partes elegem o foro da Comarca de São Paulo/SP para dirimir quaisquer "
+    "controvérsias oriundas deste instrumento, com renúncia expressa a qualquer outro.",
+    "CLÁUSULA {n}ª - Nos termos do art. {artigo} do Código Civil e da Lei nº 8.245/1991, o fiador "
+    "responde solidariamente pelas obrigações assumidas pelo LOCATÁRIO até a efetiva entrega das chaves.",
+]
+
+def legal_text(size: int, seed: int = 42) -> str:
+    """Gera um texto jurídico sintético com aproximadamente `size` bytes"""
+    rng = random.Random(seed)
+    parts, total, n = [], 0, 1
+    while total < size:
+        clause = rng.choice(CLAUSES).format(
+            n=n, valor=rng.randint(800, 9000), meses=rng.randint(1, 6), artigo=rng.randint(100, 2000)
+        )
+        parts.append(clause)
+        total += len(clause.encode("utf-8")) + 2
+        n += 1
+    return "\n\n".join(parts)
+
+def timed(fn, *args, repeat: int = 20) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.perf_counter() - started) / repeat
+
+def postgres_native(url: str) -> None:
+    """Tamanho armazenado pelo PostgreSQL para os mesmos textos, com pglz e com lz4"""
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(url)
+    try:
+        with engine.connect() as connection:
+            methods = ["pglz", "lz4"]
+            columns = ", ".join(f"body_{method} text COMPRESSION {method}" for method in methods)
+            try:
+                connection.execute(text(f"CREATE TEMP TABLE bench_toast (size int, {columns})"))
+            except Exception as e:
+                connection.rollback()
+                print(f"lz4 indisponível no servidor ({e}); medindo só pglz")
+                methods = ["pglz"]
+                connection.execute(text("CREATE TEMP TABLE bench_toast (size int, body_pglz text COMPRESSION pglz)"))
+
+            print(f"\n{'tamanho':>10} {'método':>8} {'armazenado':>11} {'razão':>7}")
+            for size in (4 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024):
+                body = legal_text(size)
+                raw_size = len(body.encode("utf-8"))
+                values = ", ".join(":body" for _ in methods)
+                connection.execute(text(
+                    f"INSERT INTO bench_toast (size, {', '.join(f'body_{m}' for m in methods)}) VALUES (:size, {values})"
+                ), {"size": size, "body": body})
+                for method in methods:
+                    stored = connection.execute(text(
+                        f"SELECT pg_column_size(body_{method}) FROM bench_toast WHERE size = :size"
+                    ), {"size": size}).scalar()
+                    print(f"{raw_size:>10} {method:>8} {stored:>11} {stored / raw_size:>7.3f}")
+
+            # Espaço atual das colunas compartilhadas com o servidor Node
+            print()
+            for column in ("content", "analysis"):
+                raw_size, stored, compression = connection.execute(text(
+                    f"SELECT coalesce(sum(octet_length({column})), 0), coalesce(sum(pg_column_size({column})), 0), "
+                    f"string_agg(DISTINCT pg_column_compression({column}), ',') FROM documents"
+                )).one()
+                ratio = stored / raw_size if raw_size else 1.0
+                print(f"documents.{column}: {raw_size} -> {stored} bytes (razão {ratio:.3f}, métodos: {compression or '-'})")
+            connection.rollback()
+    finally:
+        engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="PostgreSQL 14+ para medir a compressão nativa")
+    args = parser.parse_args()
+
+    codecs = {"zlib-6": lambda raw: zlib.compress(raw, 6)}
+    if zstandard is not None:
+        codecs["zstd-3"] = zstandard.ZstdCompressor(level=3).compress
+        codecs["zstd-6"] = zstandard.ZstdCompressor(level=6).compress
+
+    print(f"{'tamanho':>10} {'codec':>8} {'comprimido':>11} {'razão':>7} {'codificar':>11} {'decodificar':>12}")
+    for size in (4 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024):
+        text = legal_text(size)
+        raw = text.encode("utf-8")
+        for name, compress in codecs.items():
+            compressed = compress(raw)
+            encode_s = timed(compress, raw)
+            decompress = zlib.decompress if name.startswith("zlib") else zstandard.ZstdDecompressor().decompress
+            decode_s = timed(decompress, compressed)
+            print(
+                f"{len(raw):>10} {name:>8} {len(compressed):>11} {len(compressed) / len(raw):>7.3f} "
+                f"{encode_s * 1e3:>9.2f}ms {decode_s * 1e3:>10.2f}ms"
+            )
+
+        # Caminho completo usado pela coluna (codec configurado)
+        stored = compress_text(text)
+        decode_s = timed(decompress_text, stored)
+        print(f"{len(raw):>10} {'coluna':>8} {len(stored):>11} {len(stored) / len(raw):>7.3f} {'':>11} {decode_s * 1e3:>10.2f}ms")
+
+    if args.database_url:
+        postgres_native(args.database_url)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 import uvicorn
 
+# Servidor de desenvolvimento (um processo, recarrega ao editar o código).
+# Em produção use `python -m app.server`, com vários workers e encerramento gradual.
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=5000, reload=True)
\ No newline at end of file
+    uvicorn.run("app.main:app", host="0.0.0.0", port=5000, reload=True)
@@ -0,0 +1,177 @@
+"""
+Migra as colunas de texto grandes para o formato comprimido (CompressedText).
+
+No PostgreSQL converte as colunas TEXT para BYTEA e, em todos os bancos,
+regrava as linhas em lotes com o codec configurado. Ao final exibe o espaço
+economizado e o custo médio de descompressão.
+
+As colunas de `documents` são lidas e gravadas como texto pelo servidor Node e
+continuam TEXT: no PostgreSQL (14+) passam a usar a compressão lz4 do próprio
+banco, transparente para quem lê, e as linhas existentes são regravadas.
+
+Uso: python -m scripts.compress_text_columns [--batch-size 200]
+"""
+import argparse
+import time
+
+from sqlalchemy import text
+
+from app.db.session import engine
+from app.db.types import compress_text, decompress_text
+
+# Tabela, chave primária e colunas comprimidas
+TARGETS = [
+    ("blobs", "sha256", ("extracted_text",)),
+    ("search_entries", "id", ("body",)),
+]
+# Colunas compartilhadas com o servidor Node: continuam TEXT, comprimidas pelo PostgreSQL
+NATIVE_TARGETS = [
+    ("documents", "id", ("content", "analysis")),
+]
+
+def _stored_size(value) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(bytes(value))
+
+def _column_type(connection, table: str, column: str) -> str:
+    return connection.execute(text(
+        "SELECT data_type FROM information_schema.columns "
+        "WHERE table_name = :table AND column_name = :column"
+    ), {"table": table, "column": column}).scalar()
+
+def convert_postgres_columns(connection) -> None:
+    """Converte colunas TEXT em BYTEA preservando o conteúdo em UTF-8"""
+    for table, _, columns in TARGETS:
+        for column in columns:
+            if _column_type(connection, table, column) == "text":
+                print(f"Convertendo {table}.{column} para bytea...")
+                connection.execute(text(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} TYPE bytea "
+                    f"USING convert_to({column}, 'UTF8')"
+                ))
+
+def native_column_sizes(connection, table: str, column: str):
+    """Bytes do texto e bytes efetivamente armazenados (após a compressão TOAST)"""
+    return connection.execute(text(
+        f"SELECT coalesce(sum(octet_length({column})), 0), coalesce(sum(pg_column_size({column})), 0) FROM {table}"
+    )).one()
+
+def compress_postgres_native(connection, batch_size: int) -> None:
+    """Ativa a compressão lz4 nas colunas compartilhadas e regrava as linhas já comprimidas com pglz"""
+    if connection.dialect.server_version_info < (14,):
+        print("PostgreSQL anterior ao 14: compressão por coluna indisponível, mantendo pglz")
+        return
+    for table, key, columns in NATIVE_TARGETS:
+        before = {column: native_column_sizes(connection, table, column) for column in columns}
+        try:
+            for column in columns:
+                connection.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET COMPRESSION lz4"))
+            connection.commit()
+        except Exception as e:
+            # Servidor compilado sem lz4: os valores seguem comprimidos com pglz
+            connection.rollback()
+            print(f"{table}: lz4 indisponível ({e}); mantendo pglz")
+            continue
+
+        # SET COMPRESSION só vale para valores novos: `|| ''` força a regravação do valor
+        assignments = ", ".join(f"{column} = {column} || ''" for column in columns)
+        pending = " OR ".join(f"pg_column_compression({column}) = 'pglz'" for column in columns)
+        rewritten = 0
+        last_key = None
+        while True:
+            where = f"WHERE {key} > :last_key " if last_key is not None else ""
+            keys = connection.execute(text(
+                f"SELECT {key} FROM {table} {where}ORDER BY {key} LIMIT :limit"
+            ), {"last_key": last_key, "limit": batch_size}).scalars().all()
+            if not keys:
+                break
+            rewritten += connection.execute(text(
+                f"UPDATE {table} SET {assignments} WHERE {key} = ANY(:keys) AND ({pending})"
+            ), {"keys": keys}).rowcount
+            last_key = keys[-1]
+            connection.commit()
+
+        for column in columns:
+            raw, stored_before = before[column]
+            _, stored_after = native_column_sizes(connection, table, column)
+            print(
+                f"{table}.{column} (lz4): {raw} bytes de texto, armazenados {stored_before} -> {stored_after} bytes"
+            )
+        print(f"  {table}: {rewritten} linhas regravadas")
+
+def recompress_table(connection, table: str, key: str, columns, batch_size: int):
+    """Regrava as linhas de uma tabela em lotes, usando paginação pela chave"""
+    stats = {"rows": 0, "bytes_before": 0, "bytes_after": 0, "decode_seconds": 0.0, "decoded": 0}
+    last_key = None
+    column_list = ", ".join(columns)
+
+    while True:
+        where = f"WHERE {key} > :last_key " if last_key is not None else ""
+        rows = connection.execute(text(
+            f"SELECT {key}, {column_list} FROM {table} {where}ORDER BY {key} LIMIT :limit"
+        ), {"last_key": last_key, "limit": batch_size}).fetchall()
+        if not rows:
+            break
+
+        for row in rows:
+            updates = {}
+            for index, column in enumerate(columns, start=1):
+                stored = row[index]
+                if stored is None:
+                    continue
+                value = decompress_text(stored)
+                encoded = compress_text(value)
+                stats["bytes_before"] += _stored_size(stored)
+                stats["bytes_after"] += len(encoded)
+
+                started = time.perf_counter()
+                decompress_text(encoded)
+                stats["decode_seconds"] += time.perf_counter() - started
+                stats["decoded"] += 1
+
+                updates[column] = encoded
+
+            if updates:
+                assignments = ", ".join(f"{column} = :{column}" for column in updates)
+                connection.execute(
+                    text(f"UPDATE {table} SET {assignments} WHERE {key} = :key"),
+                    dict(updates, key=row[0])
+                )
+            stats["rows"] += 1
+
+        last_key = rows[-1][0]
+        connection.commit()
+        print(f"  {table}: {stats['rows']} linhas processadas")
+
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Comprime as colunas de texto grandes")
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+
+    print("Iniciando migração das colunas de texto comprimidas...")
+    with engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            convert_postgres_columns(connection)
+            connection.commit()
+            compress_postgres_native(connection, args.batch_size)
+
+        for table, key, columns in TARGETS:
+            stats = recompress_table(connection, table, key, columns, args.batch_size)
+            saved = stats["bytes_before"] - stats["bytes_after"]
+            ratio = stats["bytes_after"] / stats["bytes_before"] if stats["bytes_before"] else 1.0
+            decode_us = stats["decode_seconds"] / stats["decoded"] * 1e6 if stats["decoded"] else 0.0
+            print(
+                f"{table}: {stats['bytes_before']} -> {stats['bytes_after']} bytes "
+                f"(economia de {saved} bytes, razão {ratio:.3f}); "
+                f"descompressão média {decode_us:.1f} µs por valor"
+            )
+
+    print("Migração concluída com sucesso!")
+
+if __name__ == "__main__":
+    main()
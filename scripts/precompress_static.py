@@ -0,0 +1,70 @@
+"""
+Gera as variantes pré-comprimidas (.br e .gz) dos arquivos estáticos do frontend.
+
+Deve ser executado após o build; a API passa a servir a variante aceita pelo
+navegador sem comprimir nada durante a requisição. O .br só é gerado se o
+pacote brotli estiver instalado.
+
+Uso: python -m scripts.precompress_static [--dir static] [--min-size 1024]
+"""
+import argparse
+import gzip
+import os
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Tipos que se beneficiam de compressão (imagens e fontes já são comprimidas)
+COMPRESSIBLE_EXTENSIONS = {".html", ".js", ".mjs", ".css", ".json", ".svg", ".txt", ".xml", ".map", ".ico", ".wasm"}
+
+def write_variant(path: str, suffix: str, data: bytes, original_size: int) -> int:
+    """Grava a variante apenas se ela for menor que o original; retorna o tamanho gravado"""
+    target = path + suffix
+    if len(data) >= original_size:
+        if os.path.exists(target):
+            os.remove(target)
+        return 0
+    with open(target, "wb") as output:
+        output.write(data)
+    # Mesma data de modificação do original, para manter as variantes sincronizadas
+    stat = os.stat(path)
+    os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    return len(data)
+
+def main():
+    parser = argparse.ArgumentParser(description="Pré-comprime os arquivos estáticos do frontend")
+    parser.add_argument("--dir", default=settings.STATIC_DIR)
+    parser.add_argument("--min-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("Pacote brotli não instalado: apenas as variantes .gz serão geradas")
+
+    totals = {"files": 0, "original": 0, "gzip": 0, "br": 0}
+    for root, _, files in os.walk(args.dir):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            with open(path, "rb") as source:
+                data = source.read()
+            if len(data) < args.min_size:
+                continue
+
+            totals["files"] += 1
+            totals["original"] += len(data)
+            totals["gzip"] += write_variant(path, ".gz", gzip.compress(data, compresslevel=9, mtime=0), len(data))
+            if brotli is not None:
+                totals["br"] += write_variant(path, ".br", brotli.compress(data, quality=11), len(data))
+
+    print(
+        f"{totals['files']} arquivos, {totals['original']} bytes originais; "
+        f"gzip {totals['gzip']} bytes, brotli {totals['br']} bytes"
+    )
+
+if __name__ == "__main__":
+    main()
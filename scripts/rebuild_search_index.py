@@ -0,0 +1,19 @@
+"""
+Reconstrói o índice de busca textual a partir dos documentos, processos e clientes.
+Uso: python -m scripts.rebuild_search_index
+"""
+from app.db.session import SessionLocal, create_tables
+from app.services.search_service import rebuild_index
+
+def main():
+    print("Iniciando reconstrução do índice de busca...")
+    create_tables()
+    db = SessionLocal()
+    try:
+        total = rebuild_index(db)
+        print(f"Índice reconstruído com {total} entradas.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -220,4 +220,104 @@ async def test_test_connection(mock_test_connection, client, auth_headers):
     
     # Verificar o resultado
     assert response.status_code == status.HTTP_200_OK
-    assert response.json() == mock_result
\ No newline at end of file
+    assert response.json() == mock_result
+
+# Teste para a reanálise incremental por seções
+@pytest.mark.asyncio
+@patch.object(deepseek_service, 'analyze_section')
+async def test_incremental_document_analysis(mock_analyze_section, client, auth_headers, db_session, test_user):
+    """Apenas as seções alteradas são reenviadas à IA na reanálise"""
+    from app.models.document import Document
+    
+    mock_analyze_section.side_effect = lambda text, document_type, heading: {
+        "success": True,
+        "analysis": f"Análise de: {heading}"
+    }
+    
+    clauses = [f"CLÁUSULA {i}ª - Texto da cláusula {i} do contrato de locação." for i in range(1, 6)]
+    document = Document(
+        id="doc-incremental",
+        title="Contrato",
+        content="\n\n".join(clauses),
+        file_type="text/plain",
+        document_type="Contrato",
+        user_id=test_user.id
+    )
+    db_session.add(document)
+    db_session.commit()
+    
+    response = client.post("/api/ai/analyze-document", headers=auth_headers, json={"document_id": document.id})
+    
+    assert response.status_code == status.HTTP_200_OK
+    result = response.json()
+    assert result["success"] is True
+    assert result["sections_total"] == 5
+    assert result["sections_reanalyzed"] == 5
+    assert mock_analyze_section.call_count == 5
+    
+    # Alterar uma única cláusula
+    clauses[2] = "CLÁUSULA 3ª - O prazo de locação passa a ser de 36 meses."
+    client.put(f"/api/documents/{document.id}", headers=auth_headers, json={"content": "\n\n".join(clauses)})
+    mock_analyze_section.reset_mock()
+    
+    response = client.post("/api/ai/analyze-document", headers=auth_headers, json={"document_id": document.id})
+    
+    result = response.json()
+    assert result["sections_reanalyzed"] == 1
+    assert result["sections_reused"] == 4
+    assert mock_analyze_section.call_count == 1
+    assert "36 meses" in mock_analyze_section.call_args.args[0]
+    
+    # A análise consolidada fica salva no documento e as seções, em tabela própria
+    response = client.get(f"/api/documents/{document.id}", headers=auth_headers)
+    assert response.json()["analysis"] == result["analysis"]
+    assert "Análise de: CLÁUSULA 3ª" in result["analysis"]
+    
+    from app.models.analysis import DocumentAnalysisCache
+    assert db_session.get(DocumentAnalysisCache, document.id) is not None
+    client.delete(f"/api/documents/{document.id}", headers=auth_headers)
+    db_session.expire_all()
+    assert db_session.get(DocumentAnalysisCache, document.id) is None
+
+# Chamada simulada à API que registra o bloco `usage` como o serviço real
+async def fake_legal_search(query, context=None):
+    from app.services.usage_service import usage_recorder
+    
+    usage_recorder.record("deepseek-chat", {"prompt_tokens": 120, "completion_tokens": 80, "total_tokens": 200})
+    return {"success": True, "result": "Resposta"}
+
+def test_ai_usage_report(client, auth_headers, monkeypatch):
+    """O consumo de tokens é atribuído ao usuário e ao endpoint e aparece no relatório"""
+    monkeypatch.setattr(deepseek_service, "legal_search", fake_legal_search)
+    
+    for _ in range(2):
+        response = client.post("/api/ai/legal-search", headers=auth_headers, json={"query": "usucapião"})
+        assert response.status_code == status.HTTP_200_OK
+    
+    response = client.get("/api/ai/usage", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["plan"] == "basic"
+    assert report["used_this_month"] == 400
+    assert report["by_endpoint"] == [{
+        "key": "/api/ai/legal-search",
+        "prompt_tokens": 240,
+        "completion_tokens": 160,
+        "total_tokens": 400,
+        "requests": 2
+    }]
+    assert report["by_model"][0]["key"] == "deepseek-chat"
+    assert report["remaining"] == report["quota"] - 400
+
+def test_ai_quota_enforced(client, auth_headers, monkeypatch, override_settings):
+    """Com a cota do mês esgotada, novas chamadas à IA são recusadas"""
+    
+    override_settings(AI_TOKEN_QUOTAS="basic=300")
+    monkeypatch.setattr(deepseek_service, "legal_search", fake_legal_search)
+    
+    for _ in range(2):
+        response = client.post("/api/ai/legal-search", headers=auth_headers, json={"query": "usucapião"})
+        assert response.status_code == status.HTTP_200_OK
+    
+    response = client.post("/api/ai/legal-search", headers=auth_headers, json={"query": "usucapião"})
+    assert response.status_code == status.HTTP_402_PAYMENT_REQUIRED
@@ -0,0 +1,105 @@
+import pytest
+from fastapi import status
+
+from app.models.user import User
+
+# Fixture para criar um usuário de teste
+@pytest.fixture
+def test_user(db_session):
+    user = User(
+        id="test-user-id",
+        email="test@example.com",
+        first_name="Test",
+        last_name="User"
+    )
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+def login(client):
+    response = client.post("/api/auth/token", data={"username": "test@example.com", "password": "x"})
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+def bearer(tokens):
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+def test_login_returns_refresh_token(client, test_user):
+    """O login emite um access token de curta duração e um refresh token"""
+    
+    tokens = login(client)
+    assert tokens["token_type"] == "bearer"
+    assert tokens["refresh_token"]
+    assert tokens["expires_in"] == 15 * 60
+    
+    response = client.get("/api/auth/user", headers=bearer(tokens))
+    assert response.status_code == status.HTTP_200_OK
+
+def test_refresh_rotates_tokens(client, test_user):
+    """O refresh token é trocado por um novo par e a reutilização revoga a sessão"""
+    
+    tokens = login(client)
+    response = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == status.HTTP_200_OK
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    assert client.get("/api/auth/user", headers=bearer(rotated)).status_code == status.HTTP_200_OK
+    
+    # Reutilizar o refresh token antigo revoga toda a cadeia
+    response = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    
+    assert client.get("/api/auth/user", headers=bearer(rotated)).status_code == status.HTTP_401_UNAUTHORIZED
+    response = client.post("/api/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+def test_logout_revokes_tokens(client, test_user):
+    """Após o logout o access token e o refresh token deixam de valer"""
+    
+    tokens = login(client)
+    assert client.get("/api/auth/user", headers=bearer(tokens)).status_code == status.HTTP_200_OK
+    
+    response = client.post("/api/auth/logout", headers=bearer(tokens), json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == status.HTTP_200_OK
+    
+    assert client.get("/api/auth/user", headers=bearer(tokens)).status_code == status.HTTP_401_UNAUTHORIZED
+    response = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+def test_revocation_list_syncs_from_database(client, test_user, db_session):
+    """Revogações gravadas por outro worker são carregadas na sincronização"""
+    from app.utils.revocation import RevocationList
+    from app.utils.security import decode_token
+    
+    tokens = login(client)
+    jti = decode_token(tokens["access_token"])["jti"]
+    client.post("/api/auth/logout", headers=bearer(tokens), json={})
+    
+    other_worker = RevocationList(sync_interval=60)
+    assert jti not in other_worker
+    other_worker.sync_if_stale(db_session)
+    assert jti in other_worker
+
+def test_sync_picks_up_late_commit_with_older_timestamp(test_user, db_session):
+    """Uma revogação confirmada depois da carga, mas com horário anterior, ainda é carregada"""
+    from datetime import datetime, timedelta
+    from app.models.token import RevokedToken
+    from app.utils.revocation import RevocationList
+    
+    now = datetime.utcnow()
+    expires_at = now + timedelta(minutes=15)
+    worker = RevocationList(sync_interval=60, overlap=30)
+    db_session.add(RevokedToken(jti="recente", user_id=test_user.id, expires_at=expires_at, revoked_at=now))
+    db_session.commit()
+    worker.sync(db_session)
+    
+    # Outro worker, com relógio atrasado, confirma a revogação só agora
+    db_session.add(RevokedToken(
+        jti="atrasada", user_id=test_user.id, expires_at=expires_at, revoked_at=now - timedelta(seconds=10)
+    ))
+    db_session.commit()
+    worker.sync(db_session)
+    
+    assert "recente" in worker
+    assert "atrasada" in worker
@@ -1,6 +1,11 @@
 import pytest
 from fastapi import status
+import io
+import os
 import uuid
+import json
+import hashlib
+import zipfile
 from datetime import datetime
 
 from app.models.user import User
@@ -69,14 +74,32 @@ def test_get_documents(client, auth_headers, test_documents):
     assert "documents" in data
     assert len(data["documents"]) == 3
     
-    # Verificar se os documentos retornados têm as propriedades esperadas
+    # A listagem traz apenas os campos resumidos, sem o conteúdo completo
     for doc in data["documents"]:
         assert "id" in doc
         assert "title" in doc
-        assert "content" in doc
-        assert "file_type" in doc
         assert "status" in doc
-        assert "user_id" in doc
+        assert "document_type" in doc
+        assert "client_name" in doc
+        assert "created_at" in doc
+        assert "content" not in doc
+        assert "analysis" not in doc
+
+# Teste para a seleção explícita de campos na listagem
+def test_get_documents_with_fields(client, auth_headers, test_documents):
+    """Teste para o endpoint GET /api/documents?fields=..."""
+    
+    response = client.get("/api/documents", params={"fields": "content,file_type"}, headers=auth_headers)
+    
+    assert response.status_code == status.HTTP_200_OK
+    documents = {doc["id"]: doc for doc in response.json()["documents"]}
+    for test_document in test_documents:
+        assert documents[test_document.id]["content"] == test_document.content
+        assert documents[test_document.id]["file_type"] == test_document.file_type
+        assert "analysis" not in documents[test_document.id]
+    
+    response = client.get("/api/documents", params={"fields": "password"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 # Teste para endpoint de obter um documento específico
 def test_get_document(client, auth_headers, test_documents):
@@ -204,4 +227,250 @@ def test_get_other_user_document(client, db_session, auth_headers):
     )
     
     # Deve retornar 403 Forbidden ou 404 Not Found
-    assert response.status_code in [status.HTTP_403_FORBIDDEN, status.HTTP_404_NOT_FOUND]
\ No newline at end of file
+    assert response.status_code in [status.HTTP_403_FORBIDDEN, status.HTTP_404_NOT_FOUND]
+
+# Teste para o armazenamento e download do arquivo enviado
+def test_upload_and_download_document_file(client, auth_headers, storage_backend):
+    """Teste para o upload em streaming e o download com suporte a Range"""
+    
+    file_bytes = "Contrato de locação residencial. ".encode("utf-8") * 200
+    
+    response = client.post(
+        "/api/documents",
+        headers=auth_headers,
+        files={"file": ("contrato.txt", file_bytes, "text/plain")},
+        data={"title": "Contrato", "file_type": "text/plain"}
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    
+    # Os metadados do arquivo devem ser gravados como JSON estruturado
+    file_info = json.loads(data["file_info"])
+    assert file_info["filename"] == "contrato.txt"
+    assert file_info["size"] == len(file_bytes)
+    assert file_info["sha256"] == hashlib.sha256(file_bytes).hexdigest()
+    assert storage_backend.exists(file_info["storage_key"])
+    
+    # O conteúdo de arquivos de texto é extraído automaticamente
+    assert data["content"] == file_bytes.decode("utf-8")
+    
+    # Download completo
+    response = client.get(f"/api/documents/{data['id']}/file", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.content == file_bytes
+    assert response.headers["accept-ranges"] == "bytes"
+    
+    # Download parcial
+    response = client.get(
+        f"/api/documents/{data['id']}/file",
+        headers={**auth_headers, "Range": "bytes=10-19"}
+    )
+    assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+    assert response.content == file_bytes[10:20]
+    assert response.headers["content-range"] == f"bytes 10-19/{len(file_bytes)}"
+    
+    # Intervalo fora do arquivo
+    response = client.get(
+        f"/api/documents/{data['id']}/file",
+        headers={**auth_headers, "Range": f"bytes={len(file_bytes)}-"}
+    )
+    assert response.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+    
+    # Excluir o documento remove também o arquivo armazenado
+    response = client.delete(f"/api/documents/{data['id']}", headers=auth_headers)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert not storage_backend.exists(file_info["storage_key"])
+
+# Teste para a deduplicação de arquivos idênticos
+def test_duplicate_uploads_share_blob(client, auth_headers, storage_backend, override_settings):
+    """Arquivos idênticos são gravados uma única vez e coletados ao perder as referências"""
+    
+    override_settings(ADMIN_USER_IDS="test-user-id")
+    file_bytes = b"%PDF-1.4 modelo de peticao inicial" * 100
+    document_ids = []
+    
+    for i in range(2):
+        response = client.post(
+            "/api/documents",
+            headers=auth_headers,
+            files={"file": (f"peticao-{i}.pdf", file_bytes, "application/pdf")},
+            data={"title": f"Petição {i}", "file_type": "application/pdf", "content": "Petição"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        document_ids.append(response.json()["id"])
+    
+    storage_key = json.loads(response.json()["file_info"])["storage_key"]
+    
+    response = client.get("/api/documents/storage/stats", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    stats = response.json()
+    assert stats["blobs"] == 1
+    assert stats["references"] == 2
+    assert stats["physical_bytes"] == len(file_bytes)
+    assert stats["bytes_saved"] == len(file_bytes)
+    
+    # Excluir um dos documentos mantém o arquivo compartilhado
+    client.delete(f"/api/documents/{document_ids[0]}", headers=auth_headers)
+    assert storage_backend.exists(storage_key)
+    
+    # Excluir o último documento remove o arquivo
+    client.delete(f"/api/documents/{document_ids[1]}", headers=auth_headers)
+    assert not storage_backend.exists(storage_key)
+    assert client.get("/api/documents/storage/stats", headers=auth_headers).json()["blobs"] == 0
+
+@pytest.mark.asyncio
+async def test_concurrent_first_uploads_deduplicate(db_session, storage_backend, monkeypatch):
+    """Dois primeiros uploads simultâneos do mesmo arquivo: o segundo vira deduplicação, não erro"""
+    from fastapi import UploadFile
+    from app.models.blob import Blob
+    from app.services import blob_service
+    
+    file_bytes = b"%PDF-1.4 contrato enviado duas vezes" * 50
+    first, _, deduplicated = await blob_service.store_upload(db_session, UploadFile(io.BytesIO(file_bytes), filename="a.pdf"))
+    assert deduplicated is False
+    db_session.commit()
+    
+    # A consulta do segundo upload aconteceu antes do commit do primeiro
+    monkeypatch.setattr(blob_service, "_locked_blob", lambda db, sha256: None)
+    blob, staged, deduplicated = await blob_service.store_upload(db_session, UploadFile(io.BytesIO(file_bytes), filename="b.pdf"))
+    db_session.commit()
+    
+    assert deduplicated is True
+    assert not os.path.exists(staged.path)
+    stored = db_session.query(Blob).filter(Blob.sha256 == hashlib.sha256(file_bytes).hexdigest()).one()
+    assert stored.ref_count == 2
+
+def test_storage_stats_requires_admin(client, auth_headers, override_settings):
+    """As estatísticas cobrem os arquivos de todos os usuários; apenas administradores as acessam"""
+    
+    override_settings(ADMIN_USER_IDS="outro-id")
+    response = client.get("/api/documents/storage/stats", headers=auth_headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+def build_docx(paragraphs):
+    """Monta um arquivo DOCX mínimo em memória"""
+    body = "".join(f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>" for text in paragraphs)
+    document_xml = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", document_xml)
+    return buffer.getvalue()
+
+# Teste para a extração de texto de arquivos DOCX
+def test_docx_text_extraction(client, auth_headers):
+    """O texto de arquivos DOCX é extraído em segundo plano e reaproveitado pelo hash"""
+    
+    docx_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    file_bytes = build_docx(["CLÁUSULA PRIMEIRA - DO OBJETO", "O presente contrato tem por objeto..."])
+    
+    response = client.post(
+        "/api/documents",
+        headers=auth_headers,
+        files={"file": ("contrato.docx", file_bytes, docx_type)},
+        data={"title": "Contrato", "file_type": "docx", "status": "final"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["status"] == "processing"
+    assert data["content"] is None
+    
+    # A tarefa em segundo plano conclui antes do retorno do TestClient
+    response = client.get(f"/api/documents/{data['id']}", headers=auth_headers)
+    data = response.json()
+    assert data["status"] == "final"
+    assert data["content"] == "CLÁUSULA PRIMEIRA - DO OBJETO\nO presente contrato tem por objeto..."
+    
+    # O mesmo arquivo enviado novamente usa o texto já extraído
+    response = client.post(
+        "/api/documents",
+        headers=auth_headers,
+        files={"file": ("copia.docx", file_bytes, docx_type)},
+        data={"title": "Cópia", "file_type": "docx"}
+    )
+    data = response.json()
+    assert data["status"] == "draft"
+    assert data["content"].startswith("CLÁUSULA PRIMEIRA")
+
+# Teste para o histórico de versões do documento
+def test_document_versions(client, auth_headers, test_documents, db_session):
+    """Cada edição do conteúdo gera uma versão reconstruível a partir de snapshots e deltas"""
+    from app.models.revision import DocumentRevision
+    
+    document_id = test_documents[0].id
+    clauses = [f"CLÁUSULA {i} - Texto original da cláusula {i}.\n" for i in range(30)]
+    expected = {1: test_documents[0].content}
+    
+    for version in range(2, 16):
+        clauses[version] = f"CLÁUSULA {version} - Redação alterada na versão {version}.\n"
+        content = "".join(clauses)
+        response = client.put(f"/api/documents/{document_id}", headers=auth_headers, json={"content": content})
+        assert response.status_code == status.HTTP_200_OK
+        expected[version] = content
+    
+    response = client.get(f"/api/documents/{document_id}/versions", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    versions = response.json()["versions"]
+    assert [v["version"] for v in versions] == list(range(15, 0, -1))
+    
+    # Snapshots periódicos, deltas nas demais versões
+    snapshots = [v["version"] for v in versions if v["is_snapshot"]]
+    assert 1 in snapshots and len(snapshots) < len(versions) / 2
+    
+    for version, content in expected.items():
+        response = client.get(f"/api/documents/{document_id}/versions/{version}", headers=auth_headers)
+        assert response.json()["content"] == content
+    
+    response = client.get(
+        f"/api/documents/{document_id}/diff",
+        params={"from_version": 4, "to_version": 5},
+        headers=auth_headers
+    )
+    diff = response.json()["diff"]
+    assert "-CLÁUSULA 5 - Texto original da cláusula 5." in diff
+    assert "+CLÁUSULA 5 - Redação alterada na versão 5." in diff
+    
+    response = client.get(f"/api/documents/{document_id}/versions/99", headers=auth_headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    
+    # Excluir o documento remove o histórico
+    client.delete(f"/api/documents/{document_id}", headers=auth_headers)
+    assert db_session.query(DocumentRevision).filter(DocumentRevision.document_id == document_id).count() == 0
+
+def test_versions_survive_out_of_band_content_change(client, auth_headers, test_documents, db_session):
+    """Conteúdo gravado fora do histórico (servidor Node, extração) não corrompe as versões seguintes"""
+    document = test_documents[0]
+    first = "".join(f"Linha {i}\n" for i in range(20))
+    second = first.replace("Linha 3\n", "Linha três\n")
+    client.put(f"/api/documents/{document.id}", headers=auth_headers, json={"content": first})
+    
+    # Outro processo grava o conteúdo diretamente na tabela
+    document.content = first.replace("Linha 5\n", "Linha 5\nLinha inserida\n")
+    db_session.commit()
+    
+    response = client.put(f"/api/documents/{document.id}", headers=auth_headers, json={"content": second})
+    assert response.status_code == status.HTTP_200_OK
+    
+    for version, content in ((2, first), (3, second)):
+        response = client.get(f"/api/documents/{document.id}/versions/{version}", headers=auth_headers)
+        assert response.json()["content"] == content
+
+def test_concurrent_edit_conflicts(client, auth_headers, test_documents, monkeypatch):
+    """Duas edições que gravam a mesma versão: a segunda recebe 409, não 500"""
+    from app.models.revision import DocumentRevision
+    from app.services import revision_service
+    
+    document_id = test_documents[0].id
+    client.put(f"/api/documents/{document_id}", headers=auth_headers, json={"content": "Primeira edição\n"})
+    
+    # Simula a leitura feita antes da outra edição confirmar a versão 2
+    def stale_latest(db, document_id):
+        return db.query(DocumentRevision).filter_by(document_id=document_id, version=1).first()
+    monkeypatch.setattr(revision_service, "_latest_revision", stale_latest)
+    response = client.put(f"/api/documents/{document_id}", headers=auth_headers, json={"content": "Segunda edição\n"})
+    
+    assert response.status_code == status.HTTP_409_CONFLICT
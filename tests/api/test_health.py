@@ -0,0 +1,206 @@
+import pytest
+from fastapi import status
+
+from app.models.user import User
+from app.services.ai_service import ai_circuit
+from app.services.health_service import health_service
+
+# Fixture para criar um usuário de teste
+@pytest.fixture
+def test_user(db_session):
+    user = User(id="test-user-id", email="test@example.com", first_name="Test", last_name="User")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+# Fixture para criar um token de autenticação para testes
+@pytest.fixture
+def auth_headers(test_user):
+    from app.utils.security import create_access_token
+    
+    return {"Authorization": f"Bearer {create_access_token(test_user.id)}"}
+
+def test_liveness(client):
+    response = client.get("/health/live")
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"status": "ok"}
+
+def test_readiness_reports_database_and_ai_circuit(client):
+    response = client.get("/health/ready")
+    
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["checks"]["database"]["ok"] is True
+    assert body["checks"]["ai"]["state"] == "closed"
+
+def test_readiness_reuses_database_check(client, override_settings):
+    """Dentro de HEALTH_DB_CHECK_SECONDS as sondas não abrem novas conexões"""
+    
+    override_settings(HEALTH_DB_CHECK_SECONDS=60)
+    first = client.get("/health/ready").json()["checks"]["database"]
+    second = client.get("/health/ready").json()["checks"]["database"]
+    
+    assert second is not None
+    assert first["latency_ms"] == second["latency_ms"]
+
+def test_open_ai_circuit_keeps_worker_ready(client):
+    """Com a IA fora do ar, a readiness informa o circuito aberto sem tirar o worker de circulação"""
+    
+    for _ in range(ai_circuit.failure_threshold):
+        ai_circuit.record_failure()
+    
+    response = client.get("/health/ready")
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["checks"]["ai"]["state"] == "open"
+
+def test_draining_worker_is_not_ready(client):
+    health_service.draining = True
+    
+    response = client.get("/health/ready")
+    
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json() == {"status": "draining"}
+    assert client.get("/health/live").status_code == status.HTTP_200_OK
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast(monkeypatch):
+    """Com o circuito aberto a chamada falha sem tentar a API"""
+    from app.services.ai_service import deepseek_service
+    
+    for _ in range(ai_circuit.failure_threshold):
+        ai_circuit.record_failure()
+    
+    result = await deepseek_service.legal_search("prazo de contestação")
+    
+    assert result["success"] is False
+    assert "Circuito deepseek aberto" in result["error"]
+    ai_circuit.reset()
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_releases_circuit(monkeypatch):
+    """Uma chamada de teste cancelada não deixa o circuito recusando tudo"""
+    import asyncio
+    import httpx
+    from unittest.mock import AsyncMock
+    from app.services.ai_service import deepseek_service
+    
+    for _ in range(ai_circuit.failure_threshold):
+        ai_circuit.record_failure()
+    monkeypatch.setattr(ai_circuit, "reset_timeout", 0)
+    monkeypatch.setattr(httpx.AsyncClient, "post", AsyncMock(side_effect=asyncio.CancelledError))
+    
+    with pytest.raises(asyncio.CancelledError):
+        await deepseek_service._post("chat", {"model": "deepseek-chat"}, 1.0)
+    
+    assert ai_circuit.allow() is True
+    ai_circuit.reset()
+
+@pytest.fixture
+def list_models(monkeypatch):
+    from unittest.mock import AsyncMock
+    from app.services.ai_service import deepseek_service
+    
+    mock = AsyncMock(return_value=(True, ""))
+    monkeypatch.setattr(deepseek_service, "list_models", mock)
+    return mock
+
+def test_test_connection_uses_cached_state(client, auth_headers, list_models, monkeypatch):
+    """O teste de conexão não gera completions: usa o estado em cache ou lista os modelos"""
+    from unittest.mock import AsyncMock
+    from app.services.ai_service import ai_health, deepseek_service
+    
+    post = AsyncMock()
+    monkeypatch.setattr(deepseek_service, "_post", post)
+    
+    # Sem estado: uma sonda; em seguida o resultado é reaproveitado
+    for _ in range(3):
+        response = client.get("/api/ai/test-connection", headers=auth_headers)
+        assert response.json() == {"deepseek_connected": True, "any_service_connected": True}
+    assert list_models.await_count == 1
+    
+    # Uma chamada real recente que falhou vale como estado atual
+    ai_health.observe(False, "HTTP 503")
+    response = client.get("/api/ai/test-connection", headers=auth_headers)
+    assert response.json()["deepseek_connected"] is False
+    assert list_models.await_count == 1
+    post.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_real_calls_update_ai_health(client, list_models, monkeypatch):
+    """As chamadas reais alimentam o estado, sem sondas adicionais"""
+    import httpx
+    from unittest.mock import AsyncMock
+    from app.services.ai_service import ai_health, deepseek_service
+    
+    monkeypatch.setattr(deepseek_service, "api_key", "chave")
+    response = httpx.Response(503, text="indisponível", request=httpx.Request("POST", deepseek_service.api_url))
+    monkeypatch.setattr(httpx.AsyncClient, "post", AsyncMock(return_value=response))
+    
+    await deepseek_service.legal_search("prazo de contestação")
+    
+    status_body = ai_health.status()
+    assert status_body["healthy"] is False
+    assert status_body["source"] == "request"
+    assert status_body["detail"] == "HTTP 503"
+    assert client.get("/health/ai").status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    list_models.assert_not_awaited()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("code, healthy", [(400, True), (422, True), (401, False), (402, False), (403, False), (429, False)])
+async def test_rejected_request_keeps_ai_healthy(list_models, monkeypatch, code, healthy):
+    """Um pedido recusado pelo conteúdo não marca a IA como indisponível; chave ou cota recusada, sim"""
+    import httpx
+    from unittest.mock import AsyncMock
+    from app.services.ai_service import ai_health, deepseek_service
+    
+    monkeypatch.setattr(deepseek_service, "api_key", "chave")
+    response = httpx.Response(code, text="erro", request=httpx.Request("POST", deepseek_service.api_url))
+    monkeypatch.setattr(httpx.AsyncClient, "post", AsyncMock(return_value=response))
+    
+    await deepseek_service.legal_search("prazo de contestação")
+    
+    assert ai_health.status()["healthy"] is healthy
+    assert ai_circuit.failures == (0 if healthy else 1)
+    ai_circuit.reset()
+
+def test_ai_health_without_observations(client, list_models):
+    """Sem resultado ainda, /health/ai responde sem sondar a API"""
+    
+    response = client.get("/health/ai")
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["healthy"] is None
+    assert response.json()["stale"] is True
+    list_models.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_idle_probe_only_without_traffic(override_settings):
+    """A sonda em segundo plano só roda quando não houve chamadas reais no intervalo"""
+    import asyncio
+    from app.services.ai_health_service import AIHealthMonitor
+    
+    probes = []
+    
+    async def probe():
+        probes.append(1)
+        return True, ""
+    
+    override_settings(AI_HEALTH_PROBE_INTERVAL=0.05)
+    monitor = AIHealthMonitor("teste", probe)
+    monitor.start()
+    try:
+        # Tráfego constante: nenhuma sonda
+        for _ in range(6):
+            monitor.observe(True)
+            await asyncio.sleep(0.02)
+        assert probes == []
+        
+        # Sem tráfego: a sonda mantém o estado atualizado
+        await asyncio.sleep(0.15)
+        assert probes
+        assert monitor.status()["source"] == "probe"
+    finally:
+        monitor.stop()
@@ -0,0 +1,105 @@
+import pytest
+from fastapi import status
+
+from app.models.user import User
+from app.utils.profiling import profiler
+
+# Fixture para criar um usuário de teste
+@pytest.fixture
+def test_user(db_session):
+    user = User(
+        id="test-user-id",
+        email="test@example.com",
+        first_name="Test",
+        last_name="User"
+    )
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+# Fixture para criar um token de autenticação para testes
+@pytest.fixture
+def auth_headers(test_user):
+    from app.utils.security import create_access_token
+    
+    access_token = create_access_token(test_user.id)
+    return {"Authorization": f"Bearer {access_token}"}
+
+@pytest.fixture
+def profiling(override_settings):
+    override_settings(PROFILING_ENABLED=True, ADMIN_USER_IDS="outro-id, test-user-id")
+    yield
+    profiler.route_captures.clear()
+    profiler.stop_memory()
+
+def test_profiling_disabled_by_default(client, auth_headers, override_settings):
+    """Sem PROFILING_ENABLED as rotas respondem 404, mesmo para administradores"""
+    
+    override_settings(ADMIN_USER_IDS="test-user-id")
+    response = client.post("/api/admin/profiling/cpu?seconds=0.1", headers=auth_headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+def test_profiling_requires_admin(client, auth_headers, profiling, override_settings):
+    """Apenas usuários em ADMIN_USER_IDS acessam o profiling"""
+    
+    override_settings(ADMIN_USER_IDS="outro-id")
+    response = client.post("/api/admin/profiling/cpu?seconds=0.1", headers=auth_headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+def test_cpu_profile_collapsed(client, auth_headers, profiling):
+    """O perfil de CPU vem no formato collapsed: pilha separada por ; e contagem"""
+    
+    response = client.post("/api/admin/profiling/cpu?seconds=0.2&interval_ms=2", headers=auth_headers)
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["x-profiler-pid"].isdigit()
+    lines = response.text.strip().splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        assert ";" in stack
+    
+    response = client.post("/api/admin/profiling/cpu?seconds=3600", headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_route_capture(client, auth_headers, profiling):
+    """As próximas K requisições da rota são amostradas e as demais seguem sem profiling"""
+    
+    response = client.post(
+        "/api/admin/profiling/routes",
+        json={"route": "/api/cases/{case_id}", "count": 2, "interval_ms": 1},
+        headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+    
+    for _ in range(3):
+        client.get("/api/cases/999", headers=auth_headers)
+    client.get("/api/cases", headers=auth_headers)
+    
+    captures = client.get("/api/admin/profiling/routes", headers=auth_headers).json()
+    assert captures == [{"route": "/api/cases/{case_id}", "captured": 2, "remaining": 0}]
+    
+    response = client.get("/api/admin/profiling/routes/profile", params={"route": "/api/cases/{case_id}"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert profiler.route_captures == {}
+
+def test_memory_diff(client, auth_headers, profiling):
+    """O diff do tracemalloc aponta as linhas que mais alocaram desde o snapshot anterior"""
+    
+    response = client.get("/api/admin/profiling/memory/diff", headers=auth_headers)
+    assert response.status_code == status.HTTP_409_CONFLICT
+    
+    assert client.post("/api/admin/profiling/memory/start?frames=5", headers=auth_headers).status_code == status.HTTP_200_OK
+    retained = [bytearray(1024) for _ in range(2000)]
+    
+    response = client.get("/api/admin/profiling/memory/diff?top=5", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert "test_profiling.py" in response.text
+    
+    response = client.get("/api/admin/profiling/memory/diff?format=collapsed", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    
+    client.post("/api/admin/profiling/memory/stop", headers=auth_headers)
+    del retained
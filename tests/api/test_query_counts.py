@@ -0,0 +1,112 @@
+import logging
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+
+from app.db.query_stats import normalize_sql
+from app.models.case import Case
+from app.models.client import Client
+from app.models.deadline import Deadline
+from app.models.user import User
+from app.api.endpoints.deadlines_service import DeadlineService
+
+# Fixture para criar um usuário de teste
+@pytest.fixture
+def test_user(db_session):
+    user = User(
+        id="test-user-id",
+        email="test@example.com",
+        first_name="Test",
+        last_name="User"
+    )
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+# Fixture para criar um token de autenticação para testes
+@pytest.fixture
+def auth_headers(test_user):
+    from app.utils.security import create_access_token
+    
+    access_token = create_access_token(test_user.id)
+    return {"Authorization": f"Bearer {access_token}"}
+
+@pytest.fixture
+def seeded(db_session, test_user):
+    """Vinte processos, cada um com um cliente e um prazo próximo"""
+    soon = datetime.utcnow() + timedelta(days=2)
+    for index in range(20):
+        client = Client(name=f"Cliente {index}", user_id=test_user.id)
+        db_session.add(client)
+        db_session.flush()
+        case = Case(title=f"Processo {index}", number=f"000{index}", client_id=client.id, user_id=test_user.id)
+        db_session.add(case)
+        db_session.flush()
+        db_session.add(Deadline(title=f"Prazo {index}", due_date=soon, case_id=case.id, user_id=test_user.id))
+    db_session.add(Case(title="Sem cliente", user_id=test_user.id))
+    db_session.commit()
+
+def test_case_options_single_query(client, auth_headers, seeded, assert_max_queries):
+    """As opções de processos não fazem uma consulta por cliente"""
+    
+    # Autenticação e sincronização da lista de revogação, mais a consulta das opções
+    with assert_max_queries(4):
+        response = client.get("/api/cases/options", headers=auth_headers)
+    
+    assert response.status_code == status.HTTP_200_OK
+    options = response.json()
+    assert len(options) == 21
+    by_label = {option["label"]: option for option in options}
+    assert by_label["Processo 3 (0003)"]["clientName"] == "Cliente 3"
+    assert by_label["Sem cliente (Sem número)"]["clientName"] == "Cliente não especificado"
+
+def test_upcoming_deadlines_single_query(db_session, test_user, seeded, assert_max_queries):
+    """Os prazos próximos trazem o processo na mesma consulta"""
+    
+    with assert_max_queries(1):
+        deadlines = DeadlineService.get_upcoming_deadlines(db_session, "test-user-id")
+    
+    assert len(deadlines) == 20
+    assert all(deadline["case"]["title"].startswith("Processo") for deadline in deadlines)
+
+def test_server_timing_header(client, auth_headers, seeded, override_settings):
+    """Em desenvolvimento, o Server-Timing informa as consultas e o tempo de banco"""
+    
+    response = client.get("/api/cases", headers=auth_headers)
+    assert "server-timing" not in response.headers
+    
+    override_settings(SERVER_TIMING_ENABLED=True)
+    response = client.get("/api/cases", headers=auth_headers)
+    
+    assert response.status_code == status.HTTP_200_OK
+    timing = response.headers["server-timing"]
+    assert timing.startswith("db;dur=")
+    assert re.search(r'desc="\d+ consultas"', timing)
+    assert "app;dur=" in timing
+
+def test_slow_query_log(client, auth_headers, seeded, override_settings, caplog):
+    """Consultas acima do limite são registradas com o SQL normalizado e a rota"""
+    
+    override_settings(SLOW_QUERY_MS=0.000001)
+    with caplog.at_level(logging.WARNING):
+        response = client.get("/api/cases/options", headers=auth_headers)
+    
+    assert response.status_code == status.HTTP_200_OK
+    messages = [record.getMessage() for record in caplog.records if "Consulta lenta" in record.getMessage()]
+    assert any("/api/cases/options" in message and "LEFT OUTER JOIN clients" in message for message in messages)
+    assert all("test-user-id" not in message for message in messages)
+
+def test_normalize_sql():
+    """Valores literais e listas de parâmetros não diferenciam consultas"""
+    
+    statement = """SELECT cases.id FROM cases
+        WHERE cases.user_id = 'abc' AND cases.id IN (?, ?, ?) AND cases.value > 10.5 LIMIT ? OFFSET 20"""
+    assert normalize_sql(statement) == (
+        "SELECT cases.id FROM cases WHERE cases.user_id = ? AND cases.id IN (...) "
+        "AND cases.value > ? LIMIT ? OFFSET ?"
+    )
+    assert normalize_sql("SELECT * FROM users WHERE id = %(id_1)s") == "SELECT * FROM users WHERE id = ?"
+    assert normalize_sql("SELECT anon_1.id FROM t WHERE x = :x_1") == "SELECT anon_1.id FROM t WHERE x = ?"
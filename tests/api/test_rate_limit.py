@@ -0,0 +1,146 @@
+import pytest
+from fastapi import status
+
+from app.middleware import rate_limit
+from app.middleware.rate_limit import RateLimiter, MemoryBackend, SQLiteBackend, Rate, parse_rules
+from app.models.user import User
+
+# Fixture para criar um usuário de teste
+@pytest.fixture
+def test_user(db_session):
+    user = User(
+        id="test-user-id",
+        email="test@example.com",
+        first_name="Test",
+        last_name="User"
+    )
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+# Fixture para criar um token de autenticação para testes
+@pytest.fixture
+def auth_headers(test_user):
+    from app.utils.security import create_access_token
+    
+    access_token = create_access_token(test_user.id)
+    return {"Authorization": f"Bearer {access_token}"}
+
+@pytest.fixture
+def strict_limiter(monkeypatch):
+    limiter = RateLimiter(MemoryBackend(), Rate(capacity=5, period=60), parse_rules("/api/ai=2/minute"))
+    monkeypatch.setattr(rate_limit, "limiter", limiter)
+    return limiter
+
+def test_rate_limit_headers(client, auth_headers, strict_limiter):
+    """As respostas da API trazem os cabeçalhos RateLimit-*"""
+    
+    response = client.get("/api/auth/user", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ratelimit-limit"] == "5"
+    assert response.headers["ratelimit-remaining"] == "4"
+    assert int(response.headers["ratelimit-reset"]) > 0
+
+def test_rate_limit_rejects_with_429(client, auth_headers, strict_limiter):
+    """Excedido o limite, a requisição é rejeitada antes de chegar ao endpoint"""
+    
+    for _ in range(5):
+        assert client.get("/api/auth/user", headers=auth_headers).status_code == status.HTTP_200_OK
+    
+    response = client.get("/api/auth/user", headers=auth_headers)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.headers["ratelimit-remaining"] == "0"
+    assert int(response.headers["retry-after"]) >= 1
+
+def test_route_rule_is_stricter(client, auth_headers, strict_limiter, monkeypatch):
+    """Rotas com regra própria têm um bucket separado e mais restritivo"""
+    from app.services.ai_service import deepseek_service
+    
+    async def fake_search(query, context=None):
+        return {"success": True, "result": "ok"}
+    
+    monkeypatch.setattr(deepseek_service, "legal_search", fake_search)
+    
+    for _ in range(2):
+        response = client.post("/api/ai/legal-search", headers=auth_headers, json={"query": "prazo"})
+        assert response.status_code != status.HTTP_429_TOO_MANY_REQUESTS
+    
+    response = client.post("/api/ai/legal-search", headers=auth_headers, json={"query": "prazo"})
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    
+    # O bucket geral do usuário continua disponível para as demais rotas
+    assert client.get("/api/auth/user", headers=auth_headers).status_code == status.HTTP_200_OK
+
+def test_users_have_separate_buckets(client, auth_headers, strict_limiter):
+    """Requisições sem token são limitadas pelo IP, separadas do usuário autenticado"""
+    
+    for _ in range(5):
+        client.get("/api/auth/user", headers=auth_headers)
+    assert client.get("/api/auth/user", headers=auth_headers).status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert client.get("/api/auth/user").status_code == status.HTTP_401_UNAUTHORIZED
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_shares_buckets(tmp_path):
+    """O backend SQLite compartilha o estado entre instâncias (workers)"""
+    path = str(tmp_path / "buckets.db")
+    rate = Rate(capacity=2, period=60)
+    first, second = SQLiteBackend(path), SQLiteBackend(path)
+    
+    assert (await first.consume("user:a", rate))[0]
+    assert (await second.consume("user:a", rate))[0]
+    assert not (await first.consume("user:a", rate))[0]
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_least_recently_used():
+    """Acima de max_keys, o bucket usado há mais tempo é descartado"""
+    backend = MemoryBackend(max_keys=3)
+    rate = Rate(capacity=1, period=60)
+    
+    for key in ("ip:a", "ip:b", "ip:c"):
+        assert (await backend.consume(key, rate))[0]
+    assert not (await backend.consume("ip:a", rate))[0]  # "ip:a" passa a ser o mais recente
+    
+    assert (await backend.consume("ip:d", rate))[0]
+    assert len(backend._buckets) == 3
+    assert "ip:b" not in backend._buckets
+    assert not (await backend.consume("ip:a", rate))[0]
+
+@pytest.mark.asyncio
+async def test_rejected_request_does_not_spend_other_bucket():
+    """Barrada pelo limite geral, a requisição não gasta a cota da rota, e vice-versa"""
+    limiter = RateLimiter(MemoryBackend(), Rate(capacity=2, period=60), parse_rules("/api/ai=3/minute"))
+    
+    for _ in range(2):
+        assert (await limiter.check("user:a", "/api/ai/legal-search")).allowed
+    assert not (await limiter.check("user:a", "/api/ai/legal-search")).allowed
+    # Custo zero só consulta o bucket da rota: restam as fichas das duas requisições atendidas
+    _, route_tokens = await limiter.backend.consume("user:a:/api/ai", limiter.rules[0].rate, cost=0)
+    assert route_tokens == pytest.approx(1, abs=0.01)
+    
+    limiter.reset()
+    limiter.default = Rate(capacity=10, period=60)
+    for _ in range(3):
+        assert (await limiter.check("user:b", "/api/ai/legal-search")).allowed
+    assert not (await limiter.check("user:b", "/api/ai/legal-search")).allowed
+    assert (await limiter.check("user:b", "/api/auth/user")).remaining == 6
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_prunes_idle_buckets(tmp_path):
+    """Buckets parados há mais que o maior período são apagados do arquivo"""
+    import sqlite3
+    import time
+    
+    path = str(tmp_path / "buckets.db")
+    backend = SQLiteBackend(path)
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "INSERT INTO buckets (key, tokens, updated) VALUES ('ip:antigo', 0, ?)",
+            (time.time() - SQLiteBackend.IDLE_SECONDS - 1,)
+        )
+    
+    await backend.consume("ip:novo", Rate(capacity=2, period=60))
+    
+    with sqlite3.connect(path) as connection:
+        keys = [row[0] for row in connection.execute("SELECT key FROM buckets")]
+    assert keys == ["ip:novo"]
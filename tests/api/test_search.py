@@ -0,0 +1,133 @@
+import pytest
+from fastapi import status
+import uuid
+
+from app.models.user import User
+from app.models.document import Document
+from app.models.case import Case
+from app.models.client import Client
+from app.utils.portuguese import analyze
+
+# Fixture para criar um usuário de teste
+@pytest.fixture
+def test_user(db_session):
+    user = User(
+        id="test-user-id",
+        email="test@example.com",
+        first_name="Test",
+        last_name="User"
+    )
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+# Fixture para criar um token de autenticação para testes
+@pytest.fixture
+def auth_headers(test_user):
+    from app.utils.security import create_access_token
+    
+    access_token = create_access_token(test_user.id)
+    return {"Authorization": f"Bearer {access_token}"}
+
+# Fixture com dados indexados de dois usuários
+@pytest.fixture
+def indexed_data(db_session, test_user):
+    other_user = User(id="other-user-id", email="other@example.com")
+    db_session.add(other_user)
+    
+    client = Client(name="Maria Souza", notes="Cliente com ação de indenização por danos morais", user_id=test_user.id)
+    db_session.add(client)
+    db_session.flush()
+    
+    case = Case(
+        title="Ação de despejo",
+        description="Rescisão do contrato de locação por falta de pagamento",
+        client_id=client.id,
+        user_id=test_user.id
+    )
+    document = Document(
+        id=str(uuid.uuid4()),
+        title="Contrato de Locação Residencial",
+        content="CLÁUSULA TERCEIRA - O locatário pagará os aluguéis até o dia 5. A rescisão contratual implica multa.",
+        file_type="text/plain",
+        user_id=test_user.id
+    )
+    other_document = Document(
+        id=str(uuid.uuid4()),
+        title="Contrato de locação de outro usuário",
+        content="Rescisão de contrato",
+        file_type="text/plain",
+        user_id=other_user.id
+    )
+    db_session.add_all([case, document, other_document])
+    db_session.commit()
+    return {"client": client, "case": case, "document": document}
+
+def test_portuguese_analyzer():
+    """Flexões e acentos são reduzidos ao mesmo termo"""
+    assert analyze("rescisão") == analyze("rescisoes") == analyze("Rescisões")
+    assert analyze("contratos") == analyze("contrato")
+    assert analyze("de o para") == []
+
+def test_search_ranks_and_highlights(client, auth_headers, indexed_data):
+    """Teste para o endpoint GET /api/search"""
+    
+    response = client.get("/api/search", params={"q": "rescisoes contratos"}, headers=auth_headers)
+    
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    
+    # Apenas entidades do usuário atual são retornadas
+    result_ids = {(r["type"], r["id"]) for r in data["results"]}
+    assert result_ids == {("document", indexed_data["document"].id), ("case", indexed_data["case"].id)}
+    assert data["total"] == 2
+    
+    for result in data["results"]:
+        assert "<mark>" in result["snippet"]
+        assert result["score"] > 0
+
+def test_search_type_filter(client, auth_headers, indexed_data):
+    """O filtro por tipo restringe as entidades pesquisadas"""
+    
+    response = client.get("/api/search", params={"q": "indenizações", "types": "client"}, headers=auth_headers)
+    data = response.json()
+    assert [r["id"] for r in data["results"]] == [indexed_data["client"].id]
+    
+    response = client.get("/api/search", params={"q": "indenização", "types": "processo"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_search_index_updates_on_writes(client, auth_headers, indexed_data):
+    """O índice acompanha atualizações e exclusões feitas pela API"""
+    
+    document_id = indexed_data["document"].id
+    client.put(f"/api/documents/{document_id}", headers=auth_headers, json={"content": "Procuração ad judicia"})
+    
+    response = client.get("/api/search", params={"q": "procuração", "types": "document"}, headers=auth_headers)
+    assert [r["id"] for r in response.json()["results"]] == [document_id]
+    
+    response = client.get("/api/search", params={"q": "locatário aluguéis"}, headers=auth_headers)
+    assert response.json()["total"] == 0
+    
+    client.delete(f"/api/documents/{document_id}", headers=auth_headers)
+    response = client.get("/api/search", params={"q": "procuração"}, headers=auth_headers)
+    assert response.json()["total"] == 0
+
+def test_search_pagination(client, auth_headers, db_session, test_user):
+    """As páginas seguem o ranking e o total conta todos os resultados"""
+    
+    for i in range(12):
+        db_session.add(Client(name=f"Cliente {i}", notes="honorários " * (i + 1), user_id=test_user.id))
+    db_session.commit()
+    
+    pages = [
+        client.get("/api/search", params={"q": "honorários", "limit": 5, "skip": skip}, headers=auth_headers).json()
+        for skip in (0, 5, 10)
+    ]
+    assert [page["total"] for page in pages] == [12, 12, 12]
+    assert [len(page["results"]) for page in pages] == [5, 5, 2]
+    
+    results = [result for page in pages for result in page["results"]]
+    assert len({result["id"] for result in results}) == 12
+    scores = [result["score"] for result in results]
+    assert scores == sorted(scores, reverse=True)
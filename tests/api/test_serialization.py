@@ -0,0 +1,61 @@
+from datetime import datetime
+
+import pytest
+from fastapi import status
+
+from app.models.case import Case
+from app.models.client import Client
+from app.models.deadline import Deadline
+from app.models.document import Document
+from app.models.user import User
+
+# Fixture para criar um usuário de teste
+@pytest.fixture
+def test_user(db_session):
+    user = User(
+        id="test-user-id",
+        email="test@example.com",
+        first_name="Test",
+        last_name="User"
+    )
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+# Fixture para criar um token de autenticação para testes
+@pytest.fixture
+def auth_headers(test_user):
+    from app.utils.security import create_access_token
+    
+    access_token = create_access_token(test_user.id)
+    return {"Authorization": f"Bearer {access_token}"}
+
+@pytest.fixture
+def seeded(db_session, test_user):
+    client = Client(name="Maria da Silva", email=None, document="123.456.789-00", user_id=test_user.id)
+    db_session.add(client)
+    db_session.flush()
+    case = Case(title="Ação de despejo", value=15000.5, client_id=client.id, user_id=test_user.id)
+    db_session.add(case)
+    db_session.flush()
+    db_session.add_all([
+        Deadline(title="Contestação", due_date=datetime(2025, 5, 10, 18, 0, 0, 123456), case_id=case.id, user_id=test_user.id),
+        Deadline(title="Audiência", due_date=datetime(2025, 6, 1, 9, 30), priority="high", user_id=test_user.id),
+        Document(id="doc-1", title="Petição inicial", status="draft", user_id=test_user.id),
+    ])
+    db_session.commit()
+
+@pytest.mark.parametrize("path", ["/api/clients", "/api/cases", "/api/deadlines", "/api/documents"])
+def test_fast_json_matches_schema_output(client, auth_headers, seeded, override_settings, path):
+    """A serialização rápida produz o mesmo JSON que a validação pelos esquemas"""
+    
+    override_settings(FAST_JSON_RESPONSES=True)
+    fast = client.get(path, headers=auth_headers)
+    override_settings(FAST_JSON_RESPONSES=False)
+    validated = client.get(path, headers=auth_headers)
+    
+    assert fast.status_code == validated.status_code == status.HTTP_200_OK
+    assert fast.headers["content-type"] == "application/json"
+    assert fast.json() == validated.json()
+    assert len(next(iter(fast.json().values()))) > 0
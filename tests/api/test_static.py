@@ -0,0 +1,53 @@
+import gzip
+
+import pytest
+from fastapi import status
+
+from app import main
+from app.utils.static_assets import AssetManifest
+
+@pytest.fixture
+def static_dir(tmp_path, monkeypatch):
+    # Build do frontend com um arquivo com hash e sua variante .gz
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_text("<html>LawAI</html>")
+    script = b"console.log('lawai');" * 100
+    (tmp_path / "assets" / "index-3f9a1c2b.js").write_bytes(script)
+    (tmp_path / "assets" / "index-3f9a1c2b.js.gz").write_bytes(gzip.compress(script))
+    
+    monkeypatch.setattr(main, "static_manifest", AssetManifest(str(tmp_path)).build())
+    return tmp_path
+
+def test_hashed_asset_is_immutable_and_precompressed(client, static_dir):
+    """Arquivos com hash são servidos com cache imutável e na variante comprimida aceita"""
+    
+    response = client.get("/assets/index-3f9a1c2b.js", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.text == "console.log('lawai');" * 100
+    
+    response = client.get("/assets/index-3f9a1c2b.js", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+def test_etag_returns_304(client, static_dir):
+    """Com If-None-Match igual ao ETag atual, a resposta é 304 sem corpo"""
+    
+    response = client.get("/index.html")
+    assert response.headers["cache-control"] == "no-cache"
+    etag = response.headers["etag"]
+    
+    response = client.get("/index.html", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+
+def test_spa_fallback_only_for_frontend_routes(client, static_dir):
+    """Rotas do frontend recebem o index.html; rotas inexistentes da API e arquivos ausentes, 404"""
+    
+    response = client.get("/clientes/123")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text == "<html>LawAI</html>"
+    
+    assert client.get("/api/rota-inexistente").status_code == status.HTTP_404_NOT_FOUND
+    assert client.get("/assets/ausente.js").status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,86 @@
+import pytest
+from fastapi import status
+from sqlalchemy import event
+
+from app.models.user import User
+
+# Fixture para criar um usuário de teste
+@pytest.fixture
+def test_user(db_session):
+    user = User(
+        id="test-user-id",
+        email="test@example.com",
+        first_name="Test",
+        last_name="User"
+    )
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+# Fixture para criar um token de autenticação para testes
+@pytest.fixture
+def auth_headers(test_user):
+    from app.utils.security import create_access_token
+    
+    access_token = create_access_token(test_user.id)
+    return {"Authorization": f"Bearer {access_token}"}
+
+@pytest.fixture
+def query_log(db_session):
+    """Registra as consultas SQL executadas durante o teste"""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+def test_current_user_is_cached(client, auth_headers, query_log):
+    """O usuário autenticado é carregado do banco uma única vez dentro do TTL"""
+    
+    response = client.get("/api/auth/user", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["email"] == "test@example.com"
+    user_queries = [s for s in query_log if "FROM users" in s]
+    assert len(user_queries) == 1
+    
+    response = client.get("/api/auth/user", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert len([s for s in query_log if "FROM users" in s]) == 1
+
+def test_update_user_invalidates_cache(client, auth_headers, test_user):
+    """Atualizar o usuário invalida os dados em cache"""
+    
+    client.get("/api/auth/user", headers=auth_headers)
+    
+    response = client.put(f"/api/users/{test_user.id}", headers=auth_headers, json={"first_name": "Novo"})
+    assert response.status_code == status.HTTP_200_OK
+    
+    response = client.get("/api/auth/user", headers=auth_headers)
+    assert response.json()["first_name"] == "Novo"
+
+def test_invalid_token_is_rejected(client):
+    """Tokens inválidos continuam sendo rejeitados"""
+    
+    response = client.get("/api/auth/user", headers={"Authorization": "Bearer token-invalido"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+def test_metrics_endpoint(client, auth_headers):
+    """O /metrics expõe contagem, latência e consultas SQL agrupadas pelo padrão da rota"""
+    from app.utils import metrics
+    
+    metrics.registry.clear()
+    client.get("/api/auth/user", headers=auth_headers)
+    client.get("/api/users/outro-usuario", headers=auth_headers)
+    
+    response = client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    text = response.text
+    assert 'lawai_http_requests_total{method="GET",route="/api/auth/user",status="200"} 1' in text
+    assert 'route="/api/users/{user_id}"' in text
+    assert 'lawai_http_request_duration_seconds_count{method="GET",route="/api/auth/user"} 1' in text
+    assert 'lawai_db_queries_per_request_count{route="/api/auth/user"} 1' in text
@@ -1,11 +1,20 @@
+from contextlib import contextmanager
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from app.core import config
+from app.db.query_stats import normalize_sql
 from app.db.session import Base, get_db
 from app.main import app
+from app.middleware import rate_limit
+from app.services.ai_service import ai_circuit, ai_health
+from app.services.health_service import health_service
+from app.utils.security import clear_auth_cache
+from app.services.usage_service import clear_usage_cache, usage_recorder
 
 # Criar um banco de dados em memória para os testes
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -43,9 +52,72 @@ def client(db_session):
     
     app.dependency_overrides[get_db] = override_get_db
     
+    # Começar cada teste sem usuários em cache e com os limites de requisição zerados
+    clear_auth_cache()
+    clear_usage_cache()
+    rate_limit.limiter.reset()
+    ai_circuit.reset()
+    ai_health.reset()
+    health_service.reset()
+    
     # Criar um cliente de teste
     with TestClient(app) as c:
         yield c
     
     # Limpar as substituições
-    app.dependency_overrides = {}
\ No newline at end of file
+    app.dependency_overrides = {}
+
+@pytest.fixture(autouse=True)
+def usage_session(monkeypatch):
+    # Gravar o consumo de tokens da IA no banco de teste
+    monkeypatch.setattr(usage_recorder, "session_factory", TestingSessionLocal)
+
+@pytest.fixture(autouse=True)
+def storage_backend(tmp_path, monkeypatch):
+    # Gravar os arquivos enviados em um diretório temporário por teste
+    from app.services import storage_service
+    
+    backend = storage_service.LocalStorageBackend(str(tmp_path / "uploads"))
+    monkeypatch.setattr(storage_service, "storage_backend", backend)
+    return backend
+
+@pytest.fixture
+def override_settings():
+    """
+    Altera configurações até o fim do teste (as configurações são imutáveis):
+
+        override_settings(SERVER_TIMING_ENABLED=True)
+    """
+    original = config.get_settings()
+    
+    def apply(**values):
+        config.set_settings(config.get_settings().replace(**values))
+    
+    yield apply
+    config.set_settings(original)
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    Falha se o bloco executar mais consultas SQL que o limite:
+
+        with assert_max_queries(3):
+            client.get("/api/cases/options", headers=auth_headers)
+    """
+    @contextmanager
+    def check(limit: int):
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(normalize_sql(statement))
+        
+        event.listen(engine, "after_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "after_cursor_execute", record)
+        assert len(statements) <= limit, (
+            f"{len(statements)} consultas executadas (máximo {limit}):\n" + "\n".join(statements)
+        )
+    
+    return check
@@ -0,0 +1,50 @@
+import uuid
+from sqlalchemy import text
+
+from app.db.types import compress_text, decompress_text, HEADER_RAW
+from app.models.blob import Blob
+from app.models.document import Document
+
+def test_compress_text_roundtrip():
+    """Textos pequenos ficam sem compressão e textos grandes são comprimidos"""
+    small = "Procuração"
+    assert compress_text(small) == HEADER_RAW + small.encode("utf-8")
+    
+    large = "CLÁUSULA PRIMEIRA - Do objeto do contrato de locação. " * 200
+    stored = compress_text(large)
+    assert len(stored) < len(large.encode("utf-8")) / 5
+    assert decompress_text(stored) == large
+
+def test_extracted_text_is_stored_compressed(db_session):
+    """A coluna extracted_text é gravada comprimida e lida de forma transparente"""
+    extracted = "O LOCATÁRIO pagará o aluguel até o quinto dia útil. " * 500
+    blob = Blob(sha256=uuid.uuid4().hex, size=1, extracted_text=extracted)
+    db_session.add(blob)
+    db_session.commit()
+    
+    stored = db_session.execute(text("SELECT extracted_text FROM blobs WHERE sha256 = :sha"), {"sha": blob.sha256}).scalar()
+    assert len(stored) < len(extracted.encode("utf-8")) / 5
+    
+    db_session.expire_all()
+    assert db_session.query(Blob).filter(Blob.sha256 == blob.sha256).first().extracted_text == extracted
+
+def test_legacy_plain_text_rows_are_readable(db_session):
+    """Linhas antigas gravadas como texto puro continuam legíveis"""
+    sha256 = uuid.uuid4().hex
+    db_session.execute(
+        text("INSERT INTO blobs (sha256, size, extracted_text) VALUES (:sha, 1, :extracted)"),
+        {"sha": sha256, "extracted": "Petição inicial"}
+    )
+    db_session.commit()
+    
+    assert db_session.query(Blob).filter(Blob.sha256 == sha256).first().extracted_text == "Petição inicial"
+
+def test_document_content_stays_plain_text(db_session):
+    """documents é compartilhada com o servidor Node, que lê content como texto"""
+    content = "O LOCATÁRIO pagará o aluguel até o quinto dia útil. " * 500
+    document = Document(id=str(uuid.uuid4()), title="Contrato", content=content, file_type="text/plain")
+    db_session.add(document)
+    db_session.commit()
+    
+    stored = db_session.execute(text("SELECT content FROM documents WHERE id = :id"), {"id": document.id}).scalar()
+    assert stored == content
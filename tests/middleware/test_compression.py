@@ -0,0 +1,78 @@
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware.compression import CompressionMiddleware
+
+ANALYSIS = "## Cláusula 1ª\n\nO LOCATÁRIO obriga-se a pagar o aluguel até o quinto dia útil.\n" * 200
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+@app.get("/analysis")
+async def analysis():
+    return {"analysis": ANALYSIS}
+
+@app.get("/small")
+async def small():
+    return {"ok": True}
+
+@app.get("/events")
+async def events():
+    async def stream():
+        for index in range(3):
+            yield f"data: {index}\n\n"
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+@app.get("/chunks")
+async def chunks():
+    async def stream():
+        for _ in range(4):
+            yield ANALYSIS
+    return StreamingResponse(stream(), media_type="text/plain")
+
+@app.get("/precompressed")
+async def precompressed():
+    return Response(gzip.compress(ANALYSIS.encode()), media_type="text/plain", headers={"content-encoding": "gzip"})
+
+@app.get("/pdf")
+async def pdf():
+    return Response(b"%PDF-1.4" + b"0" * 4096, media_type="application/pdf")
+
+client = TestClient(app)
+
+def test_large_json_is_compressed():
+    response = client.get("/analysis", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(ANALYSIS.encode()) / 5
+    assert response.json()["analysis"] == ANALYSIS
+
+def test_small_or_unaccepted_responses_are_not_compressed():
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    
+    response = client.get("/analysis", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+def test_event_stream_is_not_compressed():
+    response = client.get("/events", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text == "data: 0\n\ndata: 1\n\ndata: 2\n\n"
+
+def test_streaming_response_is_compressed_incrementally():
+    response = client.get("/chunks", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == ANALYSIS * 4
+
+def test_compressed_content_is_left_alone():
+    response = client.get("/precompressed", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == ANALYSIS
+    
+    response = client.get("/pdf", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
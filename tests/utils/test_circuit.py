@@ -0,0 +1,50 @@
+import time
+
+from app.utils.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+def test_opens_after_consecutive_failures_and_recovers():
+    breaker = CircuitBreaker("teste", failure_threshold=2, reset_timeout=0.05)
+    
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.allow() is False
+    
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    # Uma única chamada de teste por vez
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow() is True
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker("teste", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    
+    time.sleep(0.06)
+    assert breaker.allow() is True
+    breaker.record_failure()
+    
+    assert breaker.state == OPEN
+    breaker.reset_timeout = 30
+    assert 29 < breaker.snapshot()["retry_in"] <= 30
+
+def test_released_trial_allows_next_trial():
+    breaker = CircuitBreaker("teste", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    
+    time.sleep(0.06)
+    assert breaker.check() is True
+    assert breaker.allow() is False
+    
+    # A chamada de teste foi cancelada: o circuito continua meio aberto, aceitando outra
+    breaker.release_trial()
+    assert breaker.state == HALF_OPEN
+    assert breaker.check() is True
@@ -0,0 +1,120 @@
+import os
+import signal
+
+import pytest
+from pydantic import ValidationError
+
+from app.core import config
+from app.core.config import Settings, settings
+from app.middleware.rate_limit import limiter
+
+@pytest.fixture
+def env_file(tmp_path, monkeypatch):
+    """Um .env temporário; ao final, desfaz as variáveis carregadas e as configurações recarregadas"""
+    path = tmp_path / ".env"
+    path.write_text("")
+    monkeypatch.setattr(config, "ENV_FILE", str(path))
+    original = config.get_settings()
+    yield path
+    for key in config._dotenv_keys:
+        os.environ.pop(key, None)
+    config._dotenv_keys.clear()
+    current = config.set_settings(original)
+    for hook in config._reload_hooks:
+        hook(current, original)
+
+def test_from_env_converts_and_validates():
+    """Valores do ambiente são convertidos para o tipo do campo; inválidos impedem a inicialização"""
+    
+    loaded = Settings.from_env({
+        "DATABASE_URL": "sqlite://",
+        "SESSION_SECRET": "segredo",
+        "DB_POOL_SIZE": "20",
+        "TRACING_ENABLED": "yes",
+        "LOG_LEVEL": "debug",
+        "STORAGE_S3_ENDPOINT_URL": "",
+    })
+    assert loaded.SECRET_KEY == "segredo"
+    assert loaded.DB_POOL_SIZE == 20
+    assert loaded.TRACING_ENABLED is True
+    assert loaded.LOG_LEVEL == "DEBUG"
+    assert loaded.STORAGE_S3_ENDPOINT_URL is None
+    
+    for invalid in ({"DB_POOL_SIZE": "0"}, {"TRACING_SAMPLE_RATIO": "1.5"}, {"RATE_LIMIT_BACKEND": "memcached"},
+                    {"FAST_JSON_RESPONSES": "talvez"}, {"STORAGE_BACKEND": "s3"}, {"DATABASE_URL": ""}):
+        with pytest.raises(ValidationError):
+            Settings.from_env({"DATABASE_URL": "sqlite://", **invalid})
+
+def test_settings_are_immutable():
+    with pytest.raises(TypeError):
+        settings.RATE_LIMIT_ENABLED = False
+    with pytest.raises(ValidationError):
+        config.get_settings().RATE_LIMIT_ENABLED = False
+    
+    with config.override_settings(RATE_LIMIT_ENABLED=False) as overridden:
+        assert settings.RATE_LIMIT_ENABLED is False
+        assert overridden is config.get_settings()
+    assert settings.RATE_LIMIT_ENABLED is True
+
+def test_env_file_does_not_override_environment(env_file, monkeypatch):
+    monkeypatch.setenv("METRICS_TOKEN", "do-ambiente")
+    env_file.write_text("METRICS_TOKEN=do-arquivo\nAI_REQUEST_TIMEOUT=5\n")
+    
+    config.reload_settings()
+    
+    assert settings.METRICS_TOKEN == "do-ambiente"
+    assert settings.AI_REQUEST_TIMEOUT == 5.0
+
+def test_reload_applies_changes_and_keeps_valid_settings(env_file):
+    """A recarga atualiza os objetos criados na inicialização; uma configuração inválida é descartada"""
+    
+    env_file.write_text("RATE_LIMIT_DEFAULT=5/second\nAUTH_CACHE_TTL_SECONDS=0\n")
+    assert config.reload_settings() is not None
+    assert settings.RATE_LIMIT_DEFAULT == "5/second"
+    assert limiter.default.capacity == 5
+    
+    from app.utils.security import _token_cache
+    assert _token_cache.ttl == 0
+    
+    env_file.write_text("RATE_LIMIT_DEFAULT=5/second\nDB_POOL_SIZE=-1\n")
+    assert config.reload_settings() is None
+    assert settings.RATE_LIMIT_DEFAULT == "5/second"
+    assert settings.DB_POOL_SIZE == 5
+    
+    assert config.reload_settings() is None
+
+def test_reload_keeps_restart_required_fields(env_file):
+    """Campos lidos só na inicialização mantêm o valor atual até reiniciar os workers"""
+    original_path = settings.STORAGE_LOCAL_PATH
+    
+    env_file.write_text("STORAGE_LOCAL_PATH=/tmp/outro-diretorio\nAI_REQUEST_TIMEOUT=7\n")
+    assert config.reload_settings() is not None
+    assert settings.AI_REQUEST_TIMEOUT == 7.0
+    assert settings.STORAGE_LOCAL_PATH == original_path
+    
+    # Só campos que exigem reinício: nada a aplicar
+    env_file.write_text("STORAGE_LOCAL_PATH=/tmp/mais-um\nAI_REQUEST_TIMEOUT=7\n")
+    assert config.reload_settings() is None
+    assert settings.STORAGE_LOCAL_PATH == original_path
+
+def test_reload_unsets_removed_env_lines(env_file):
+    default = Settings.model_fields["AI_REQUEST_TIMEOUT"].default
+    env_file.write_text("AI_REQUEST_TIMEOUT=7\n")
+    config.reload_settings()
+    assert settings.AI_REQUEST_TIMEOUT == 7.0
+    
+    env_file.write_text("")
+    assert config.reload_settings() is not None
+    assert "AI_REQUEST_TIMEOUT" not in os.environ
+    assert settings.AI_REQUEST_TIMEOUT == default
+
+@pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="SIGHUP indisponível")
+def test_sighup_reloads(env_file):
+    previous = signal.getsignal(signal.SIGHUP)
+    try:
+        assert config.install_reload_signal()
+        env_file.write_text("SERVER_TIMING_ENABLED=true\n")
+        os.kill(os.getpid(), signal.SIGHUP)
+        assert settings.SERVER_TIMING_ENABLED is True
+    finally:
+        signal.signal(signal.SIGHUP, previous)
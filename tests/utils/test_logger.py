@@ -0,0 +1,98 @@
+import io
+import os
+import json
+import time
+import logging
+
+import pytest
+
+from app.utils.logger import JsonFormatter, create_queue_handler, fork_listener
+
+def _capture(override_settings, max_length=50):
+    override_settings(LOG_MAX_MESSAGE_LENGTH=max_length)
+    stream = io.StringIO()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter())
+    queue_handler, listener = create_queue_handler(output)
+    
+    test_logger = logging.getLogger("lawai.teste")
+    test_logger.handlers = [queue_handler]
+    test_logger.propagate = False
+    test_logger.setLevel(logging.INFO)
+    listener.start()
+    return test_logger, listener, stream
+
+def test_json_lines_with_truncated_arguments(override_settings):
+    """Cada registro é uma linha JSON e argumentos grandes são truncados"""
+    
+    test_logger, listener, stream = _capture(override_settings)
+    test_logger.error("Erro na API DeepSeek: %s - %s", 500, "x" * 10000)
+    try:
+        raise ValueError("falhou")
+    except ValueError:
+        test_logger.exception("Erro inesperado")
+    listener.stop()
+    
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["level"] == "ERROR"
+    assert first["logger"] == "lawai.teste"
+    assert first["message"].startswith("Erro na API DeepSeek: 500 - xxx")
+    assert len(first["message"]) < 120
+    assert first["message"].endswith("caracteres]")
+    assert "ValueError: falhou" in second["exception"]
+
+def test_messages_below_level_are_not_formatted(override_settings):
+    """Registros abaixo do nível configurado nem chegam a montar a mensagem"""
+    
+    class Expensive:
+        def __str__(self):
+            raise AssertionError("não deveria ser formatado")
+    
+    test_logger, listener, stream = _capture(override_settings)
+    test_logger.debug("Detalhes: %s", Expensive())
+    listener.stop()
+    assert stream.getvalue() == ""
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requer fork")
+def test_listener_stops_in_forked_child(override_settings):
+    """Após o fork, o filho encerra a fila de logs mesmo sem outros registros (ex: LOG_LEVEL=WARNING)"""
+    
+    test_logger, listener, stream = _capture(override_settings)
+    time.sleep(0.05)  # A thread de escrita já está esperando na fila
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            fork_listener(test_logger.handlers[0], listener).stop()
+            code = 0
+        finally:
+            os._exit(code)
+    
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        finished, status = os.waitpid(pid, os.WNOHANG)
+        if finished:
+            break
+        time.sleep(0.05)
+    else:
+        os.kill(pid, 9)
+        os.waitpid(pid, 0)
+        pytest.fail("O filho não conseguiu encerrar a fila de logs")
+    listener.stop()
+    assert os.waitstatus_to_exitcode(status) == 0
+
+def test_request_id_in_logs_and_response(client, override_settings, caplog):
+    """Logs registrados durante a requisição levam o X-Request-ID, que volta na resposta"""
+    
+    override_settings(SLOW_QUERY_MS=0.000001)
+    with caplog.at_level(logging.WARNING, logger="lawai"):
+        response = client.post("/api/auth/refresh", json={"refresh_token": "invalido"}, headers={"X-Request-ID": "req-123"})
+    
+    assert response.headers["x-request-id"] == "req-123"
+    records = [record for record in caplog.records if record.name == "lawai"]
+    assert records
+    assert all(record.request_id == "req-123" for record in records)
+    
+    # IDs inválidos são substituídos por um gerado pelo servidor
+    response = client.get("/metrics", headers={"X-Request-ID": "invalido com espacos"})
+    assert len(response.headers["x-request-id"]) == 32
@@ -0,0 +1,63 @@
+import os
+
+from app.utils import metrics
+from app.utils.metrics import Registry
+
+def test_histogram_exposition():
+    registry = Registry()
+    histogram = registry.histogram("latencia_seconds", "Latência", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 3.0):
+        histogram.observe(value, "/api/cases")
+    
+    snapshot = registry.snapshot()
+    for data in snapshot.values():
+        data["_values"] = {tuple(labels): value for labels, value in data["values"]}
+    text = metrics.render(snapshot)
+    
+    assert '# TYPE latencia_seconds histogram' in text
+    assert 'latencia_seconds_bucket{route="/api/cases",le="0.1"} 1' in text
+    assert 'latencia_seconds_bucket{route="/api/cases",le="1"} 2' in text
+    assert 'latencia_seconds_bucket{route="/api/cases",le="+Inf"} 3' in text
+    assert 'latencia_seconds_count{route="/api/cases"} 3' in text
+
+def test_snapshots_from_other_workers_are_summed(tmp_path, override_settings):
+    override_settings(METRICS_MULTIPROC_DIR=str(tmp_path))
+    metrics.registry.clear()
+    metrics.http_requests.inc("GET", "/api/cases", "200", amount=2)
+    metrics.write_snapshot()
+    
+    # Simula outro worker renomeando o arquivo deste processo
+    os.rename(tmp_path / f"metrics-{os.getpid()}.json", tmp_path / "metrics-1.json")
+    metrics.http_requests.inc("GET", "/api/cases", "200")
+    
+    text = metrics.render()
+    assert 'lawai_http_requests_total{method="GET",route="/api/cases",status="200"} 5' in text
+    metrics.registry.clear()
+
+def test_retired_workers_keep_counters(tmp_path, override_settings):
+    """Contadores de workers encerrados continuam somados; gauges e arquivos deles, não"""
+    override_settings(METRICS_MULTIPROC_DIR=str(tmp_path))
+    metrics.registry.clear()
+    metrics.http_requests.inc("GET", "/api/cases", "200", amount=2)
+    metrics.event_loop_lag.set(0.5, "1")
+    metrics.write_snapshot()
+    os.rename(tmp_path / f"metrics-{os.getpid()}.json", tmp_path / "metrics-1.json")
+    metrics.registry.clear()
+    
+    # Worker 1 morreu sem encerrar: o supervisor incorpora o arquivo dele
+    metrics.retire_snapshot(1)
+    assert not (tmp_path / "metrics-1.json").exists()
+    
+    # Este processo encerra normalmente
+    metrics.http_requests.inc("GET", "/api/cases", "200", amount=3)
+    metrics.write_snapshot()
+    metrics.retire_snapshot()
+    assert not (tmp_path / f"metrics-{os.getpid()}.json").exists()
+    
+    metrics.registry.clear()
+    text = metrics.render()
+    assert 'lawai_http_requests_total{method="GET",route="/api/cases",status="200"} 5' in text
+    assert "lawai_event_loop_lag_seconds{" not in text
+    
+    metrics.clear_directory()
+    assert not list(tmp_path.glob("metrics-*"))
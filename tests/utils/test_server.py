@@ -0,0 +1,18 @@
+import os
+
+from app import server
+from app.core.config import settings
+
+def test_tables_created_once_before_workers(override_settings, monkeypatch):
+    """O supervisor cria as tabelas e os workers herdam DB_CREATE_TABLES desligado"""
+    
+    override_settings(DB_CREATE_TABLES=True, SERVER_PRELOAD=True)
+    monkeypatch.setenv("DB_CREATE_TABLES", "true")
+    calls = []
+    monkeypatch.setattr(server, "_create_tables", lambda: calls.append(os.getpid()))
+    
+    server.create_tables_once()
+    
+    assert calls == [os.getpid()]
+    assert settings.DB_CREATE_TABLES is False
+    assert os.environ["DB_CREATE_TABLES"] == "false"
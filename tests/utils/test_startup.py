@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+from app.utils import metrics
+from app.utils.startup import StartupReport
+
+def test_startup_steps_are_recorded():
+    report = StartupReport()
+    with report.step("create_tables"):
+        pass
+    report.record("import app.main", 0.25)
+    
+    assert [name for name, _ in report.steps] == ["create_tables", "import app.main"]
+    assert report.since_process_start() > 0
+    text = metrics.render()
+    assert f'lawai_startup_step_seconds{{pid="{os.getpid()}",step="import app.main"}} 0.25' in text
+
+def test_heavy_dependencies_are_not_imported_at_startup():
+    """jose, passlib e httpx só são carregados no primeiro uso"""
+    
+    code = "import sys, app.main; print(','.join(m for m in ('jose', 'passlib', 'httpx') if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code],
+        capture_output=True, text=True, env=dict(os.environ), check=True
+    )
+    assert result.stdout.strip() == ""
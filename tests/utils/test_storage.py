@@ -0,0 +1,87 @@
+import io
+
+import pytest
+
+from app.services.storage_service import S3StorageBackend, StagedFile
+
+class ClientError(Exception):
+    """Imita a botocore.exceptions.ClientError: o código do erro fica em `response`"""
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+class StreamingBody:
+    def __init__(self, data: bytes):
+        self._stream = io.BytesIO(data)
+
+    def iter_chunks(self, chunk_size: int):
+        while True:
+            chunk = self._stream.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+class FakeS3Client:
+    """Cliente S3 em memória com as chamadas usadas pelo backend"""
+    def __init__(self):
+        self.objects = {}
+        self.failure = None
+
+    def upload_file(self, path, bucket, key, ExtraArgs=None):
+        with open(path, "rb") as f:
+            self.objects[(bucket, key)] = (f.read(), ExtraArgs)
+
+    def head_object(self, Bucket, Key):
+        if self.failure:
+            raise ClientError(self.failure)
+        if (Bucket, Key) not in self.objects:
+            raise ClientError("404")
+        return {"ContentLength": len(self.objects[(Bucket, Key)][0])}
+
+    def get_object(self, Bucket, Key, Range):
+        start, _, end = Range.removeprefix("bytes=").partition("-")
+        data = self.objects[(Bucket, Key)][0]
+        return {"Body": StreamingBody(data[int(start):int(end) + 1])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+@pytest.fixture
+def s3():
+    backend = S3StorageBackend("documentos")
+    backend._client = FakeS3Client()
+    return backend
+
+def test_s3_put_moves_staged_file(s3, tmp_path):
+    path = tmp_path / "upload"
+    path.write_bytes(b"conteudo do contrato")
+    staged = StagedFile(path=str(path), size=20, sha256="abc", content_type="text/plain")
+
+    s3.put(staged, "blobs/ab/abc")
+
+    data, extra_args = s3.client.objects[("documentos", "blobs/ab/abc")]
+    assert data == b"conteudo do contrato"
+    assert extra_args == {"ContentType": "text/plain"}
+    assert not path.exists()
+    assert s3.exists("blobs/ab/abc")
+    assert s3.size("blobs/ab/abc") == 20
+
+def test_s3_iter_range_reads_in_chunks(s3):
+    s3.client.objects[("documentos", "chave")] = (b"0123456789", None)
+
+    chunks = list(s3.iter_range("chave", 2, 8, chunk_size=3))
+
+    assert chunks == [b"234", b"567", b"8"]
+
+def test_s3_missing_and_deleted_objects(s3):
+    s3.client.objects[("documentos", "chave")] = (b"dados", None)
+    s3.delete("chave")
+
+    assert s3.exists("chave") is False
+    with pytest.raises(FileNotFoundError):
+        s3.size("chave")
+
+    # Outros erros (credenciais, rede) não são tratados como arquivo ausente
+    s3.client.failure = "AccessDenied"
+    with pytest.raises(ClientError):
+        s3.exists("chave")
@@ -0,0 +1,105 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.models.user import User
+from app.services.ai_service import deepseek_service
+from app.utils.security import create_access_token
+from app.utils.tracing import parse_traceparent, tracer
+
+@pytest.fixture
+def traces(tmp_path, override_settings):
+    """Rastreia todas as requisições e grava os spans em um arquivo temporário"""
+    path = tmp_path / "traces.jsonl"
+    override_settings(
+        TRACING_ENABLED=True,
+        TRACING_SAMPLE_RATIO=1.0,
+        TRACING_EXPORTER="file",
+        TRACING_FILE_PATH=str(path),
+    )
+    tracer.exporter.clear()
+    
+    async def read():
+        await tracer.exporter.flush()
+        if not path.exists():
+            return []
+        spans = []
+        for line in path.read_text().splitlines():
+            for resource in json.loads(line)["resourceSpans"]:
+                for scope in resource["scopeSpans"]:
+                    spans.extend(scope["spans"])
+        return spans
+    
+    yield read
+    tracer.exporter.clear()
+
+def _attributes(span):
+    return {item["key"]: next(iter(item["value"].values())) for item in span["attributes"]}
+
+@pytest.mark.asyncio
+async def test_request_spans_are_nested(client, db_session, traces):
+    """Autenticação, SQL e serialização ficam sob o span raiz da requisição"""
+    
+    db_session.add(User(id="test-user-id", email="test@example.com"))
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token('test-user-id')}"}
+    
+    response = client.get("/api/cases/options", headers=headers)
+    assert response.status_code == 200
+    
+    spans = await traces()
+    root = next(span for span in spans if "parentSpanId" not in span)
+    assert root["name"] == "GET /api/cases/options"
+    assert _attributes(root)["http.response.status_code"] == "200"
+    assert all(span["traceId"] == root["traceId"] for span in spans)
+    
+    by_name = {span["name"]: span for span in spans}
+    auth = by_name["get_current_user"]
+    assert auth["parentSpanId"] == root["spanId"]
+    assert _attributes(auth)["enduser.id"] == "test-user-id"
+    assert by_name["serialize"]["parentSpanId"] == root["spanId"]
+    
+    queries = [span for span in spans if span["name"] == "SELECT"]
+    assert any(span["parentSpanId"] == auth["spanId"] for span in queries)
+    assert any("LEFT OUTER JOIN clients" in _attributes(span)["db.statement"] for span in queries)
+    assert all("test-user-id" not in _attributes(span)["db.statement"] for span in queries)
+
+@pytest.mark.asyncio
+async def test_sampling(client, traces, override_settings):
+    """Sem amostragem nada é gravado, mas um traceparent amostrado continua o trace"""
+    
+    override_settings(TRACING_SAMPLE_RATIO=0.0)
+    client.get("/metrics")
+    assert await traces() == []
+    
+    parent = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+    client.get("/metrics", headers={"traceparent": parent})
+    spans = await traces()
+    assert spans[0]["traceId"] == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert spans[0]["parentSpanId"] == "00f067aa0ba902b7"
+    
+    assert parse_traceparent("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00")[2] is False
+    assert parse_traceparent("lixo") is None
+
+@pytest.mark.asyncio
+async def test_deepseek_span_has_token_counts(traces):
+    """O span da chamada à IA traz o modelo e os tokens consumidos"""
+    
+    reply = httpx.Response(
+        200,
+        json={"choices": [{"message": {"content": "ok"}}], "usage": {"prompt_tokens": 120, "completion_tokens": 30}},
+        request=httpx.Request("POST", deepseek_service.api_url),
+    )
+    with patch("httpx.AsyncClient.post", new=AsyncMock(return_value=reply)):
+        with tracer.start_trace("teste"):
+            result = await deepseek_service.legal_search("prazo de contestação")
+    assert result["success"] is True
+    
+    spans = await traces()
+    span = next(span for span in spans if span["name"] == "deepseek legal_search")
+    attributes = _attributes(span)
+    assert attributes["gen_ai.request.model"] == "deepseek-chat"
+    assert attributes["gen_ai.usage.input_tokens"] == "120"
+    assert attributes["gen_ai.usage.output_tokens"] == "30"